@@ -0,0 +1,138 @@
+"""
+Incrementally maintained account model.
+
+Equity, realized and unrealized PnL are kept as running totals that fills
+(apply_fill) and price updates (mark) adjust in O(1), so pre-trade risk
+checks read them from memory instead of fetching the balance and a ticker
+per holding on every order. The model is rebuilt from the exchange or
+backend balance only when reconcile_due() says so (or on demand), and the
+drift found at each reconcile is reported back to the caller.
+"""
+
+import time
+import logging
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+QUOTE_CURRENCIES = ('USDT', 'USD', 'USDC')
+# Quantities below this are treated as a closed position
+DUST_QTY = 1e-12
+
+
+class AccountModel:
+    def __init__(self, cash=0.0, reconcile_interval=300.0):
+        self.cash = float(cash)
+        self.holdings = {}
+        self.cost = {}
+        self.marks = {}
+        self.realized_pnl = 0.0
+        self.fees = 0.0
+        self.reconcile_interval = float(reconcile_interval)
+        self.last_reconciled = None
+        self._value = 0.0
+        self._cost_total = 0.0
+
+    @property
+    def equity(self):
+        return self.cash + self._value
+
+    @property
+    def position_value(self):
+        return self._value
+
+    @property
+    def unrealized_pnl(self):
+        return self._value - self._cost_total
+
+    def mark(self, symbol, price):
+        """Revalue one holding at a new price."""
+        price = float(price)
+        qty = self.holdings.get(symbol)
+        if qty:
+            self._value += qty * (price - self.marks.get(symbol, price))
+        self.marks[symbol] = price
+
+    def apply_fill(self, side, symbol, qty, price, fee=0.0):
+        """Book a fill. Sells realize PnL against the average cost of the holding; returns that PnL."""
+        qty, price, fee = float(qty), float(price), float(fee or 0.0)
+        self.mark(symbol, price)
+        self.fees += fee
+        held = self.holdings.get(symbol, 0.0)
+        if side == 'buy':
+            self.cash -= qty * price + fee
+            self.holdings[symbol] = held + qty
+            # Buy fees go into the cost basis so realized PnL is net of both legs
+            self.cost[symbol] = self.cost.get(symbol, 0.0) + qty * price + fee
+            self._value += qty * price
+            self._cost_total += qty * price + fee
+            return 0.0
+        qty = min(qty, held)
+        if qty <= 0:
+            return 0.0
+        avg_cost = self.cost.get(symbol, 0.0) / held
+        pnl = qty * (price - avg_cost) - fee
+        self.cash += qty * price - fee
+        self.realized_pnl += pnl
+        self._value -= qty * price
+        self._cost_total -= qty * avg_cost
+        if held - qty <= DUST_QTY:
+            self._cost_total -= self.cost.pop(symbol, 0.0) - qty * avg_cost
+            self._value -= (held - qty) * price
+            del self.holdings[symbol]
+        else:
+            self.holdings[symbol] = held - qty
+            self.cost[symbol] -= qty * avg_cost
+        return pnl
+
+    def expire(self):
+        """Force a reconcile on the next reconcile_due() check."""
+        self.last_reconciled = None
+
+    def reconcile_due(self, now=None):
+        if self.last_reconciled is None:
+            return True
+        return (time.time() if now is None else now) - self.last_reconciled >= self.reconcile_interval
+
+    def reconcile(self, cash, holdings, marks=None, cost=None, now=None):
+        """Replace the running totals with an authoritative balance. Returns equity drift (new - old).
+
+        Cost basis is kept for holdings whose size did not change, so
+        unrealized PnL survives a reconcile; `cost` overrides it per symbol.
+        """
+        before = self.equity if self.last_reconciled is not None else None
+        marks = marks or {}
+        cost = cost or {}
+        new_cost = {}
+        for symbol, qty in holdings.items():
+            price = marks.get(symbol, self.marks.get(symbol))
+            if price is not None:
+                self.marks[symbol] = float(price)
+            if symbol in cost:
+                new_cost[symbol] = float(cost[symbol])
+            elif symbol in self.cost and abs(self.holdings.get(symbol, 0.0) - qty) <= DUST_QTY:
+                new_cost[symbol] = self.cost[symbol]
+            else:
+                new_cost[symbol] = qty * self.marks.get(symbol, 0.0)
+        self.cash = float(cash)
+        self.holdings = {s: float(q) for s, q in holdings.items() if q > DUST_QTY}
+        self.cost = {s: c for s, c in new_cost.items() if s in self.holdings}
+        self._value = sum(q * self.marks.get(s, 0.0) for s, q in self.holdings.items())
+        self._cost_total = sum(self.cost.values())
+        self.last_reconciled = time.time() if now is None else now
+        return 0.0 if before is None else self.equity - before
+
+    def snapshot(self):
+        return {
+            'cash': self.cash,
+            'holdings': dict(self.holdings),
+            'cost': dict(self.cost),
+            'marks': dict(self.marks),
+            'realized_pnl': self.realized_pnl,
+            'fees': self.fees,
+        }
+
+    def restore(self, state):
+        self.realized_pnl = float(state.get('realized_pnl', 0.0))
+        self.fees = float(state.get('fees', 0.0))
+        self.marks.update(state.get('marks', {}))
+        self.reconcile(state.get('cash', self.cash), state.get('holdings', {}), cost=state.get('cost'))
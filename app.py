@@ -56,20 +56,21 @@ def _save_credentials(data):
     CREDENTIALS_PATH.write_text(json.dumps(payload, indent=2))
 
 
-def _check_backend_health(url, timeout=5.0):
-    if requests is None:
-        return False, 'requests_unavailable'
-    try:
-        resp = requests.get(f"{url}/api/health", timeout=timeout)
-        body = (resp.text or '').strip()
-        snippet = body.replace('\n', ' ')[:200]
-        if resp.status_code == 200:
-            return True, 'ok'
-        if snippet:
-            return False, f"http_{resp.status_code}: {snippet}"
-        return False, f"http_{resp.status_code}: empty_response"
-    except Exception as e:
-        return False, str(e)
+def _backend_health(bot):
+    """Status of the bot's configured backend from the shared background prober; never blocks the render.
+
+    bot.watch_backend() creates the prober with the BACKEND_HEALTH_* / BACKEND_TIMEOUT
+    settings, and only the applied URL is probed (not whatever is typed in the form).
+    """
+    monitor = bot.watch_backend()
+    if monitor is None:
+        return False, 'not configured'
+    status = monitor.status()
+    if status['healthy'] is None:
+        return False, 'checking…'
+    if status['healthy']:
+        return True, f"ok ({status['latency_ms']:.0f} ms)"
+    return False, status['message']
 
 
 def _sync_credentials(url, payload, timeout=5.0):
@@ -130,6 +131,8 @@ def _sync_credentials(url, payload, timeout=5.0):
 if 'bot' not in st.session_state:
     st.session_state.bot = CryptoPiggyTop2026()
     st.session_state.bot.setup_exchange()
+    if len(st.session_state.bot.pending_orders):
+        st.session_state.bot.reconcile_pending_orders()
 
 if 'creds' not in st.session_state:
     st.session_state.creds = _load_credentials()
@@ -141,9 +144,8 @@ creds = st.session_state.creds
 bot.set_backend(creds['user_id'], url=creds['backend_url'], enabled=bool(creds.get('validated')))
 bot.exchange_name = creds.get('exchange') or bot.exchange_name
 
-# Check backend health
-health_ok, health_msg = _check_backend_health(creds['backend_url'])
-bot.backend_last_health = health_ok
+# Backend health comes from one background prober per URL, shared by all sessions
+health_ok, health_msg = _backend_health(bot)
 
 if bot.is_live() and not health_ok:
     bot.paper_mode = True
@@ -160,11 +162,12 @@ with st.expander('API Keys & Backend Settings', expanded=True):
     api_key = st.text_input('API Key', value=creds['api_key'], type='password')
     api_secret = st.text_input('API Secret', value=creds['api_secret'], type='password')
 
-    health_ok, health_msg = _check_backend_health(backend_url)
     if health_ok:
         st.success('✅ Backend health: OK')
     else:
         st.error(f"❌ Backend health: {health_msg}")
+    if backend_url.strip() != bot.backend_url:
+        st.info('Health shown for the saved backend URL; save to monitor the new one')
 
     cols = st.columns(2)
     with cols[0]:
@@ -209,7 +212,6 @@ with st.expander('API Keys & Backend Settings', expanded=True):
                     _save_credentials(creds)
                     st.session_state.creds = creds
                     bot.set_backend(user_id.strip(), url=backend_url.strip(), enabled=True)
-                    bot.backend_last_health = health_ok
                     st.success('✅ Credentials validated and synced')
                     st.rerun()
                 else:
@@ -241,8 +243,9 @@ with col2:
     st.header('Recent Trades')
     trades = bot.trade_log
     if trades:
-        dftr = pd.DataFrame(trades)[['time', 'side', 'symbol', 'amount_usd']]
-        st.table(dftr.tail(10))
+        dftr = trades.to_frame(limit=10)
+        dftr = dftr[['time', 'side', 'symbol', 'amount_usd'] + [c for c in ('strategy', 'votes') if c in dftr]]
+        st.table(dftr)
     else:
         st.write('No trades yet')
 
@@ -296,7 +299,7 @@ with col_b:
                 st.write('Backtest returned:', res)
 with col_c:
     live_mode = st.checkbox('Live mode', value=bot.is_live())
-    backend_ready = bool(creds.get('validated')) and _check_backend_health(creds['backend_url'])[0]
+    backend_ready = bool(creds.get('validated')) and _backend_health(bot)[0]
 
     if live_mode and not bot.is_live():
         if not bot._allow_live_env:
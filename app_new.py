@@ -5,6 +5,7 @@ import os
 import logging
 import json
 import uuid
+import contextlib
 from pathlib import Path
 
 try:
@@ -13,6 +14,7 @@ except Exception:
     requests = None
 
 from crypto_piggy_top import CryptoPiggyTop2026, MAX_TRADE_USD, MAX_PORTFOLIO_RISK_PCT, MAX_DAILY_TRADES
+from profiling import Profiler, MODES as PROFILE_MODES
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s')
 logger = logging.getLogger('CryptoPiggyApp')
@@ -56,20 +58,21 @@ def _save_credentials(data):
     CREDENTIALS_PATH.write_text(json.dumps(payload, indent=2))
 
 
-def _check_backend_health(url, timeout=5.0):
-    if requests is None:
-        return False, 'requests_unavailable'
-    try:
-        resp = requests.get(f"{url}/api/health", timeout=timeout)
-        body = (resp.text or '').strip()
-        snippet = body.replace('\n', ' ')[:200]
-        if resp.status_code == 200:
-            return True, 'ok'
-        if snippet:
-            return False, f"http_{resp.status_code}: {snippet}"
-        return False, f"http_{resp.status_code}: empty_response"
-    except Exception as e:
-        return False, str(e)
+def _backend_health(bot):
+    """Status of the bot's configured backend from the shared background prober; never blocks the render.
+
+    bot.watch_backend() creates the prober with the BACKEND_HEALTH_* / BACKEND_TIMEOUT
+    settings, and only the applied URL is probed (not whatever is typed in the form).
+    """
+    monitor = bot.watch_backend()
+    if monitor is None:
+        return False, 'not configured'
+    status = monitor.status()
+    if status['healthy'] is None:
+        return False, 'checking…'
+    if status['healthy']:
+        return True, f"ok ({status['latency_ms']:.0f} ms)"
+    return False, status['message']
 
 
 def _sync_credentials(url, payload, timeout=5.0):
@@ -145,6 +148,20 @@ def _fetch_backend_balance(url, user_id, timeout=5.0):
         return None
 
 
+@contextlib.contextmanager
+def _profiled(bot, label):
+    """Profile the enclosed action when the sidebar toggle is on and show the hotspots."""
+    if bot.profiler is None:
+        yield
+        return
+    with bot.profiler.profile(label):
+        yield
+    report = bot.profiler.last_report
+    with st.expander(f"🔬 Profile: {label} ({report['mode']}, {report['elapsed_s']:.2f}s)"):
+        st.caption(f"Profile: {report['profile_path']} | Summary: {report['summary_path']}")
+        st.code(report['summary'])
+
+
 # Configure page
 st.set_page_config(
     page_title="CryptoPiggy Trading Bot",
@@ -157,6 +174,8 @@ st.set_page_config(
 if 'bot' not in st.session_state:
     st.session_state.bot = CryptoPiggyTop2026()
     st.session_state.bot.setup_exchange()
+    if len(st.session_state.bot.pending_orders):
+        st.session_state.bot.reconcile_pending_orders()
 
 bot = st.session_state.bot
 
@@ -165,22 +184,12 @@ if 'creds' not in st.session_state:
 
 creds = st.session_state.creds
 
-# Cache backend health check to avoid redundant calls
-if 'backend_health_cache' not in st.session_state:
-    st.session_state.backend_health_cache = {'time': 0, 'status': False, 'msg': 'not_checked'}
-
-# Only check health every 30 seconds to avoid spam
-if time.time() - st.session_state.backend_health_cache['time'] > 30:
-    health_ok, health_msg = _check_backend_health(creds['backend_url'])
-    st.session_state.backend_health_cache = {'time': time.time(), 'status': health_ok, 'msg': health_msg}
-else:
-    health_ok = st.session_state.backend_health_cache['status']
-    health_msg = st.session_state.backend_health_cache['msg']
-
 bot.set_backend(creds['user_id'], url=creds['backend_url'], enabled=bool(creds.get('validated')))
-bot.backend_last_health = health_ok
 bot.exchange_name = creds.get('exchange') or bot.exchange_name
 
+# Backend health comes from one background prober per URL, shared by all sessions
+health_ok, health_msg = _backend_health(bot)
+
 if bot.is_live() and not health_ok:
     bot.paper_mode = True
     bot.live_confirmed = False
@@ -247,7 +256,7 @@ with st.sidebar:
     api_key = st.text_input('API Key', value=creds['api_key'], type='password')
     api_secret = st.text_input('API Secret', value=creds['api_secret'], type='password')
 
-    # Use cached health check from above
+    # Status published by the background health monitor
     if health_ok:
         st.success('✅ Backend health: OK')
     else:
@@ -293,7 +302,6 @@ with st.sidebar:
                     })
                     _save_credentials(creds)
                     bot.set_backend(user_id.strip(), url=backend_url.strip(), enabled=True)
-                    bot.backend_last_health = health_ok
                     st.success('✅ Credentials validated and synced')
                     st.rerun()
                 else:
@@ -390,6 +398,24 @@ with st.sidebar:
         bot.active_strategy = selected_strategy
         st.success(f'✅ Switched to {selected_strategy}')
 
+    st.subheader('🔬 Profiling')
+    profile_enabled = st.checkbox(
+        'Profile actions',
+        value=bot.profiler is not None,
+        help='Wrap backtests, hyperopt, predictions and bot loops in a profiler and show the top hotspots'
+    )
+    if profile_enabled:
+        profile_mode = st.selectbox(
+            'Profiler',
+            list(PROFILE_MODES),
+            index=PROFILE_MODES.index(bot.profiler.mode) if bot.profiler else 0,
+            help='cprofile: deterministic (.prof); sample: low-overhead sampling (.folded flamegraph stacks)'
+        )
+        if bot.profiler is None or bot.profiler.mode != profile_mode:
+            bot.profiler = Profiler(mode=profile_mode)
+    else:
+        bot.profiler = None
+
 # Main content
 col1, col2, col3 = st.columns(3)
 
@@ -475,7 +501,7 @@ with tab2:
         backtest_limit = st.number_input('Candles', min_value=50, max_value=1000, value=300)
     
     if st.button('🚀 Run Backtest', type='primary'):
-        with st.spinner('Running backtest...'):
+        with st.spinner('Running backtest...'), _profiled(bot, 'backtest'):
             result = bot.backtest(
                 bot.active_strategy,
                 backtest_symbol,
@@ -506,6 +532,27 @@ with tab2:
                 st.success('✅ Backtest complete!')
             else:
                 st.error('❌ Backtest failed')
+    
+    st.subheader('Optimize & Predict')
+    col_h, col_p = st.columns(2)
+    with col_h:
+        hyperopt_trials = st.number_input('Hyperopt trials', min_value=1, max_value=200, value=20)
+        if st.button('🎯 Run Hyperopt'):
+            ranges = {'short_window': (5, 20), 'long_window': (20, 50)}
+            with st.spinner('Optimizing parameters...'), _profiled(bot, 'hyperopt'):
+                bot.hyperopt(bot.active_strategy, ranges, trials=int(hyperopt_trials), symbol=backtest_symbol,
+                             timeframe=backtest_timeframe, limit=backtest_limit)
+            st.write('Best parameters:')
+            st.json(bot.strategies[bot.active_strategy].params)
+    with col_p:
+        st.write('Next-close prediction for the selected symbol and timeframe')
+        if st.button('🔮 Predict Next Close'):
+            with st.spinner('Training and predicting...'), _profiled(bot, 'prediction'):
+                prediction = bot.predict_latest(backtest_symbol, timeframe=backtest_timeframe, limit=backtest_limit)
+            if prediction is None:
+                st.error('❌ Prediction failed')
+            else:
+                st.metric('Predicted next close', f'${prediction:,.2f}')
 
 with tab3:
     st.subheader('Bot Control')
@@ -523,36 +570,36 @@ with tab3:
             
             progress_bar = st.progress(0)
             status_text = st.empty()
-            
-            for i in range(bot_cycles):
-                status_text.text(f'Cycle {i+1}/{bot_cycles}...')
-                progress_bar.progress((i + 1) / bot_cycles)
+            with _profiled(bot, 'bot_loop'):
+                for i in range(bot_cycles):
+                    status_text.text(f'Cycle {i+1}/{bot_cycles}...')
+                    progress_bar.progress((i + 1) / bot_cycles)
                 
-                # Run one cycle
-                try:
-                    df = bot.fetch_ohlcv_df('BTC/USDT', timeframe='5m', limit=200)
-                    if df is not None and not df.empty:
-                        strategy = bot.strategies[bot.active_strategy]
-                        df = strategy.populate_indicators(df)
-                        df = strategy.populate_entry_trend(df)
-                        df = strategy.populate_exit_trend(df)
+                    # Run one cycle
+                    try:
+                        df = bot.fetch_ohlcv_df('BTC/USDT', timeframe='5m', limit=200)
+                        if df is not None and not df.empty:
+                            strategy = bot.strategies[bot.active_strategy]
+                            df = strategy.populate_indicators(df)
+                            df = strategy.populate_entry_trend(df)
+                            df = strategy.populate_exit_trend(df)
                         
-                        latest = df.iloc[-1]
-                        entry = bool(latest.get('entry', False))
-                        exit_signal = bool(latest.get('exit', False))
+                            latest = df.iloc[-1]
+                            entry = bool(latest.get('entry', False))
+                            exit_signal = bool(latest.get('exit', False))
                         
-                        if entry and 'BTC/USDT' not in bot.positions:
-                            amount = min(bot.get_equity() * 0.01, MAX_TRADE_USD)
-                            bot.place_order('buy', 'BTC/USDT', amount)
-                            st.info(f'📝 Buy signal executed')
-                        elif exit_signal and 'BTC/USDT' in bot.positions:
-                            pos = bot.positions['BTC/USDT']
-                            bot.place_order('sell', 'BTC/USDT', pos['qty'] * float(latest['close']))
-                            st.info(f'📝 Sell signal executed')
-                except Exception as e:
-                    st.error(f'Error in cycle {i+1}: {e}')
+                            if entry and 'BTC/USDT' not in bot.positions:
+                                amount = min(bot.get_equity() * 0.01, MAX_TRADE_USD)
+                                bot.place_order('buy', 'BTC/USDT', amount)
+                                st.info(f'📝 Buy signal executed')
+                            elif exit_signal and 'BTC/USDT' in bot.positions:
+                                pos = bot.positions['BTC/USDT']
+                                bot.place_order('sell', 'BTC/USDT', pos['qty'] * float(latest['close']))
+                                st.info(f'📝 Sell signal executed')
+                    except Exception as e:
+                        st.error(f'Error in cycle {i+1}: {e}')
                 
-                time.sleep(bot_interval)
+                    time.sleep(bot_interval)
             
             status_text.text('Bot loop complete!')
             bot.save_state()
@@ -611,19 +658,20 @@ with tab4:
     if bot.trade_log:
         trades_to_show = st.slider('Show last N trades', 5, 50, 20)
         
-        trades_data = []
-        for trade in bot.trade_log[-trades_to_show:]:
-            trades_data.append({
-                'Time': trade.get('datetime', trade.get('time')),
-                'Mode': '🔴 LIVE' if trade.get('live') else '📝 PAPER',
-                'Side': trade['side'].upper(),
-                'Symbol': trade['symbol'],
-                'Amount USD': f"${trade['amount_usd']:.2f}",
-                'Price': f"${trade.get('price', 0):.2f}",
-                'Quantity': f"{trade.get('qty', 0):.6f}"
-            })
-        
-        df_trades = pd.DataFrame(trades_data)
+        # Query only the last N trades from the columnar store
+        recent = bot.trade_log.to_frame(limit=trades_to_show)
+        df_trades = pd.DataFrame({
+            'Time': recent['datetime'].dt.strftime('%Y-%m-%dT%H:%M:%S'),
+            'Mode': recent['live'].map({True: '🔴 LIVE', False: '📝 PAPER'}),
+            'Side': recent['side'].str.upper(),
+            'Symbol': recent['symbol'],
+            'Amount USD': recent['amount_usd'].map('${:.2f}'.format),
+            'Price': recent['price'].map('${:.2f}'.format),
+            'Quantity': recent['qty'].map('{:.6f}'.format),
+            # Attribution recorded with each fill: the strategy and, for an ensemble, who voted
+            'Strategy': recent['strategy'] if 'strategy' in recent else None,
+            'Votes': recent['votes'] if 'votes' in recent else None,
+        })
         st.dataframe(df_trades, use_container_width=True)
         
         # Download button
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Load driver for the backend order path.
+
+Fires concurrent orders through CryptoPiggyTop2026.place_order_backend()
+against a backend (by default a local MockBackend started in-process) and
+reports per-order latency percentiles, throughput and error counts for
+each concurrency level, so the throughput ceiling is visible as the point
+where adding workers stops adding orders/s and p99 climbs.
+
+Run with:
+    python backend_load.py                                   # local mock, 20ms latency
+    python backend_load.py --concurrency 1,8,32 --orders 500 --latency-ms 50 --max-rps 300
+    python backend_load.py --batch-size 10                   # grouped submissions via /api/trade/batch
+    python backend_load.py --url http://localhost:8000       # an already running backend
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mock_backend import MockBackend
+
+
+def percentiles(samples):
+    arr = np.asarray(samples, dtype=float) * 1000
+    if arr.size == 0:
+        return {'p50_ms': None, 'p90_ms': None, 'p99_ms': None, 'max_ms': None}
+    p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+    return {'p50_ms': float(p50), 'p90_ms': float(p90), 'p99_ms': float(p99), 'max_ms': float(arr.max())}
+
+
+def run_load(bot, orders=200, concurrency=8, symbols=('BTC/USDT', 'ETH/USDT'), amount_usd=10.0, batch_size=1):
+    """Submit `orders` buys with `concurrency` workers. Returns latency/throughput stats.
+
+    With batch_size > 1 each worker sends groups through place_orders_backend()
+    and every order in a group is charged the group's latency.
+    """
+    def outcome(result):
+        if result is None:
+            return 'no_response'
+        return str(result.get('error') or 'ok')[:60]
+
+    def submit(first):
+        group = [('buy', symbols[i % len(symbols)], amount_usd) for i in range(first, min(first + batch_size, orders))]
+        start = time.perf_counter()
+        if batch_size > 1:
+            results = bot.place_orders_backend(group, exchange=bot.exchange_name)
+        else:
+            results = [bot.place_order_backend(*group[0], exchange=bot.exchange_name)]
+        elapsed = time.perf_counter() - start
+        return [(elapsed, outcome(r)) for r in results]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = [o for group in pool.map(submit, range(0, orders, batch_size)) for o in group]
+    wall = time.perf_counter() - start
+
+    statuses = Counter(status for _, status in outcomes)
+    ok_latencies = [elapsed for elapsed, status in outcomes if status == 'ok']
+    stats = {
+        'concurrency': concurrency,
+        'batch_size': batch_size,
+        'orders': orders,
+        'ok': statuses.get('ok', 0),
+        'errors': {k: v for k, v in statuses.items() if k != 'ok'},
+        'wall_s': wall,
+        'throughput_ops': statuses.get('ok', 0) / wall if wall > 0 else 0.0,
+    }
+    stats.update(percentiles(ok_latencies))
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Concurrent order load against the backend proxy path')
+    parser.add_argument('--url', help='Backend URL; omit to start a local mock backend')
+    parser.add_argument('--user-id', default='load-test')
+    parser.add_argument('--orders', type=int, default=200, help='Orders per concurrency level')
+    parser.add_argument('--concurrency', default='1,4,16,64', help='Comma-separated worker counts')
+    parser.add_argument('--batch-size', type=int, default=1, help='Orders per place_orders_backend() call')
+    parser.add_argument('--amount-usd', type=float, default=10.0)
+    parser.add_argument('--symbols', default='BTC/USDT,ETH/USDT')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Mock backend latency')
+    parser.add_argument('--jitter-ms', type=float, default=5.0, help='Mock backend latency jitter')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Mock backend injected 500 rate')
+    parser.add_argument('--max-rps', type=float, help='Mock backend rate limit (429 beyond)')
+    parser.add_argument('--workers', type=int, help='Mock backend concurrent request limit')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args(argv)
+
+    logging.getLogger('CryptoPiggyTop').setLevel(logging.ERROR)
+    from crypto_piggy_top import CryptoPiggyTop2026
+
+    backend = None
+    url = args.url
+    if url is None:
+        backend = MockBackend(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                              max_rps=args.max_rps, workers=args.workers, starting_usdt=1e12, seed=0).start()
+        url = backend.url
+
+    bot = CryptoPiggyTop2026()
+    bot.backend_url = url
+    bot.backend_user_id = args.user_id
+    symbols = tuple(s.strip() for s in args.symbols.split(',') if s.strip())
+
+    print("=" * 96)
+    print(f"BACKEND ORDER LOAD  url={url} orders={args.orders} batch_size={args.batch_size}")
+    print("=" * 96)
+    print(f"{'conc':>5} {'ok':>6} {'err':>5} {'orders/s':>10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}  errors")
+    results = []
+    try:
+        for concurrency in (int(c) for c in args.concurrency.split(',')):
+            stats = run_load(bot, args.orders, concurrency, symbols, args.amount_usd, args.batch_size)
+            results.append(stats)
+            fmt = lambda v: f"{v:9.1f}" if v is not None else f"{'-':>9}"
+            print(f"{concurrency:>5} {stats['ok']:>6} {sum(stats['errors'].values()):>5} {stats['throughput_ops']:>10.1f} "
+                  f"{fmt(stats['p50_ms'])} {fmt(stats['p90_ms'])} {fmt(stats['p99_ms'])} {fmt(stats['max_ms'])}  "
+                  f"{dict(stats['errors']) or ''}")
+    finally:
+        if backend is not None:
+            backend.stop()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'url': url, 'results': results}, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
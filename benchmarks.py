@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the CryptoPiggy trading hot paths.
+
+Times data fetch, strategy signals, backtest, hyperopt, ML prediction
+backends, state persistence and a full start_bot() cycle at several data
+sizes, using seeded synthetic candles served by the simulated exchange (no
+network). Results are written as JSON and compared to a stored baseline.
+
+Run with:
+    python benchmarks.py                      # compare against benchmarks_baseline.json
+    python benchmarks.py --quick              # smaller sizes, fewer repeats
+    python benchmarks.py --save-baseline      # record the current run as the baseline
+Exits with status 1 if any benchmark is slower than baseline * (1 + tolerance).
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import statistics
+import contextlib
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger('CryptoPiggyBench')
+
+DEFAULT_SIZES = (500, 2000, 10000)
+QUICK_SIZES = (500, 2000)
+
+BENCHMARKS = []
+
+
+def benchmark(name, max_size=None, repeat=None):
+    """Register fn(ctx, size) -> callable (or {suffix: callable}) as a timed benchmark."""
+    def wrap(fn):
+        BENCHMARKS.append({'name': name, 'fn': fn, 'max_size': max_size, 'repeat': repeat})
+        return fn
+    return wrap
+
+
+class BenchContext:
+    """Bot wired to a simulated exchange with enough seeded candles for the largest size."""
+
+    def __init__(self, max_size, seed=42):
+        from crypto_piggy_top import CryptoPiggyTop2026
+        from sim_exchange import SimulatedExchange
+        from synthetic_market import SyntheticMarket
+
+        base_candles = (max_size + 300) * 5
+        market = SyntheticMarket(seed=seed, timeframe='1m', regimes=True, vol_clustering=0.98)
+        self.frames = market.generate(base_candles, ['BTC/USDT', 'ETH/USDT'], start_prices=[50000.0, 3000.0], start='2024-01-01')
+        self.make_exchange = lambda: SimulatedExchange(self.frames, timeframe='1m', warmup=base_candles - 1)
+        self.bot = CryptoPiggyTop2026()
+        self.bot.trade_log.clear()
+        self.bot.positions = {}
+        self.bot.exchange = self.make_exchange()
+        self._frames_5m = {}
+
+    def candles(self, size):
+        if size not in self._frames_5m:
+            self._frames_5m[size] = self.bot.fetch_ohlcv_df('BTC/USDT', '5m', limit=size)
+        return self._frames_5m[size]
+
+
+@benchmark('fetch_ohlcv_df')
+def bench_fetch(ctx, size):
+    return lambda: ctx.bot.fetch_ohlcv_df('BTC/USDT', '5m', limit=size)
+
+
+@benchmark('strategy')
+def bench_strategies(ctx, size):
+    df = ctx.candles(size)
+
+    def run(strategy):
+        frame = strategy.populate_indicators(df.copy())
+        frame = strategy.populate_entry_trend(frame)
+        return strategy.populate_exit_trend(frame)
+
+    return {key: (lambda s=strategy: run(s)) for key, strategy in ctx.bot.strategies.items()}
+
+
+@benchmark('signal_engine')
+def bench_signal_engine(ctx, size):
+    df = ctx.candles(size)
+    return lambda: ctx.bot.signal_engine.evaluate(df, ctx.bot.strategies)
+
+
+@benchmark('panel_signals', max_size=2000, repeat=3)
+def bench_panel_signals(ctx, size):
+    from panel import Panel
+    from synthetic_market import SyntheticMarket
+
+    # A 200-symbol universe: one cross-sectional pass vs one evaluation per symbol
+    frames = SyntheticMarket(seed=7, timeframe='5m').generate(size, [f'S{i}/USDT' for i in range(200)])
+    strategies = {name: ctx.bot.strategies[name] for name in ('sma_crossover', 'rsi')}
+    engine = ctx.bot.signal_engine
+    return {
+        'panel': lambda: engine.evaluate_panel(Panel(frames), strategies),
+        'per_symbol': lambda: [engine.evaluate(df, strategies, symbol) for symbol, df in frames.items()],
+    }
+
+
+@benchmark('backtest')
+def bench_backtest(ctx, size):
+    return lambda: ctx.bot.backtest('sma_crossover', 'BTC/USDT', timeframe='5m', limit=size)
+
+
+@benchmark('hyperopt', repeat=3)
+def bench_hyperopt(ctx, size):
+    original = dict(ctx.bot.strategies['sma_crossover'].params)
+
+    def run():
+        np.random.seed(0)
+        ctx.bot.hyperopt('sma_crossover', {'short_window': (5, 20), 'long_window': (20, 50)},
+                         trials=3, symbol='BTC/USDT', timeframe='5m', limit=size)
+        ctx.bot.strategies['sma_crossover'].params = dict(original)
+    return run
+
+
+@benchmark('predict_next_close_series', max_size=2000, repeat=3)
+def bench_lstm(ctx, size):
+    closes = ctx.candles(size)['close'].values
+    return lambda: ctx.bot.predict_next_close_series(closes, epochs=1)
+
+
+@benchmark('predictor_series', max_size=2000, repeat=3)
+def bench_predictors(ctx, size):
+    from predictors import PREDICTORS
+
+    # Fit + score every window per backend; `python predictors.py` adds accuracy
+    closes = ctx.candles(size)['close'].to_numpy()
+    return {name: (lambda n=name: ctx.bot.predict_next_close_series(closes, epochs=1, backend=n)) for name in PREDICTORS}
+
+
+@benchmark('lstm_inference', max_size=500)
+def bench_lstm_inference(ctx, size):
+    import torch
+    from ml import train_lstm, quantize, export_model, load_model, minmax_scale
+
+    # One full-window prediction per variant; `python ml.py --compare` adds their prediction error
+    closes = ctx.candles(size)['close'].to_numpy()
+    model = train_lstm(closes, epochs=1)
+    scaled, _, _ = minmax_scale(closes)
+    x = torch.tensor(scaled[-50:], dtype=torch.float32)[None, :, None]
+    variants = {'eager_fp32': model, 'eager_int8': quantize(model)}
+    for name, int8 in (('torchscript_fp32', False), ('torchscript_int8', True)):
+        variants[name] = load_model(export_model(model, os.path.join(os.getcwd(), f'{name}.pt'), quantize_int8=int8))
+
+    def run(m):
+        with torch.no_grad():
+            return m(x)
+    return {name: (lambda m=m: run(m)) for name, m in variants.items()}
+
+
+@benchmark('state_save_load')
+def bench_state(ctx, size):
+    bot = ctx.bot
+    bot.trade_log.clear()
+    for i in range(size):
+        bot.trade_log.record(1_700_000_000 + i, 'buy' if i % 2 == 0 else 'sell', 'BTC/USDT', 10.0, 0.0002, 50000.0, live=False)
+
+    def run():
+        bot.save_state()
+        bot.load_state()
+    return run
+
+
+@benchmark('start_bot_cycle')
+def bench_cycle(ctx, size):
+    bot = ctx.bot
+
+    def run():
+        bot.exchange = ctx.make_exchange()
+        bot.trade_log.clear()
+        bot.positions = {}
+        bot.start_bot(cycles=1, interval_seconds=0, verbose=False, limit=size)
+    return run
+
+
+def _time_callable(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(samples), 'min_s': min(samples), 'runs': repeat}
+
+
+def run_benchmarks(sizes, repeat=5, only=None):
+    """Run registered benchmarks in a scratch directory so state.json is never touched."""
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='cryptopiggy-bench-')
+    cwd = os.getcwd()
+    logging.getLogger('CryptoPiggyTop').setLevel(logging.ERROR)
+    try:
+        os.chdir(workdir)
+        ctx = BenchContext(max(sizes))
+        for bench in BENCHMARKS:
+            if only and not any(bench['name'].startswith(o) for o in only):
+                continue
+            for size in sizes:
+                if bench['max_size'] and size > bench['max_size']:
+                    continue
+                with contextlib.redirect_stdout(io.StringIO()):
+                    target = bench['fn'](ctx, size)
+                targets = target if isinstance(target, dict) else {None: target}
+                for suffix, fn in targets.items():
+                    key = f"{bench['name']}{'.' + suffix if suffix else ''}[{size}]"
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        stats = _time_callable(fn, bench['repeat'] or repeat)
+                    results[key] = stats
+                    print(f"  {key:<48} median {stats['median_s'] * 1000:10.2f} ms   min {stats['min_s'] * 1000:10.2f} ms")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def environment_info():
+    info = {
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+    for mod in ('pandas', 'torch'):
+        try:
+            info[mod] = __import__(mod).__version__
+        except Exception:
+            info[mod] = None
+    return info
+
+
+def compare(results, baseline, tolerance):
+    """Return (regressions, improvements) as lists of (key, baseline_s, current_s, ratio)."""
+    regressions, improvements = [], []
+    for key, stats in results.items():
+        base = baseline.get('results', {}).get(key)
+        if not base or not base.get('median_s'):
+            continue
+        ratio = stats['median_s'] / base['median_s']
+        row = (key, base['median_s'], stats['median_s'], ratio)
+        if ratio > 1 + tolerance:
+            regressions.append(row)
+        elif ratio < 1 - tolerance:
+            improvements.append(row)
+    return regressions, improvements
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='CryptoPiggy hot-path benchmarks')
+    parser.add_argument('--sizes', help='Comma-separated candle counts (default 500,2000,10000)')
+    parser.add_argument('--quick', action='store_true', help='Sizes 500,2000 with 3 repeats')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help='Comma-separated benchmark name prefixes')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default='benchmarks_baseline.json')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown vs baseline (0.25 = 25%%)')
+    parser.add_argument('--save-baseline', action='store_true', help='Write this run to the baseline file')
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = tuple(int(s) for s in args.sizes.split(','))
+    else:
+        sizes = QUICK_SIZES if args.quick else DEFAULT_SIZES
+    repeat = 3 if args.quick else args.repeat
+    only = [o.strip() for o in args.only.split(',')] if args.only else None
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline)
+
+    print("=" * 80)
+    print(f"CRYPTOPIGGY BENCHMARKS  sizes={list(sizes)} repeat={repeat}")
+    print("=" * 80)
+    results = run_benchmarks(sizes, repeat=repeat, only=only)
+    report = {'meta': environment_info(), 'sizes': list(sizes), 'results': results}
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {output}")
+
+    if args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline saved to {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"⚠️  No baseline at {baseline_path}; run with --save-baseline to create one")
+        return 0
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions, improvements = compare(results, baseline, args.tolerance)
+    report['comparison'] = {
+        'baseline': baseline_path,
+        'tolerance': args.tolerance,
+        'regressions': regressions,
+        'improvements': improvements,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 80)
+    print(f"COMPARISON vs {os.path.basename(baseline_path)} (tolerance {args.tolerance:.0%})")
+    print("=" * 80)
+    for key, base, cur, ratio in improvements:
+        print(f"  🟢 {key:<48} {base * 1000:9.2f} → {cur * 1000:9.2f} ms ({ratio:.2f}x)")
+    for key, base, cur, ratio in regressions:
+        print(f"  🔴 {key:<48} {base * 1000:9.2f} → {cur * 1000:9.2f} ms ({ratio:.2f}x)")
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
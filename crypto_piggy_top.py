@@ -1,18 +1,41 @@
+import io
 import time
 import json
 import os
 import logging
 import sys
 import argparse
+import threading
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from sklearn.preprocessing import MinMaxScaler
 import torch
 import torch.nn as nn
 import torch.optim as optim
-import pandas_ta as ta
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from trade_store import TradeStore
+from sim_exchange import SimulatedExchange
+from synthetic_market import SyntheticMarket
+from market_data import DataProvider, timeframe_to_ms
+from strategies import BaseStrategy, SMA_Crossover, RSI_Strategy, Ensemble, SignalEngine, PLUGIN_DIR, load_plugins
+from panel import Panel
+from ohlcv import Candles
+from ml import (LSTMPredictor, StreamingLSTM, train_multi, train_features, predict_from_features,
+                model_features, export_model, load_model)
+from features import FeatureStore
+import predictors
+from ml_worker import MLWorkerPool
+from metrics import Metrics
+from profiling import Profiler, MODES as PROFILE_MODES
+from notifier import TelegramNotifier
+from pending_orders import PendingOrders, new_client_order_id
+import health_monitor
+from execution import ExecutionPipeline
+from account import AccountModel, QUOTE_CURRENCIES
+from risk_engine import RiskEngine
 
 # Optional requests for backend proxy integration
 try:
@@ -42,63 +65,6 @@ MAX_DAILY_TRADES = 20  # Prevent runaway bot
 MAX_DAILY_LOSS_PCT = 0.05  # Auto-disable if daily loss exceeds 5%
 
 
-class BaseStrategy:
-    def __init__(self, params=None):
-        self.params = params or {}
-
-    def populate_indicators(self, df):
-        raise NotImplementedError
-
-    def populate_entry_trend(self, df):
-        raise NotImplementedError
-
-    def populate_exit_trend(self, df):
-        raise NotImplementedError
-
-
-class SMA_Crossover(BaseStrategy):
-    def populate_indicators(self, df):
-        short = int(self.params.get('short_window', 10))
-        long = int(self.params.get('long_window', 30))
-        df['sma_short'] = ta.sma(df['close'], length=short)
-        df['sma_long'] = ta.sma(df['close'], length=long)
-        return df
-
-    def populate_entry_trend(self, df):
-        df['entry'] = (df['sma_short'] > df['sma_long']) & (df['sma_short'].shift(1) <= df['sma_long'].shift(1))
-        return df
-
-    def populate_exit_trend(self, df):
-        df['exit'] = (df['sma_short'] < df['sma_long']) & (df['sma_short'].shift(1) >= df['sma_long'].shift(1))
-        return df
-
-
-class RSI_Strategy(BaseStrategy):
-    def populate_indicators(self, df):
-        period = int(self.params.get('rsi_period', 14))
-        df['rsi'] = ta.rsi(df['close'], length=period)
-        return df
-
-    def populate_entry_trend(self, df):
-        df['entry'] = df['rsi'] < 30
-        return df
-
-    def populate_exit_trend(self, df):
-        df['exit'] = df['rsi'] > 70
-        return df
-
-
-class LSTMPredictor(nn.Module):
-    def __init__(self):
-        super().__init__()
-        self.lstm = nn.LSTM(1, 64, 2, batch_first=True)
-        self.fc = nn.Linear(64, 1)
-
-    def forward(self, x):
-        out, _ = self.lstm(x)
-        return self.fc(out[:, -1, :])
-
-
 class CryptoPiggyTop2026:
     def __init__(self):
         self.paper_mode = True
@@ -110,25 +76,91 @@ class CryptoPiggyTop2026:
         self.backend_user_id = os.getenv('BACKEND_USER_ID')
         self.backend_enabled = False
         self.backend_last_health = None
+        # Latest status dict published by the shared background health monitor
+        self.backend_health = None
+        self._health_monitor = None
         try:
             self.backend_timeout = float(os.getenv('BACKEND_TIMEOUT', '5'))
         except Exception:
             self.backend_timeout = 5.0
+        # Batch orders: in-flight cap when the backend lacks /api/trade/batch (None = not probed yet)
+        self.backend_max_parallel = int(os.getenv('BACKEND_MAX_PARALLEL', '4'))
+        self._backend_batch_supported = None
+        # Order submits are idempotent (client order IDs + lookup), so they can time out fast and retry
+        self.backend_order_timeout = float(os.getenv('BACKEND_ORDER_TIMEOUT', '2'))
+        self.backend_order_retries = max(1, int(os.getenv('BACKEND_ORDER_RETRIES', '3')))
+        self.pending_orders = PendingOrders(os.getenv('PENDING_ORDERS_PATH', 'pending_orders.json'))
         # Live confirmation guards
         self._live_confirm_token = os.getenv('LIVE_CONFIRM_TOKEN')
         self._allow_live_env = os.getenv('ALLOW_LIVE') == '1'
         # CLI or runtime dry-run flag (set in __main__)
         self.dry_run = False
+        # Optional Profiler wrapping menu actions (set via --profile)
+        self.profiler = None
         # Allowed trade symbols (safety)
         self.allowed_symbols = os.getenv('ALLOWED_SYMBOLS', 'BTC/USDT,ETH/USDT').split(',')
+        # Synthetic fallback data (set SYNTHETIC_SEED for reproducible runs)
+        seed = os.getenv('SYNTHETIC_SEED')
+        self.synthetic_seed = int(seed) if seed not in (None, '') else None
+        self._synthetic_markets = {}
+        # Multi-timeframe candle cache for the current exchange (see market_data.py)
+        self._data_provider = None
+        self._data_exchange = None
         self.positions = {}
-        self.trade_log = []
+        # Running equity/PnL; live is reconciled against the balance every ACCOUNT_RECONCILE_SECONDS
+        reconcile_interval = float(os.getenv('ACCOUNT_RECONCILE_SECONDS', '300'))
+        self.paper_account = AccountModel(float(os.getenv('PAPER_STARTING_CASH', '10000')), reconcile_interval)
+        self.live_account = AccountModel(0.0, reconcile_interval)
+        # Guards positions/trade log/daily counters between the signal loop, the order worker and saves
+        self.state_lock = threading.RLock()
+        # Reason of the most recent order rejection (read it under state_lock, right after the order)
+        self.last_rejection = None
+        # Background order pipeline used by start_bot(async_orders=True)
+        self.execution = None
+        self.async_orders = os.getenv('ASYNC_ORDERS') == '1'
+        # Multi-symbol cycles evaluate signals for all symbols in one vectorized panel pass
+        self.panel_signals = os.getenv('PANEL_SIGNALS', '1') == '1'
+        self.trade_log = TradeStore(
+            archive_path=os.getenv('TRADE_ARCHIVE_PATH', 'trade_archive.jsonl'),
+            max_hot=int(os.getenv('TRADE_LOG_HOT_SIZE', '5000'))
+        )
         self.signal_log = deque(maxlen=100)
+        self.metrics = Metrics()
+        self.metrics.describe('stage_seconds', 'Latency of bot cycle and order stages')
+        self.metrics.describe('orders_total', 'Orders placed, by side and route')
+        self.metrics.describe('order_rejections_total', 'Orders rejected before submission, by reason')
+        self.metrics.describe('ccxt_retries_total', 'Retried ccxt calls, by method')
+        self.metrics.describe('backend_health_changes_total', 'Backend health transitions seen by this bot')
+        self.metrics.describe('order_retries_total', 'Order submissions resent after a timeout or 5xx, by route')
+        self.metrics.describe('order_reconciled_total', 'Orders resolved by client order ID lookup, by route and outcome')
+        self.metrics.describe('notifications_total', 'Telegram notifications, by outcome (sent/failed/dropped)')
+        self.metrics.describe('account_reconciles_total', 'Account model reconciles against the live balance, by outcome')
+        self.metrics.describe('risk_exits_total', 'Exit orders fired by the risk engine, by reason')
+        self.metrics.describe('risk_halts_total', 'Risk engine halts of new entries, by reason')
+        self.metrics.describe('order_intents_total', 'Order intents handled by the execution pipeline, by outcome')
+        self.metrics.describe('ohlcv_fetches_total', 'Exchange OHLCV fetches by the data provider, by timeframe and kind')
+        self.metrics.describe('indicator_computations_total', 'Distinct indicator series computed by the signal engine')
+        self.metrics.describe('lstm_timesteps_total', 'LSTM timesteps run by streaming inference, by mode (stream/resync)')
+        self.metrics.describe('ml_batch_size', 'Predictions per batch sent to an ML worker process')
+        self.metrics.describe('feature_rows_total', 'Feature store rows computed from new candles, by timeframe')
         self.coins = ['BTC', 'ETH', 'SOL', 'ADA', 'XRP']
+        # Computes each declared indicator once per frame across all strategies
+        self.signal_engine = SignalEngine(metrics=self.metrics)
         self.strategies = {
             'sma_crossover': SMA_Crossover({'short_window': 10, 'long_window': 30}),
             'rsi': RSI_Strategy({'rsi_period': 14}),
         }
+        # Votes every other strategy (plugins included) into one decision; select it like any strategy
+        self.strategies['ensemble'] = Ensemble(self.strategies, self.signal_engine,
+                                               {'mode': os.getenv('ENSEMBLE_MODE', 'majority')})
+        for name, cls in load_plugins(os.getenv('STRATEGY_PLUGIN_DIR', PLUGIN_DIR)).items():
+            if name in self.strategies:
+                logger.warning(f"Strategy plugin {name} ignored: name already taken by a built-in")
+                continue
+            try:
+                self.strategies[name] = cls()
+            except Exception:
+                logger.exception(f"Failed to initialize strategy plugin {name}")
         self.active_strategy = 'sma_crossover'
         self.running = False
         self.consec_losses = 0
@@ -144,7 +176,42 @@ class CryptoPiggyTop2026:
             'min_trade_size_usd': 2.0,
             'max_trade_size_usd': MAX_TRADE_USD,
         }
+        # Enforces trailing_stop_pct / max_dd_pct / max_consec_loss on every price update
+        self.risk = RiskEngine(self, poll_interval=float(os.getenv('RISK_POLL_SECONDS', '0.5')))
         self.lstm_model = LSTMPredictor()
+        # Live ML gate: per-symbol LSTM state advanced one candle per cycle (built once the model is trained)
+        self.lstm_stream = None
+        self.lstm_resync_bars = int(os.getenv('LSTM_RESYNC_BARS', '50'))
+        # Optional pre-trained artifact (TorchScript .pt / ONNX .onnx from export_lstm_model()) used instead of training
+        self.lstm_model_path = os.getenv('LSTM_MODEL_PATH')
+        # One shared model for all traded symbols (see train_multi()); training stops on validation loss, not a fixed epoch count
+        self.lstm_training = {
+            'epochs': int(os.getenv('LSTM_MAX_EPOCHS', '100')),
+            'batch_size': int(os.getenv('LSTM_BATCH_SIZE', '256')),
+            'val_frac': float(os.getenv('LSTM_VAL_FRAC', '0.2')),
+            'patience': int(os.getenv('LSTM_PATIENCE', '5')),
+            'embed': os.getenv('LSTM_SYMBOL_EMBEDDING', '0') == '1',
+            'threads': int(os.getenv('LSTM_TRAIN_THREADS', '0')) or None,
+            'checkpoint': os.getenv('LSTM_CHECKPOINT') or None,
+        }
+        self.lstm_train_bars = int(os.getenv('LSTM_TRAIN_BARS', '1000'))
+        # Model behind predict_next_close_series() (backtests): lstm, gru, ridge or gbm (see predictors.py)
+        self.ml_backend = os.getenv('ML_BACKEND', 'lstm')
+        self.lstm_history = []
+        self.lstm_timeframe = '5m'
+        # Normalized multivariate inputs (features.py), computed once per new candle and shared by training and inference
+        self.features = FeatureStore(int(os.getenv('FEATURE_STORE_ROWS', '20000')), metrics=self.metrics)
+        # LSTM_FEATURE_SET (e.g. 'default'): train the live model on that feature set instead of scaled closes
+        self.lstm_feature_set = os.getenv('LSTM_FEATURE_SET') or None
+        # ML_WORKERS > 0: training and inference run in worker processes (ml_worker.py) instead of this one
+        workers = int(os.getenv('ML_WORKERS', '0'))
+        self.ml_pool = MLWorkerPool(
+            workers,
+            threads=int(os.getenv('ML_WORKER_THREADS', '1')),
+            train_threads=self.lstm_training['threads'],
+            metrics=self.metrics,
+        ) if workers > 0 else None
+        self.lstm_training_job = None
         self.scaler = MinMaxScaler()
         self.optimizer = optim.Adam(self.lstm_model.parameters(), lr=0.0008)
         self.criterion = nn.MSELoss()
@@ -156,12 +223,34 @@ class CryptoPiggyTop2026:
                 logger.info("Telegram bot initialized.")
             except Exception:
                 self.telegram_bot = None
+        self.notifier = TelegramNotifier(
+            self.telegram_bot,
+            os.getenv('TELEGRAM_CHAT_ID'),
+            coalesce_seconds=float(os.getenv('TELEGRAM_COALESCE_SECONDS', '2')),
+            min_interval=float(os.getenv('TELEGRAM_MIN_INTERVAL', '1')),
+            metrics=self.metrics,
+        )
         self.load_state()
+        if self.lstm_model_path:
+            try:
+                self.load_lstm_model(self.lstm_model_path)
+            except Exception:
+                logger.exception(f"Failed to load LSTM model from {self.lstm_model_path}; training on first use")
         self.peak_equity = self.get_equity()
         self.daily_start_equity = self.peak_equity
 
     def setup_exchange(self):
         """Initialize exchange connection with safety checks."""
+        if self.exchange_name.lower() == 'sim':
+            data_dir = os.getenv('SIM_DATA_DIR', 'data')
+            try:
+                self.exchange = SimulatedExchange.from_directory(data_dir, timeframe=os.getenv('SIM_TIMEFRAME', '1m'))
+                logger.info(f"Simulated exchange loaded from {data_dir}: {', '.join(self.exchange.candles)}")
+            except Exception as e:
+                logger.exception("Failed to load simulated exchange data: %s", e)
+                self.exchange = None
+            return
+
         if ccxt is None:
             logger.warning("ccxt not installed; running in paper mode only.")
             self.exchange = None
@@ -188,6 +277,7 @@ class CryptoPiggyTop2026:
                     'apiKey': api_key,
                     'secret': api_secret,
                     'enableRateLimit': True,
+                    'timeout': int(os.getenv('EXCHANGE_TIMEOUT_MS', '10000')),
                     'options': {'defaultType': 'spot'},
                 })
                 logger.info(f"Exchange {self.exchange_name} initialized with API credentials")
@@ -270,25 +360,67 @@ class CryptoPiggyTop2026:
                 not self.dry_run and
                 backend_ok)
 
+    def _now(self):
+        """Current time in seconds; follows the virtual clock of a simulated exchange."""
+        if getattr(self.exchange, 'simulated', False):
+            return self.exchange.milliseconds() / 1000.0
+        return time.time()
+
+    def _sleep(self, seconds):
+        if getattr(self.exchange, 'simulated', False):
+            self.exchange.sleep(seconds * 1000)
+        else:
+            time.sleep(seconds)
+
     def set_backend(self, user_id, url=None, enabled=True):
         """Configure backend proxy settings."""
         self.backend_user_id = user_id
         if url:
             self.backend_url = url
         self.backend_enabled = bool(enabled)
+        if self.backend_enabled:
+            self.watch_backend()
+
+    def watch_backend(self):
+        """Follow the shared background health monitor for backend_url; is_live() uses its status."""
+        if not self.backend_url or requests is None:
+            return None
+        monitor = health_monitor.get_monitor(
+            self.backend_url,
+            interval=float(os.getenv('BACKEND_HEALTH_INTERVAL', '15')),
+            timeout=self.backend_timeout,
+            fail_threshold=int(os.getenv('BACKEND_HEALTH_FAIL_THRESHOLD', '2')),
+            recover_threshold=int(os.getenv('BACKEND_HEALTH_RECOVER_THRESHOLD', '2')),
+        )
+        if monitor is not self._health_monitor:
+            if self._health_monitor is not None:
+                self._health_monitor.unsubscribe(self._on_backend_health)
+            self._health_monitor = monitor
+            self.backend_last_health = monitor.healthy
+            self.backend_health = monitor.status()
+            monitor.subscribe(self._on_backend_health)
+        return monitor
+
+    def _on_backend_health(self, status):
+        if status['healthy'] != self.backend_last_health:
+            self.metrics.inc('backend_health_changes_total', healthy=status['healthy'])
+        self.backend_last_health = status['healthy']
+        self.backend_health = status
+        if status['latency_ms'] is not None:
+            self.metrics.observe('stage_seconds', status['latency_ms'] / 1000, stage='backend_health')
 
     def check_backend_health(self):
-        """Ping backend health endpoint and cache status."""
+        """Probe the backend now. Feeds the shared monitor when one is watching this URL."""
         if not self.backend_url or requests is None:
             self.backend_last_health = False
             return False
-        try:
-            resp = requests.get(f"{self.backend_url}/api/health", timeout=self.backend_timeout)
-            self.backend_last_health = resp.status_code == 200
-            return self.backend_last_health
-        except Exception:
-            self.backend_last_health = False
-            return False
+        ok, message, latency_ms = health_monitor.probe(self.backend_url, self.backend_timeout)
+        monitor = self._health_monitor
+        if monitor is not None and monitor.url == self.backend_url:
+            monitor.record(ok, message, latency_ms)
+            return ok
+        self.backend_last_health = ok
+        return ok
 
     def sync_credentials(self, api_key, api_secret, exchange='binanceus'):
         """Sync credentials to backend for validation and live trading."""
@@ -322,92 +454,244 @@ class CryptoPiggyTop2026:
         except Exception:
             return None
 
-    def place_order_backend(self, side, symbol, amount_usd, exchange='binanceus'):
-        """Place order through backend proxy."""
+    @staticmethod
+    def _backend_symbol(symbol, exchange):
+        if exchange and exchange.lower().replace('.', '') in ['binanceus', 'binance_us', 'binanceus']:
+            return symbol.replace('/', '')
+        return symbol
+
+    def place_order_backend(self, side, symbol, amount_usd, exchange='binanceus', client_order_id=None):
+        """Place order through backend proxy.
+
+        The order carries a client order ID, so a timeout can be resolved by
+        looking the order up and a retry reuses the ID (the backend dedups on
+        it). That makes short BACKEND_ORDER_TIMEOUT values safe. A failure
+        whose outcome could not be confirmed is returned with 'ambiguous': True.
+        """
         if requests is None or not self.backend_url or not self.backend_user_id:
             return None
-        normalized_symbol = symbol
-        if exchange and exchange.lower().replace('.', '') in ['binanceus', 'binance_us', 'binanceus']:
-            normalized_symbol = symbol.replace('/', '')
+        client_order_id = client_order_id or new_client_order_id()
         payload = {
             'userId': self.backend_user_id,
             'exchange': exchange,
             'side': side,
-            'symbol': normalized_symbol,
+            'symbol': self._backend_symbol(symbol, exchange),
             'symbolCcxt': symbol,
-            'amountUsd': amount_usd
+            'amountUsd': amount_usd,
+            'clientOrderId': client_order_id,
         }
+        failure = {}
+        for attempt in range(1, self.backend_order_retries + 1):
+            try:
+                resp = requests.post(f"{self.backend_url}/api/trade", json=payload, timeout=self.backend_order_timeout)
+            except Exception as e:
+                # The backend may have executed it before the connection dropped
+                found, known = self.lookup_backend_order(client_order_id)
+                if found:
+                    self.metrics.inc('order_reconciled_total', route='backend', outcome='found')
+                    return found
+                failure = {'error': str(e), 'ambiguous': not known}
+            else:
+                if resp.status_code == 200:
+                    return resp.json()
+                failure = {'error': f"backend_trade_failed_{resp.status_code}", 'body': resp.text, 'ambiguous': False}
+                if resp.status_code < 500 and resp.status_code != 429:
+                    break
+            if attempt < self.backend_order_retries:
+                self.metrics.inc('order_retries_total', route='backend')
+                time.sleep(0.1 * attempt)
+        return dict(failure, clientOrderId=client_order_id)
+
+    def lookup_backend_order(self, client_order_id):
+        """GET /api/trade/{clientOrderId}. Returns (order or None, known); known=False if the lookup itself failed."""
+        if requests is None or not self.backend_url or not self.backend_user_id:
+            return None, False
         try:
-            resp = requests.post(f"{self.backend_url}/api/trade", json=payload, timeout=self.backend_timeout)
+            resp = requests.get(f"{self.backend_url}/api/trade/{client_order_id}",
+                                params={'userId': self.backend_user_id}, timeout=self.backend_order_timeout)
+        except Exception:
+            return None, False
+        if resp.status_code == 200:
+            return resp.json(), True
+        if resp.status_code == 404:
+            return None, True
+        return None, False
+
+    def place_orders_backend(self, orders, exchange='binanceus', max_parallel=None):
+        """Submit [(side, symbol, amount_usd[, client_order_id]), ...] through the backend in one round trip.
+
+        Uses POST /api/trade/batch when the backend supports it, otherwise sends
+        the individual /api/trade requests concurrently (at most `max_parallel`
+        in flight). Every order carries a client order ID, so a timed-out batch
+        is simply resent. Returns one response dict per order, in order.
+        """
+        if requests is None or not self.backend_url or not self.backend_user_id:
+            return [None] * len(orders)
+        if not orders:
+            return []
+        orders = [tuple(o) if len(o) == 4 else (*o, new_client_order_id()) for o in orders]
+        if self._backend_batch_supported is not False:
+            payload = {
+                'userId': self.backend_user_id,
+                'exchange': exchange,
+                'orders': [
+                    {'side': side, 'symbol': self._backend_symbol(symbol, exchange), 'symbolCcxt': symbol,
+                     'amountUsd': amount_usd, 'clientOrderId': cid}
+                    for side, symbol, amount_usd, cid in orders
+                ],
+            }
+            for attempt in range(1, self.backend_order_retries + 1):
+                try:
+                    resp = requests.post(f"{self.backend_url}/api/trade/batch", json=payload, timeout=self.backend_order_timeout)
+                    break
+                except Exception as e:
+                    # Resending is safe: the backend dedups every order on its client order ID
+                    if attempt == self.backend_order_retries:
+                        return [{'error': str(e), 'ambiguous': True, 'clientOrderId': o[3]} for o in orders]
+                    self.metrics.inc('order_retries_total', route='backend_batch')
+                    time.sleep(0.1 * attempt)
             if resp.status_code == 200:
-                return resp.json()
-            return {'error': f"backend_trade_failed_{resp.status_code}", 'body': resp.text}
-        except Exception as e:
-            return {'error': str(e)}
+                self._backend_batch_supported = True
+                results = (resp.json() or {}).get('results') or []
+                if len(results) != len(orders):
+                    return [{'error': 'backend_batch_malformed', 'ambiguous': True, 'clientOrderId': o[3]} for o in orders]
+                return results
+            if resp.status_code not in (404, 405, 501):
+                return [{'error': f"backend_batch_failed_{resp.status_code}", 'body': resp.text,
+                         'ambiguous': resp.status_code >= 500, 'clientOrderId': o[3]} for o in orders]
+            logger.info("Backend has no batch endpoint; submitting orders concurrently")
+            self._backend_batch_supported = False
+        workers = max(1, min(len(orders), max_parallel or self.backend_max_parallel))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda o: self.place_order_backend(o[0], o[1], o[2], exchange=exchange, client_order_id=o[3]), orders))
+
+    @property
+    def account(self):
+        """The account model for the current mode (live or paper)."""
+        return self.live_account if self.is_live() else self.paper_account
 
     def get_equity(self):
-        """Get current portfolio value (USD equivalent)."""
-        if self.is_live() and ccxt is not None:
+        """Get current portfolio value (USD equivalent) from the running account model.
+
+        Fills and price marks keep it current in memory; the full balance
+        fetch only happens when the model is due for reconciliation.
+        """
+        if self.is_live():
+            if self.live_account.reconcile_due():
+                self.reconcile_account()
+            return self.live_account.equity
+        if self.paper_account.reconcile_due():
+            self.sync_paper_account()
+        return self.paper_account.equity
+
+    def mark_price(self, symbol, price):
+        """Feed a fresh price into both account models and the risk engine (O(1))."""
+        self.paper_account.mark(symbol, price)
+        self.live_account.mark(symbol, price)
+        self.risk.on_price(symbol, price)
+
+    def reconcile_account(self):
+        """Rebuild the live account model from the backend or exchange balance. Returns the equity drift."""
+        with self.metrics.span('equity', caller='reconcile'):
             try:
-                bal = self.safe_ccxt_call('fetch_balance')
-                if not bal:
+                if self.backend_enabled and self.backend_url and self.backend_user_id:
+                    bal = self.fetch_backend_balance()
+                else:
+                    bal = self.safe_ccxt_call('fetch_balance')
+                if not isinstance(bal, dict) or 'total' not in bal:
                     logger.warning("Failed to fetch live balance")
-                    return 0.0
+                    self.metrics.inc('account_reconciles_total', outcome='failed')
+                    return None
                 
-                total = 0.0
-                if isinstance(bal, dict) and 'total' in bal:
-                    for currency, amount in bal['total'].items():
-                        if isinstance(amount, (int, float)) and amount > 0:
-                            if currency in ['USDT', 'USD', 'USDC']:
-                                total += float(amount)
-                            else:
-                                try:
-                                    ticker = self.safe_ccxt_call('fetch_ticker', f'{currency}/USDT')
-                                    if ticker and 'last' in ticker:
-                                        total += float(amount) * float(ticker['last'])
-                                except Exception:
-                                    pass
-                return total
+                cash, holdings, marks = 0.0, {}, {}
+                for currency, amount in bal['total'].items():
+                    if not isinstance(amount, (int, float)) or amount <= 0:
+                        continue
+                    if currency in QUOTE_CURRENCIES:
+                        cash += float(amount)
+                        continue
+                    symbol = f'{currency}/USDT'
+                    holdings[symbol] = float(amount)
+                    ticker = self.safe_ccxt_call('fetch_ticker', symbol)
+                    if ticker and ticker.get('last'):
+                        marks[symbol] = float(ticker['last'])
+                drift = self.live_account.reconcile(cash, holdings, marks)
             except Exception as e:
                 logger.exception("Error fetching live equity: %s", e)
-                return 0.0
-        else:
-            total = 10000.0
-            for sym, pos in self.positions.items():
-                price = pos.get('price', 50000)
-                qty = pos.get('qty', 0)
-                total += qty * price
-            return total
+                self.metrics.inc('account_reconciles_total', outcome='failed')
+                return None
+        equity = self.live_account.equity
+        if equity > 0 and abs(drift) / equity > 0.01:
+            logger.warning(f"Account model drifted ${drift:,.2f} from the live balance; corrected")
+        self.metrics.inc('account_reconciles_total', outcome='ok')
+        return drift
+
+    def sync_paper_account(self):
+        """Take paper holdings from `positions` (the paper source of truth), keeping cash and PnL."""
+        account = self.paper_account
+        holdings = {s: float(p.get('qty', 0.0)) for s, p in self.positions.items()}
+        cost = {s: holdings[s] * float(p.get('price', 0.0)) for s, p in self.positions.items()}
+        marks = {s: float(p.get('price', 0.0)) for s, p in self.positions.items() if s not in account.marks}
+        account.reconcile(account.cash, holdings, marks, cost)
+
+    @property
+    def data(self):
+        """DataProvider for the current exchange; rebuilt when the exchange changes."""
+        provider = self._data_provider
+        if provider is None or self._data_exchange is not self.exchange:
+            exchange = self._data_exchange = self.exchange
+            base = getattr(exchange, 'timeframe', None) if getattr(exchange, 'simulated', False) else None
+            provider = DataProvider(
+                lambda symbol, timeframe, since, limit: self.safe_ccxt_call(
+                    'fetch_ohlcv', symbol, timeframe, since=since, limit=limit),
+                base_timeframe=base or os.getenv('BASE_TIMEFRAME', '1m'),
+                clock=self._now,
+                metrics=self.metrics,
+            )
+            self._data_provider = provider
+        return provider
 
     def fetch_ohlcv_df(self, symbol, timeframe='5m', limit=300):
-        """Fetch OHLCV data from exchange or generate synthetic for testing."""
-        if ccxt is not None and self.exchange is not None:
+        """Closed OHLCV bars from the exchange (via the multi-timeframe cache) or synthetic for testing."""
+        if self.exchange is not None:
             try:
-                ohlcv = self.safe_ccxt_call('fetch_ohlcv', symbol, timeframe, limit=limit)
-                if ohlcv and len(ohlcv) > 0:
-                    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                    df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+                df = self.data.ohlcv_df(symbol, timeframe, limit)
+                if len(df) > 0:
                     return df
             except Exception as e:
                 logger.warning(f"Failed to fetch OHLCV from exchange: {e}, using synthetic data")
 
         logger.info(f"Generating synthetic OHLCV data for {symbol}")
-        end = datetime.utcnow()
-        delta = {'1m': 1, '5m': 5, '15m': 15, '1h': 60, '4h': 240, '1d': 1440}.get(timeframe, 5)
-        dates = [end - timedelta(minutes=delta * i) for i in reversed(range(limit))]
-        prices = np.cumsum(np.random.normal(loc=0, scale=1, size=limit)) + 50000
-        df = pd.DataFrame({
-            'datetime': dates,
-            'open': prices + np.random.normal(0, 5, size=limit),
-            'high': prices + np.abs(np.random.normal(0, 10, size=limit)),
-            'low': prices - np.abs(np.random.normal(0, 10, size=limit)),
-            'close': prices,
-            'volume': np.abs(np.random.normal(100, 50, size=limit))
-        })
-        return df
-
-    def safe_ccxt_call(self, method_name, *args, max_retries: int = 3, backoff: float = 0.5, **kwargs):
-        """Call ccxt exchange method with retry logic and error handling."""
+        return self._synthetic_market(timeframe).generate_one(limit, symbol, end=pd.Timestamp(self._now(), unit='s'))
+
+    def fetch_candles(self, symbol, timeframe='5m', limit=300):
+        """Like fetch_ohlcv_df() but as compact ohlcv.Candles (float32 prices, no datetime column).
+
+        Used where candles are held for long (backtests, hyperopt); strategies accept them directly.
+        """
+        if self.exchange is not None:
+            try:
+                candles = self.data.candles(symbol, timeframe, limit)
+                if len(candles) > 0:
+                    return candles
+            except Exception as e:
+                logger.warning(f"Failed to fetch OHLCV from exchange: {e}, using synthetic data")
+        return Candles.from_frame(self.fetch_ohlcv_df(symbol, timeframe, limit))
+
+    def _synthetic_market(self, timeframe):
+        """One seeded generator per timeframe so repeated calls continue a reproducible sequence."""
+        if timeframe not in self._synthetic_markets:
+            seed = None if self.synthetic_seed is None else [self.synthetic_seed, sum(map(ord, timeframe))]
+            self._synthetic_markets[timeframe] = SyntheticMarket(seed=seed, timeframe=timeframe, vol_clustering=0.98)
+        return self._synthetic_markets[timeframe]
+
+    def safe_ccxt_call(self, method_name, *args, max_retries: int = 3, backoff: float = 0.5, reconcile=None, **kwargs):
+        """Call ccxt exchange method with retry logic and error handling.
+
+        For non-idempotent calls (create_order) pass `reconcile`: it is called
+        before every retry and, if it finds the order already placed, its
+        result is returned instead of submitting again.
+        """
         if self.exchange is None:
             return None
         
@@ -424,13 +708,21 @@ class CryptoPiggyTop2026:
                 if any(x in error_name for x in ['DDoSProtection', 'ExchangeNotAvailable', 'RequestTimeout', 'NetworkError']):
                     logger.warning(f"Transient error on {method_name} attempt {attempt}/{max_retries}: {e}")
                     if attempt < max_retries:
+                        self.metrics.inc('ccxt_retries_total', method=method_name, reason='transient')
                         time.sleep(backoff * attempt)
+                        found = reconcile() if reconcile is not None else None
+                        if found:
+                            return found
                         continue
                 
                 elif any(x in error_name for x in ['RateLimitExceeded', 'TooManyRequests']):
                     logger.warning(f"Rate limit hit on {method_name}, backing off: {e}")
                     if attempt < max_retries:
+                        self.metrics.inc('ccxt_retries_total', method=method_name, reason='rate_limit')
                         time.sleep(backoff * attempt * 2)
+                        found = reconcile() if reconcile is not None else None
+                        if found:
+                            return found
                         continue
                 
                 elif 'Authentication' in error_name:
@@ -447,10 +739,11 @@ class CryptoPiggyTop2026:
     def _check_daily_limits(self):
         """Check if daily trading limits allow another order."""
         # Reset daily counters if day has changed
-        current_day = datetime.utcnow().day
+        current_day = datetime.utcfromtimestamp(self._now()).day
         if current_day != self.last_trade_reset_day:
             self.daily_trades_count = 0
-            self.daily_start_equity = self.get_equity()
+            with self.metrics.span('equity', caller='daily_limits'):
+                self.daily_start_equity = self.get_equity()
             self.last_trade_reset_day = current_day
             logger.info(f"Daily limits reset for new day. Daily equity baseline: ${self.daily_start_equity:,.2f}")
         
@@ -460,7 +753,8 @@ class CryptoPiggyTop2026:
             return False
         
         # Check daily loss limit
-        current_equity = self.get_equity()
+        with self.metrics.span('equity', caller='daily_limits'):
+            current_equity = self.get_equity()
         if self.daily_start_equity > 0:
             daily_loss_pct = (self.daily_start_equity - current_equity) / self.daily_start_equity
             if daily_loss_pct > MAX_DAILY_LOSS_PCT:
@@ -472,29 +766,161 @@ class CryptoPiggyTop2026:
         
         return True
 
-    def place_order(self, side, symbol, amount_usd):
-        """Place order with comprehensive safety checks."""
+    def place_order(self, side, symbol, amount_usd, tags=None, risk_exit=False):
+        """Place order with comprehensive safety checks.
+
+        `tags` are extra trade log fields for the fill (e.g. the strategy and votes behind it).
+        `risk_exit` (risk engine stops) skips the daily limits and the minimum order size.
+        """
+        with self.state_lock, self.metrics.span('place_order'):
+            return self._place_order(side, symbol, amount_usd, tags, risk_exit)
+
+    def place_orders(self, orders, max_parallel=None):
+        """Validate and submit several orders at once (rebalances, multi-symbol signals).
+
+        `orders` is a list of (side, symbol, amount_usd) tuples or dicts with
+        those keys. Daily limits, equity and prices are looked up once for the
+        whole batch; on the live backend route the orders go out in a single
+        round trip (see place_orders_backend). Returns one result per order:
+        {'side', 'symbol', 'amount_usd', 'status': 'filled'|'rejected'|'failed',
+        'reason', 'order'}, plus 'client_order_id' for orders sent to the backend.
+        """
+        with self.state_lock, self.metrics.span('place_orders'):
+            return self._place_orders(orders, max_parallel)
+
+    def _place_orders(self, orders, max_parallel):
+        results = []
+        for o in orders:
+            side, symbol, amount_usd = (o['side'], o['symbol'], o['amount_usd']) if isinstance(o, dict) else o
+            results.append({'side': side, 'symbol': symbol, 'amount_usd': amount_usd,
+                            'status': 'rejected', 'reason': None, 'order': None})
+        if not results:
+            return results
+
+        def reject(result, reason):
+            self._reject(reason)
+            result['reason'] = reason
+
+        with self.metrics.span('daily_limits'):
+            limits_ok = self._check_daily_limits()
+        if not limits_ok:
+            logger.error("Batch rejected: daily limits exceeded")
+            for result in results:
+                reject(result, 'daily_limits')
+            return results
+
+        with self.metrics.span('equity', caller='risk_cap'):
+            equity = self.get_equity()
+        live = self.is_live()
+        # Only live fills count toward the daily cap, same as single orders
+        remaining = MAX_DAILY_TRADES - self.daily_trades_count if live else len(results)
+        accepted = []
+        for result in results:
+            side, amount_usd, reason = self._validate_order(result['side'], result['symbol'], result['amount_usd'], equity)
+            if reason:
+                reject(result, reason)
+            elif len(accepted) >= remaining:
+                logger.error(f"Daily trade limit reached: batch order {result['side']} {result['symbol']} rejected")
+                reject(result, 'daily_limits')
+            else:
+                result['side'], result['amount_usd'] = side, amount_usd
+                accepted.append(result)
+        if not accepted:
+            return results
+
+        prices = {symbol: self._order_price(symbol) for symbol in dict.fromkeys(r['symbol'] for r in accepted)}
+
+        if live and self.backend_enabled and self.backend_url and self.backend_user_id:
+            logger.info(f"🔴 LIVE BACKEND BATCH: {len(accepted)} orders")
+            for result in accepted:
+                price = prices[result['symbol']]
+                result['client_order_id'] = new_client_order_id()
+                self.pending_orders.add(result['client_order_id'], 'backend', result['side'], result['symbol'],
+                                        result['amount_usd'], result['amount_usd'] / price, price, persist=False)
+            self.pending_orders.save()
+            with self.metrics.span('order_submit', route='backend_batch'):
+                responses = self.place_orders_backend(
+                    [(r['side'], r['symbol'], r['amount_usd'], r['client_order_id']) for r in accepted],
+                    exchange=self.exchange_name, max_parallel=max_parallel,
+                )
+            for result, response in zip(accepted, responses):
+                cid = result['client_order_id']
+                if response and not response.get('error'):
+                    price = prices[result['symbol']]
+                    self._record_backend_fill(result['side'], result['symbol'], result['amount_usd'],
+                                              result['amount_usd'] / price, price, response)
+                    self.pending_orders.remove(cid, persist=False)
+                    result.update(status='filled', order=response)
+                else:
+                    logger.error(f"Live backend batch order failed: {result['side']} {result['symbol']}")
+                    self._reject('backend_failed')
+                    if response and response.get('ambiguous'):
+                        self.pending_orders.update(cid, persist=False, status='unknown')
+                    else:
+                        self.pending_orders.remove(cid, persist=False)
+                    result.update(status='failed', reason=(response or {}).get('error') or 'backend_failed', order=response)
+            self.pending_orders.save()
+        else:
+            for result in accepted:
+                order = self._execute_order(result['side'], result['symbol'], result['amount_usd'],
+                                            prices[result['symbol']], persist=False)
+                if order:
+                    result.update(status='filled', order=order)
+                else:
+                    result.update(status='failed', reason='execution_failed')
+
+        if live and any(r['status'] == 'filled' for r in accepted):
+            self.save_state()
+        return results
+
+    def _reject(self, reason):
+        self.metrics.inc('order_rejections_total', reason=reason)
+        self.last_rejection = reason
+        return None
+
+    def _place_order(self, side, symbol, amount_usd, tags=None, risk_exit=False):
         # Check daily limits first
-        if not self._check_daily_limits():
-            logger.error("Order rejected: daily limits exceeded")
-            return None
+        if not risk_exit:
+            with self.metrics.span('daily_limits'):
+                limits_ok = self._check_daily_limits()
+            if not limits_ok:
+                logger.error("Order rejected: daily limits exceeded")
+                return self._reject('daily_limits')
+        
+        side, amount_usd, reason = self._validate_order(side, symbol, amount_usd, risk_exit=risk_exit)
+        if reason:
+            return self._reject(reason)
         
+        return self._execute_order(side, symbol, amount_usd, self._order_price(symbol), tags=tags)
+
+    def _validate_order(self, side, symbol, amount_usd, equity=None, risk_exit=False):
+        """Side, whitelist, size and risk checks shared by single and batch orders.
+
+        Returns (side, capped amount_usd, None), or (None, None, reason) when rejected.
+        `equity` is looked up only if an order gets as far as the risk cap.
+        `risk_exit` (risk engine stops) skips the minimum size so small positions can still be closed.
+        """
         # Validate side
         side = side.lower()
         if side not in ['buy', 'sell']:
             logger.error(f"Invalid order side: {side}")
-            return None
+            return None, None, 'invalid_side'
+        
+        # Risk engine halt (drawdown / losing streak) blocks entries, never exits
+        if side == 'buy' and self.risk.halted:
+            logger.error(f"Order rejected: risk engine halted ({self.risk.halted})")
+            return None, None, 'risk_halted'
         
         # Symbol whitelist check
         if symbol not in self.allowed_symbols:
             logger.error(f"Symbol {symbol} not in allowed whitelist: {self.allowed_symbols}")
-            return None
+            return None, None, 'symbol_not_allowed'
         
         # Minimum trade size
         min_size = self.risk_settings.get('min_trade_size_usd', 10.0)
-        if amount_usd < min_size:
+        if amount_usd < min_size and not risk_exit:
             logger.warning(f'Order ${amount_usd:.2f} below minimum ${min_size:.2f} - rejected')
-            return None
+            return None, None, 'below_minimum'
         
         # Maximum trade size (HARD LIMIT)
         max_size = min(
@@ -506,7 +932,9 @@ class CryptoPiggyTop2026:
             amount_usd = max_size
         
         # Portfolio risk limit
-        equity = self.get_equity()
+        if equity is None:
+            with self.metrics.span('equity', caller='risk_cap'):
+                equity = self.get_equity()
         if equity > 0:
             max_allowed = equity * min(
                 self.risk_settings.get('max_position_pct', MAX_PORTFOLIO_RISK_PCT),
@@ -516,133 +944,252 @@ class CryptoPiggyTop2026:
                 logger.warning(f'Order ${amount_usd:.2f} exceeds portfolio risk limit ${max_allowed:.2f} - capping')
                 amount_usd = max_allowed
         
-        # Get current price
+        return side, amount_usd, None
+
+    def _order_price(self, symbol):
         price = 50000.0  # Default for paper mode
         if self.exchange is not None:
-            ticker = self.safe_ccxt_call('fetch_ticker', symbol)
+            with self.metrics.span('ticker'):
+                ticker = self.safe_ccxt_call('fetch_ticker', symbol)
             if ticker and 'last' in ticker:
                 price = float(ticker['last'])
-        
+                self.mark_price(symbol, price)
+        return price
+
+    def _record_backend_fill(self, side, symbol, amount_usd, qty, price, backend_order, tags=None):
+        self.metrics.inc('orders_total', side=side, route='backend')
+        self.daily_trades_count += 1
+        order_id = backend_order.get('orderId') or backend_order.get('id')
+        price = float(backend_order.get('price') or backend_order.get('avgPrice') or price)
+        pnl = self.live_account.apply_fill(side, symbol, qty, price, backend_order.get('fee') or 0.0)
+        self.trade_log.record(
+            self._now(), side, symbol, amount_usd, qty, price, live=True,
+            order_id=order_id,
+            status=backend_order.get('status', 'submitted'),
+            **(tags or {})
+        )
+        if side == 'buy':
+            self.positions[symbol] = {'qty': qty, 'price': price, 'entry_time': self._now()}
+        elif side == 'sell' and symbol in self.positions:
+            del self.positions[symbol]
+        self.risk.on_fill(side, symbol, price, pnl)
+        self.send_telegram(f"✅ LIVE {side.upper()} (backend): {qty:.6f} {symbol} @ ${price:.2f}")
+
+    def _record_exchange_fill(self, side, symbol, amount_usd, qty, price, order, tags=None):
+        self.metrics.inc('orders_total', side=side, route='exchange')
+        self.daily_trades_count += 1
+        fee = order.get('fee')
+        pnl = self.live_account.apply_fill(side, symbol, order.get('filled') or qty, order.get('average') or price,
+                                           fee.get('cost') if isinstance(fee, dict) else 0.0)
+        self.risk.on_fill(side, symbol, order.get('average') or price, pnl)
+        self.trade_log.record(
+            self._now(), side, symbol, amount_usd, qty, price, live=True,
+            order_id=order.get('id'),
+            status=order.get('status'),
+            **(tags or {})
+        )
+        self.send_telegram(f"✅ LIVE {side.upper()}: {qty:.6f} {symbol} @ ${price:.2f}")
+
+    def _settle_failed_order(self, client_order_id, response):
+        """Drop a failed order from the pending table unless its outcome is still unknown."""
+        if response and response.get('ambiguous'):
+            logger.warning(f"Order {client_order_id} outcome unknown; kept pending for reconciliation")
+            self.pending_orders.update(client_order_id, status='unknown')
+        else:
+            self.pending_orders.remove(client_order_id)
+
+    def find_exchange_order(self, client_order_id, symbol):
+        """Look an order up on the exchange by client order ID. Returns (order or None, known)."""
+        if self.exchange is None:
+            return None, False
+        has = getattr(self.exchange, 'has', {}) or {}
+        searched = False
+        for method, capability in (('fetch_open_orders', 'fetchOpenOrders'),
+                                   ('fetch_closed_orders', 'fetchClosedOrders'),
+                                   ('fetch_orders', 'fetchOrders')):
+            if not has.get(capability):
+                continue
+            orders = self.safe_ccxt_call(method, symbol, max_retries=2)
+            if orders is None:
+                return None, False
+            searched = True
+            for order in orders:
+                if order.get('clientOrderId') == client_order_id:
+                    return order, True
+        return None, searched
+
+    def reconcile_pending_orders(self):
+        """Resolve orders left pending by a timeout or restart. Returns {'found', 'not_found', 'unknown'} counts."""
+        summary = {'found': 0, 'not_found': 0, 'unknown': 0}
+        for entry in self.pending_orders.open():
+            cid, route = entry['client_order_id'], entry['route']
+            if route == 'backend':
+                order, known = self.lookup_backend_order(cid)
+            else:
+                order, known = self.find_exchange_order(cid, entry['symbol'])
+            if order:
+                args = (entry['side'], entry['symbol'], entry['amount_usd'], entry['qty'], entry['price'], order)
+                if route == 'backend':
+                    self._record_backend_fill(*args)
+                else:
+                    self._record_exchange_fill(*args)
+                self.pending_orders.remove(cid)
+                outcome = 'found'
+                logger.warning(f"Reconciled pending {route} order {cid}: it was executed")
+            elif known:
+                self.pending_orders.remove(cid)
+                outcome = 'not_found'
+                logger.warning(f"Reconciled pending {route} order {cid}: never executed")
+            else:
+                outcome = 'unknown'
+            self.metrics.inc('order_reconciled_total', route=route, outcome=outcome)
+            summary[outcome] += 1
+        if summary['found']:
+            self.save_state()
+        return summary
+
+    def _execute_order(self, side, symbol, amount_usd, price, persist=True, tags=None):
+        """Submit an already validated order on the live backend, live exchange or paper route."""
         qty = amount_usd / price
         
         # LIVE TRADING PATH
         if self.is_live() and self.backend_enabled and self.backend_url and self.backend_user_id:
             logger.info(f"🔴 LIVE BACKEND ORDER: {side.upper()} {symbol} ${amount_usd:.2f}")
-            backend_order = self.place_order_backend(side, symbol, amount_usd, exchange=self.exchange_name)
+            client_order_id = new_client_order_id()
+            self.pending_orders.add(client_order_id, 'backend', side, symbol, amount_usd, qty, price)
+            with self.metrics.span('order_submit', route='backend'):
+                backend_order = self.place_order_backend(side, symbol, amount_usd, exchange=self.exchange_name,
+                                                         client_order_id=client_order_id)
             if backend_order and not backend_order.get('error'):
-                self.daily_trades_count += 1
-                order_id = backend_order.get('orderId') or backend_order.get('id')
-                price = float(backend_order.get('price') or backend_order.get('avgPrice') or price)
-                self.trade_log.append({
-                    'time': time.time(),
-                    'datetime': datetime.utcnow().isoformat(),
-                    'side': side,
-                    'symbol': symbol,
-                    'amount_usd': amount_usd,
-                    'qty': qty,
-                    'price': price,
-                    'live': True,
-                    'order_id': order_id,
-                    'status': backend_order.get('status', 'submitted')
-                })
-                if side == 'buy':
-                    self.positions[symbol] = {'qty': qty, 'price': price, 'entry_time': time.time()}
-                elif side == 'sell' and symbol in self.positions:
-                    del self.positions[symbol]
-                self.send_telegram(f"✅ LIVE {side.upper()} (backend): {qty:.6f} {symbol} @ ${price:.2f}")
-                self.save_state()
+                with self.state_lock:
+                    self._record_backend_fill(side, symbol, amount_usd, qty, price, backend_order, tags)
+                self.pending_orders.remove(client_order_id)
+                if persist:
+                    self.save_state()
                 return backend_order
+            self._settle_failed_order(client_order_id, backend_order)
             logger.error("Live backend order failed")
-            return None
+            return self._reject('backend_failed')
 
         if self.is_live() and self.exchange is not None:
             try:
                 logger.info(f"🔴 LIVE ORDER: {side.upper()} {qty:.6f} {symbol} @ ${price:.2f} (${amount_usd:.2f})")
+                client_order_id = new_client_order_id()
+                self.pending_orders.add(client_order_id, 'exchange', side, symbol, amount_usd, qty, price)
                 
-                # Create market order
-                order = self.safe_ccxt_call(
-                    'create_order',
-                    symbol,
-                    'market',
-                    side,
-                    qty
-                )
+                # Create market order; retries first check whether the order already went through
+                with self.metrics.span('order_submit', route='exchange'):
+                    order = self.safe_ccxt_call(
+                        'create_order',
+                        symbol,
+                        'market',
+                        side,
+                        qty,
+                        params={'clientOrderId': client_order_id},
+                        reconcile=lambda: self.find_exchange_order(client_order_id, symbol)[0],
+                    )
+                    if not order:
+                        order, known = self.find_exchange_order(client_order_id, symbol)
                 
                 if order:
                     logger.info(f"✅ Live order executed: {order.get('id', 'unknown')}")
-                    self.daily_trades_count += 1
-                    
-                    # Log trade
-                    self.trade_log.append({
-                        'time': time.time(),
-                        'datetime': datetime.utcnow().isoformat(),
-                        'side': side,
-                        'symbol': symbol,
-                        'amount_usd': amount_usd,
-                        'qty': qty,
-                        'price': price,
-                        'live': True,
-                        'order_id': order.get('id'),
-                        'status': order.get('status')
-                    })
-                    
-                    # Send notification
-                    self.send_telegram(f"✅ LIVE {side.upper()}: {qty:.6f} {symbol} @ ${price:.2f}")
-                    
-                    self.save_state()
+                    with self.state_lock:
+                        self._record_exchange_fill(side, symbol, amount_usd, qty, price, order, tags)
+                    self.pending_orders.remove(client_order_id)
+                    if persist:
+                        self.save_state()
                     return order
                 else:
+                    self._settle_failed_order(client_order_id, {'ambiguous': not known})
                     logger.error("Live order failed: no response from exchange")
-                    return None
+                    return self._reject('exchange_failed')
                     
             except Exception as e:
                 logger.exception(f"Failed to place live order: {e}")
                 self.send_telegram(f"🚨 ORDER FAILED: {side} {symbol} - {str(e)[:100]}")
-                return None
+                return self._reject('exchange_error')
         
         # PAPER TRADING PATH
         else:
-            if side == 'buy':
-                self.positions[symbol] = {'qty': qty, 'price': price, 'entry_time': time.time()}
-                logger.info(f"📝 Paper BUY: {qty:.6f} {symbol} @ ${price:.2f} (${amount_usd:.2f})")
-            else:
-                if symbol in self.positions:
+            # Positions, the paper account and the sim exchange are all local state
+            with self.state_lock:
+                if side == 'sell' and symbol not in self.positions:
+                    logger.warning(f"Cannot sell {symbol}: no position")
+                    return self._reject('no_position')
+                # A simulated exchange fills paper orders against its own candles and balance
+                if getattr(self.exchange, 'simulated', False):
+                    if side == 'sell':
+                        qty = self.positions[symbol].get('qty', qty)
+                    with self.metrics.span('order_submit', route='sim'):
+                        sim_order = self.exchange.create_order(symbol, 'market', side, qty)
+                    if sim_order.get('status') != 'closed':
+                        logger.warning(f"Simulated {side} {symbol} not filled: {sim_order.get('status')}")
+                        return self._reject('sim_unfilled')
+                    price = float(sim_order['average'])
+                    amount_usd = qty * price
+                if side == 'sell':
+                    qty = self.positions[symbol].get('qty', qty)
+                realized = self.paper_account.apply_fill(side, symbol, qty, price)
+                if side == 'buy':
+                    self.positions[symbol] = {'qty': qty, 'price': price, 'entry_time': self._now()}
+                    logger.info(f"📝 Paper BUY: {qty:.6f} {symbol} @ ${price:.2f} (${amount_usd:.2f})")
+                else:
                     entry_price = self.positions[symbol].get('price', price)
                     pnl = (price - entry_price) / entry_price if entry_price > 0 else 0
                     logger.info(f"📝 Paper SELL: {qty:.6f} {symbol} @ ${price:.2f} (PnL: {pnl:.2%})")
                     del self.positions[symbol]
-                else:
-                    logger.warning(f"Cannot sell {symbol}: no position")
-                    return None
+                self.risk.on_fill(side, symbol, price, realized)
             
-            self.trade_log.append({
-                'time': time.time(),
-                'datetime': datetime.utcnow().isoformat(),
-                'side': side,
-                'symbol': symbol,
-                'amount_usd': amount_usd,
-                'qty': qty,
-                'price': price,
-                'live': False
-            })
+                self.trade_log.record(self._now(), side, symbol, amount_usd, qty, price, live=False, **(tags or {}))
+                self.metrics.inc('orders_total', side=side, route='paper')
             
-            return {'status': 'paper', 'side': side, 'symbol': symbol, 'amount': qty}
+                return {'status': 'paper', 'side': side, 'symbol': symbol, 'amount': qty}
 
-    def backtest(self, strategy_name, symbol='BTC/USDT', timeframe='1h', limit=500):
+    def backtest(self, strategy_name, symbol='BTC/USDT', timeframe='1h', limit=500, candles=None):
+        """Backtest on `candles` (ohlcv.Candles) when given, else on `limit` bars fetched for the strategy's timeframe."""
         if strategy_name not in self.strategies:
             print("Invalid strategy.")
             return
         strategy = self.strategies[strategy_name]
-        df = self.fetch_ohlcv_df(symbol, timeframe, limit)
-        if df is None or df.empty:
+        # A strategy's own timeframe param wins over the argument
+        tf = strategy.params.get('timeframe', timeframe)
+        if candles is None:
+            candles = self.fetch_candles(symbol, tf, limit)
+        if candles is None or candles.empty:
             print("No data.")
             return
-        # Allow strategies to use multiple timeframes via params
-        tf = self.strategies[strategy_name].params.get('timeframe', timeframe)
-        df = strategy.populate_indicators(df)
-        df = strategy.populate_entry_trend(df)
-        df = strategy.populate_exit_trend(df)
+        signals = self.signal_engine.evaluate(candles, {strategy_name: strategy}, symbol, self.fetch_ohlcv_df)[strategy_name]
+        df = candles.to_frame().assign(entry=signals['entry'], exit=signals['exit'])
+        result = self._simulate(df, strategy.params.get('use_ml', False), tf)
+        print(f"Backtest results: Total Return {result['total_return']:.2%}, Max DD {result['max_dd']:.2%}, Sharpe {result['sharpe']:.2f}")
+        return result
+
+    def backtest_universe(self, strategy_name, symbols, timeframe='1h', limit=500):
+        """Backtest one strategy on many symbols; signals for all of them come from one panel pass.
 
+        Returns {symbol: backtest() result}.
+        """
+        if strategy_name not in self.strategies:
+            print("Invalid strategy.")
+            return
+        strategy = self.strategies[strategy_name]
+        tf = strategy.params.get('timeframe', timeframe)
+        frames = {symbol: self.fetch_candles(symbol, tf, limit) for symbol in symbols}
+        panel = Panel(frames)
+        if not panel.symbols:
+            print("No data.")
+            return
+        view = self.signal_engine.evaluate_panel(panel, {strategy_name: strategy}, self.fetch_ohlcv_df)[strategy_name]
+        results = {}
+        for symbol in panel.symbols:
+            df = frames[symbol].to_frame().assign(entry=panel.narrow(view['entry'], symbol).astype(bool),
+                                       exit=panel.narrow(view['exit'], symbol).astype(bool))
+            results[symbol] = result = self._simulate(df, strategy.params.get('use_ml', False), tf)
+            print(f"{symbol}: Total Return {result['total_return']:.2%}, Max DD {result['max_dd']:.2%}, Sharpe {result['sharpe']:.2f}")
+        return results
+
+    def _simulate(self, df, use_ml, tf):
+        """Walk `df` (candles with entry/exit columns) with simple position sizing; returns the backtest metrics."""
         # Simulate simple position sizing and trades
         initial_cash = 10000.0
         cash = initial_cash
@@ -652,7 +1199,6 @@ class CryptoPiggyTop2026:
         strategy_returns = []
         positions = []
 
-        use_ml = self.strategies[strategy_name].params.get('use_ml', False)
         # Precompute ML prediction once on whole series (lightweight)
         ml_predictions = None
         if use_ml and hasattr(self, 'lstm_model'):
@@ -713,15 +1259,13 @@ class CryptoPiggyTop2026:
         # Sharpe ratio approximation
         rets = np.array(strategy_returns)
         if rets.std() != 0:
-            # Annualize assuming timeframe minutes
-            minutes = {'1m': 1, '5m': 5, '15m': 15, '1h': 60}.get(tf, 60)
-            periods_per_day = 24 * 60 / minutes
+            # Annualize by the bar length
+            periods_per_day = 86_400_000 / timeframe_to_ms(tf)
             annual_factor = np.sqrt(252 * periods_per_day)
             sharpe = float(rets.mean() / (rets.std() + 1e-9) * annual_factor)
         else:
             sharpe = 0.0
 
-        print(f"Backtest results: Total Return {total_return:.2%}, Max DD {max_dd:.2%}, Sharpe {sharpe:.2f}")
         return {
             'total_return': total_return,
             'max_dd': max_dd,
@@ -730,12 +1274,14 @@ class CryptoPiggyTop2026:
             'positions': positions
         }
 
-    def hyperopt(self, strategy_name, param_ranges, trials=20):
+    def hyperopt(self, strategy_name, param_ranges, trials=20, symbol='BTC/USDT', timeframe='1h', limit=500):
         if strategy_name not in self.strategies:
             print("Invalid.")
             return
         best_score = -np.inf
         best_params = {}
+        # Every trial backtests the same bars; hold one compact copy instead of refetching per trial
+        candles = self.fetch_candles(symbol, timeframe, limit)
         for _ in range(trials):
             params = {}
             for k, v in param_ranges.items():
@@ -744,7 +1290,8 @@ class CryptoPiggyTop2026:
                 else:
                     params[k] = float(np.random.uniform(v[0], v[1]))
             self.strategies[strategy_name].params = params
-            score = self.backtest(strategy_name)
+            result = self.backtest(strategy_name, symbol, timeframe, limit, candles=candles)
+            score = result.get('total_return') if isinstance(result, dict) else None
             if score is not None and score > best_score:
                 best_score = score
                 best_params = params
@@ -752,12 +1299,8 @@ class CryptoPiggyTop2026:
         print(f"Best params: {best_params} with score {best_score:.2%}")
 
     def send_telegram(self, message):
-        chat_id = os.getenv('TELEGRAM_CHAT_ID')
-        if self.telegram_bot and chat_id:
-            try:
-                self.telegram_bot.send_message(chat_id, message)
-            except Exception:
-                logger.exception("Failed to send telegram message")
+        """Queue a Telegram alert; delivery happens on the notifier's background thread."""
+        self.notifier.notify(message)
 
     def status(self):
         """Display current bot status."""
@@ -767,10 +1310,21 @@ class CryptoPiggyTop2026:
         print("="*60)
         print(f"Active Strategy: {self.active_strategy}")
         print(f"Equity: ${self.get_equity():,.2f}")
+        account = self.account
+        print(f"PnL: realized ${account.realized_pnl:,.2f} | unrealized ${account.unrealized_pnl:,.2f}")
         print(f"Open Positions: {len(self.positions)}")
         print(f"Total Trades: {len(self.trade_log)}")
         print(f"Daily Trades: {self.daily_trades_count}/{MAX_DAILY_TRADES}")
         print(f"Consecutive Losses: {self.consec_losses}")
+        if self.risk.halted:
+            print(f"🛑 Risk halt: {self.risk.halted} (new entries blocked)")
+        summary = self.metrics.summary()
+        if summary['stages']:
+            print("Latency p50/p95 (ms):")
+            for stage, st in sorted(summary['stages'].items()):
+                print(f"  {stage:<22} {st['p50_ms']:8.2f} / {st['p95_ms']:8.2f}  (n={st['count']})")
+        if summary['counters']:
+            print("Counters: " + ", ".join(f"{k}={v}" for k, v in sorted(summary['counters'].items())))
         if self.is_live():
             print(f"⚠️  LIVE TRADING ENABLED - Real money at risk!")
         print("="*60 + "\n")
@@ -816,7 +1370,10 @@ class CryptoPiggyTop2026:
         # Enable live mode
         self.paper_mode = False
         self.live_confirmed = True
+        self.live_account.expire()
         self.daily_start_equity = self.get_equity()
+        # Drawdown is tracked per account; start the live peak from the live balance
+        self.peak_equity = self.daily_start_equity
         
         print("\n✅ LIVE TRADING ENABLED")
         self.send_telegram("🔴 Live trading mode ENABLED")
@@ -829,73 +1386,44 @@ class CryptoPiggyTop2026:
         if self.is_live():
             self.paper_mode = True
             self.live_confirmed = False
+            self.peak_equity = self.paper_account.equity
             print("✅ Live trading disabled - switched to paper mode")
             self.send_telegram("✅ Live trading mode DISABLED - now in paper mode")
             logger.info("Live trading disabled")
         else:
             print("Already in paper mode")
 
-    def predict_next_close_series(self, closes, window=50, predict_horizon=1, epochs=5):
-        """Train a small LSTM on historical closes and predict next values for each timestep.
+    def predict_next_close_series(self, closes, window=50, predict_horizon=1, epochs=5, backend=None):
+        """Train a small model on historical closes and predict next values for each timestep.
 
-        Returns an array of predicted next closes aligned with input length (predictions start at index window-1).
+        `backend` (default `ml_backend`, ML_BACKEND) is a predictors.py backend;
+        `epochs` applies to the lstm and gru ones. Returns an array of predicted
+        next closes aligned with input length (predictions start at index window-1).
         """
         if len(closes) < window + 1:
             return None
-        # prepare sequences
-        arr = np.array(closes).astype(float)
-        # scale
-        minv, maxv = arr.min(), arr.max()
-        denom = maxv - minv if maxv != minv else 1.0
-        scaled = (arr - minv) / denom
-
-        X = []
-        y = []
-        for i in range(len(scaled) - window):
-            X.append(scaled[i:i+window])
-            y.append(scaled[i+window])
-        X = np.array(X)
-        y = np.array(y)
-
-        # convert to torch
+        backend = backend or self.ml_backend
         try:
-            model = LSTMPredictor()
-            optim_local = optim.Adam(model.parameters(), lr=0.001)
-            loss_fn = nn.MSELoss()
-            model.train()
-            X_t = torch.tensor(X[:, :, None], dtype=torch.float32)
-            y_t = torch.tensor(y[:, None], dtype=torch.float32)
-            for epoch in range(epochs):
-                optim_local.zero_grad()
-                pred = model(X_t)
-                loss = loss_fn(pred, y_t)
-                loss.backward()
-                optim_local.step()
-
-            model.eval()
-            preds = []
-            with torch.no_grad():
-                for i in range(len(X)):
-                    seq = X[i:i+1, :, None]
-                    p = model(torch.tensor(seq, dtype=torch.float32)).numpy().ravel()[0]
-                    preds.append(p * denom + minv)
-            # Align predictions: pad initial window-1 with None
-            preds_full = [None] * (window) + list(preds)
-            # Trim to input length
-            preds_full = preds_full[:len(closes)]
-            return np.array([p if p is not None else closes[i] for i, p in enumerate(preds_full)])
+            if self.ml_pool is not None:
+                # Train and score in a worker process so the loop, orders and UI keep running
+                return self.ml_pool.predict_series(closes, window, epochs, backend).result()
+            return predictors.predict_series(closes, window, backend, {'epochs': epochs})
         except Exception:
             logger.exception("LSTM prediction failed")
             return None
 
     def save_state(self):
-        state = {
-            'positions': self.positions,
-            'trade_log': self.trade_log,
-            'strategies': {k: v.params for k, v in self.strategies.items()},
-            'paper_mode': self.paper_mode,
-            'active_strategy': self.active_strategy
-        }
+        # Snapshot under the lock; the file write happens outside it so orders aren't held up
+        with self.state_lock:
+            state = {
+                'positions': {k: dict(v) for k, v in self.positions.items()},
+                'trade_log': self.trade_log.hot_records(),
+                'trade_archive': self.trade_log.archive_state(),
+                'strategies': {k: dict(v.params) for k, v in self.strategies.items()},
+                'paper_mode': self.paper_mode,
+                'active_strategy': self.active_strategy,
+                'paper_account': self.paper_account.snapshot(),
+            }
         with open('state.json', 'w') as f:
             json.dump(state, f, indent=2)
 
@@ -905,7 +1433,9 @@ class CryptoPiggyTop2026:
                 with open('state.json', 'r') as f:
                     state = json.load(f)
                 self.positions = state.get('positions', {})
-                self.trade_log = state.get('trade_log', [])
+                if 'paper_account' in state:
+                    self.paper_account.restore(state['paper_account'])
+                self.trade_log.restore(state.get('trade_log', []), state.get('trade_archive'))
                 strat = state.get('strategies', {})
                 for k, v in strat.items():
                     if k in self.strategies:
@@ -914,6 +1444,158 @@ class CryptoPiggyTop2026:
                 self.active_strategy = state.get('active_strategy', self.active_strategy)
             except Exception:
                 logger.exception("Failed to load state.json")
+        self.sync_paper_account()
+
+    def _run_action(self, label, fn, *args, **kwargs):
+        """Run a menu action, under the profiler when one is configured."""
+        if self.profiler is None:
+            return fn(*args, **kwargs)
+        result = self.profiler.run(label, fn, *args, **kwargs)
+        report = self.profiler.last_report
+        print(f"\n🔬 Profile ({report['mode']}, {report['elapsed_s']:.2f}s): {report['profile_path']}")
+        print(report['summary'])
+        return result
+
+    def train_lstm_model(self, series, window=50):
+        """(Re)train the live model on {symbol: closes} with the `lstm_training` settings and restart every stream from it.
+
+        With an ML worker pool the job runs in its training process and this
+        returns its Future at once; predictions are unavailable (None) until
+        it finishes.
+        """
+        if self.ml_pool is not None:
+            params = {k: v for k, v in self.lstm_training.items() if k != 'threads'}
+            self.lstm_training_job = self.ml_pool.train(series, window, **params)
+            self.lstm_training_job.add_done_callback(self._lstm_trained)
+            return self.lstm_training_job
+        self.lstm_model, self.lstm_history = train_multi(series, window, **self.lstm_training)
+        self.lstm_stream = StreamingLSTM(self.lstm_model, window, self.lstm_resync_bars, metrics=self.metrics)
+        return self.lstm_model
+
+    def _lstm_trained(self, job):
+        # Finished either way: a failed job must not block the next training attempt
+        if self.lstm_training_job is job:
+            self.lstm_training_job = None
+        if job.exception() is not None:
+            logger.error(f"LSTM training job failed: {job.exception()}; retrying on the next cycle")
+            return
+        result = job.result()
+        model = LSTMPredictor(result['symbols'] or None)
+        model.load_state_dict(torch.load(io.BytesIO(result['state']), weights_only=True))
+        self.lstm_model, self.lstm_history = model.eval(), result['history']
+
+    def train_lstm_features(self, symbols, timeframe='5m', window=50):
+        """(Re)train the live model on the stored `lstm_feature_set` rows of `symbols`.
+
+        Feature models always train and predict in this process; the ML
+        worker pool only serves closes-only models.
+        """
+        self.lstm_model, self.lstm_history = train_features(
+            self.features, symbols, timeframe, self.lstm_feature_set, window, **self.lstm_training)
+        self.lstm_stream = None
+        self.lstm_timeframe = timeframe
+        return self.lstm_model
+
+    def train_lstm_universe(self, symbols=None, timeframe='5m', limit=None, window=50):
+        """Train the shared live model on the last `limit` (LSTM_TRAIN_BARS) candles of every symbol."""
+        series = {}
+        for symbol in symbols or self.allowed_symbols:
+            df = self.fetch_ohlcv_df(symbol, timeframe=timeframe, limit=limit or self.lstm_train_bars)
+            if df is not None and len(df) > window + 1:
+                series[symbol] = df['close'].to_numpy(dtype=float)
+                if self.lstm_feature_set:
+                    self.features.update(symbol, timeframe, df, self.lstm_feature_set)
+        if self.lstm_feature_set:
+            return self.train_lstm_features(list(series), timeframe, window)
+        self.lstm_timeframe = timeframe
+        return self.train_lstm_model(series, window)
+
+    def export_lstm_model(self, path, quantize_int8=False):
+        """Save the live model as TorchScript (.pt) or ONNX (.onnx), optionally int8-quantized, for LSTM_MODEL_PATH."""
+        if not isinstance(self.lstm_model, LSTMPredictor):
+            raise ValueError('Only a trained eager model can be exported')
+        return export_model(self.lstm_model, path, quantize_int8=quantize_int8)
+
+    def load_lstm_model(self, path, window=50):
+        """Serve live predictions from an exported artifact; it is used as-is, never retrained."""
+        model = load_model(path)
+        if model_features(model):
+            self.lstm_model, self.lstm_stream = model, None
+        else:
+            if self.ml_pool is not None:
+                self.ml_pool.load_model(path)
+            self.lstm_model = model
+            self.lstm_stream = StreamingLSTM(self.lstm_model, window, self.lstm_resync_bars, metrics=self.metrics)
+        logger.info(f"Loaded LSTM model from {path}")
+        return self.lstm_model
+
+    def predict_next_close(self, symbol, df, window=50, timeframe=None):
+        """Next-close prediction after the last candle of `df`, advancing `symbol`'s LSTM stream.
+
+        Without a model (start_bot() trains one for all its symbols first) it
+        is trained on this symbol; after that each call only feeds the
+        candles that arrived since the last one. Feature models instead add
+        those candles to the feature store and read the newest `window` rows.
+        """
+        if df is None or len(df) < window + 1:
+            return None
+        if self.lstm_feature_set or model_features(self.lstm_model):
+            return self._predict_from_features(symbol, df, window, timeframe or self.lstm_timeframe)
+        if self.ml_pool is not None:
+            return self.predict_next_closes({symbol: df}, window).get(symbol)
+        closes = df['close'].to_numpy(dtype=float)
+        try:
+            if self.lstm_stream is None:
+                self.train_lstm_model({symbol: closes}, window)
+            return self.lstm_stream.predict(symbol, closes, df['timestamp'].to_numpy())
+        except Exception:
+            logger.exception("LSTM prediction failed")
+            return None
+
+    def _predict_from_features(self, symbol, df, window, timeframe):
+        try:
+            names = model_features(self.lstm_model) or self.lstm_feature_set
+            self.features.update(symbol, timeframe, df, names)
+            if not model_features(self.lstm_model):
+                self.train_lstm_features([symbol], timeframe, window)
+            return predict_from_features(self.lstm_model, self.features, symbol, timeframe, window)
+        except Exception:
+            logger.exception("LSTM prediction failed")
+            return None
+
+    def predict_next_closes(self, frames, window=50, timeframe=None):
+        """{symbol: df} -> {symbol: next-close prediction or None}.
+
+        With an ML worker pool all requests go out together and are answered
+        in shared batches; training (if no model exists yet) is started in the
+        background and these return None until it is done.
+        """
+        if self.ml_pool is None or self.lstm_feature_set or model_features(self.lstm_model):
+            return {symbol: self.predict_next_close(symbol, df, window, timeframe) for symbol, df in frames.items()}
+        frames = {s: df for s, df in frames.items() if df is not None and len(df) > window + 1}
+        if not self.ml_pool.ready:
+            if frames and self.lstm_training_job is None:
+                self.train_lstm_model({s: df['close'].to_numpy(dtype=float) for s, df in frames.items()}, window)
+            return {symbol: None for symbol in frames}
+        try:
+            return self.ml_pool.predict_many({s: df['close'].to_numpy(dtype=float) for s, df in frames.items()})
+        except Exception:
+            logger.exception("LSTM prediction failed")
+            return {symbol: None for symbol in frames}
+
+    def predict_latest(self, symbol='BTC/USDT', timeframe='5m', limit=300):
+        """Predict the next close for `symbol` from recent candles."""
+        df = self.fetch_ohlcv_df(symbol, timeframe=timeframe, limit=limit)
+        if df is None or df.empty:
+            print("No data.")
+            return None
+        preds = self.predict_next_close_series(df['close'].values)
+        if preds is None:
+            print("Prediction failed.")
+            return None
+        last_close = float(df['close'].iloc[-1])
+        print(f"{symbol} last close ${last_close:,.2f} → predicted next ${float(preds[-1]):,.2f}")
+        return float(preds[-1])
 
     def menu(self):
         """Interactive CLI menu."""
@@ -928,6 +1610,7 @@ class CryptoPiggyTop2026:
             print("7. Start Bot Loop (simulation)")
             print("8. Save State & Exit")
             print("9. View Recent Trades")
+            print("10. LSTM Prediction")
             ch = input("\n→ ").strip()
 
             if ch == '1':
@@ -951,7 +1634,7 @@ class CryptoPiggyTop2026:
             elif ch == '5':
                 symbol = input('Symbol (default BTC/USDT) → ').strip() or 'BTC/USDT'
                 timeframe = input('Timeframe (default 5m) → ').strip() or '5m'
-                self.backtest(self.active_strategy, symbol, timeframe)
+                self._run_action('backtest', self.backtest, self.active_strategy, symbol, timeframe)
             
             elif ch == '6':
                 print("Running hyperparameter optimization...")
@@ -960,13 +1643,13 @@ class CryptoPiggyTop2026:
                     'long_window': (20, 50)
                 }
                 trials = int(input('Number of trials (default 20) → ').strip() or 20)
-                self.hyperopt(self.active_strategy, ranges, trials)
+                self._run_action('hyperopt', self.hyperopt, self.active_strategy, ranges, trials)
             
             elif ch == '7':
                 cycles = int(input('Cycles to run (default 6) → ').strip() or 6)
                 interval = int(input('Interval seconds (default 5) → ').strip() or 5)
                 print(f'\nStarting bot loop for {cycles} cycles...')
-                self.start_bot(cycles=cycles, interval_seconds=interval)
+                self._run_action('bot_loop', self.start_bot, cycles=cycles, interval_seconds=interval)
             
             elif ch == '8':
                 self.save_state()
@@ -975,86 +1658,224 @@ class CryptoPiggyTop2026:
             
             elif ch == '9':
                 print(f"\nRecent Trades (last 10):")
-                for trade in self.trade_log[-10:]:
+                for trade in self.trade_log.tail(10):
                     mode = "🔴LIVE" if trade.get('live') else "📝PAPER"
                     print(f"{mode} {trade.get('datetime', trade.get('time'))}: "
                           f"{trade['side'].upper()} {trade['symbol']} "
-                          f"${trade['amount_usd']:.2f}")
+                          f"${trade['amount_usd']:.2f}"
+                          + (f" [{trade['strategy']}{': ' + trade['votes'] if trade.get('votes') else ''}]" if trade.get('strategy') else ''))
+            
+            elif ch == '10':
+                symbol = input('Symbol (default BTC/USDT) → ').strip() or 'BTC/USDT'
+                self._run_action('prediction', self.predict_latest, symbol)
             
             else:
                 print('❌ Unknown option')
 
-    def start_bot(self, cycles: int = 6, interval_seconds: int = 5):
-        """Run bot loop for testing/simulation."""
+    def start_execution(self, max_queue=1000, save_interval=None):
+        """Start (or return) the background order pipeline; see execution.py."""
+        if self.execution is None or not self.execution.running:
+            if save_interval is None:
+                save_interval = float(os.getenv('STATE_SAVE_INTERVAL', '1'))
+            self.execution = ExecutionPipeline(self, max_queue=max_queue, save_interval=save_interval).start()
+        return self.execution
+
+    def stop_execution(self, timeout=10.0):
+        """Finish queued orders and persist state. Safe to call when the pipeline never started."""
+        if self.execution is not None:
+            self.execution.stop(timeout)
+
+    def start_bot(self, cycles: int = 6, interval_seconds: int = 5, verbose: bool = True, limit: int = 200,
+                  symbols=None, async_orders=None, panel=None):
+        """Run bot loop for testing/simulation.
+
+        With `async_orders` (default: ASYNC_ORDERS=1) signals only enqueue order
+        intents on the execution pipeline, so a slow order for one symbol never
+        delays signal generation for the others. With `panel` (default:
+        PANEL_SIGNALS, on) several symbols are evaluated in one vectorized pass.
+        """
         mode = "🔴 LIVE" if self.is_live() else "📝 PAPER"
-        print(f'\n{mode} Bot loop starting...\n')
+        if verbose:
+            print(f'\n{mode} Bot loop starting...\n')
         
         strategy = self.strategies.get(self.active_strategy)
-        symbol = 'BTC/USDT'
+        symbols = list(symbols or ['BTC/USDT'])
+        if async_orders is None:
+            async_orders = self.async_orders
+        pipeline = self.start_execution() if async_orders else None
+        if panel is None:
+            panel = self.panel_signals
+        if len(self.pending_orders):
+            self.reconcile_pending_orders()
+        # Between cycles the risk poller watches held symbols; simulated clocks only move per cycle
+        simulated = getattr(self.exchange, 'simulated', False)
+        poll_risk = self.exchange is not None and not simulated and not self.risk.running
+        if poll_risk:
+            self.risk.start()
+        has_model = (self.lstm_stream is not None or model_features(self.lstm_model)
+                     or (self.ml_pool is not None and self.ml_pool.ready))
+        needs_model = not has_model and self.lstm_training_job is None
+        if strategy is not None and strategy.params.get('use_ml') and needs_model:
+            # One model over every symbol's history, not one per symbol on first use
+            try:
+                self.train_lstm_universe(symbols, strategy.params.get('timeframe', '5m'))
+            except Exception:
+                logger.exception("Shared LSTM training failed; falling back to per-symbol training")
         
         for i in range(cycles):
-            print(f"--- Cycle {i+1}/{cycles} ---")
+            if verbose:
+                print(f"--- Cycle {i+1}/{cycles} ---")
             
-            # Fetch data
+            cycle_start = time.perf_counter()
+            # Positions for a symbol with an order still in flight are not known yet
+            ready = [s for s in symbols if pipeline is None or not pipeline.pending(s)]
+            if panel and len(ready) > 1:
+                self._run_panel(strategy, ready, limit, pipeline, verbose)
+            else:
+                for symbol in ready:
+                    self._run_symbol(strategy, symbol, limit, pipeline, verbose)
+            
+            self.metrics.observe('stage_seconds', time.perf_counter() - cycle_start, stage='cycle')
+            # Simulated clocks jump on sleep; let queued orders (incl. risk exits) fill at this candle first
+            if self.execution is not None and simulated:
+                self.execution.drain()
+            self._sleep(interval_seconds)
+        
+        if poll_risk:
+            self.risk.stop()
+        if verbose:
+            print(f'\n{mode} Bot loop complete!')
+        if self.execution is not None:
+            self.execution.drain()
+        self.save_state()
+
+    def _run_symbol(self, strategy, symbol, limit, pipeline, verbose):
+        """One signal evaluation for `symbol`; orders go to `pipeline` when given."""
+        # Fetch data
+        with self.metrics.span('ohlcv_fetch'):
             df = self.fetch_ohlcv_df(
                 symbol,
                 timeframe=strategy.params.get('timeframe', '5m'),
-                limit=200
+                limit=limit
             )
-            
-            if df is None or df.empty:
-                logger.warning(f'No OHLCV data available for cycle {i+1}')
-                time.sleep(interval_seconds)
-                continue
-            
-            # Generate signals
-            df = strategy.populate_indicators(df)
-            df = strategy.populate_entry_trend(df)
-            df = strategy.populate_exit_trend(df)
-            
-            latest = df.iloc[-1]
-            entry = bool(latest.get('entry', False))
-            exit_signal = bool(latest.get('exit', False))
-            price = float(latest['close'])
-            
-            # ML enhancement
-            use_ml = strategy.params.get('use_ml', False)
-            ml_ok = True
-            if use_ml:
-                preds = self.predict_next_close_series(df['close'].values)
-                if preds is not None:
-                    ml_ok = preds[-1] > price
-                else:
-                    ml_ok = False
-            
-            print(f"Price: ${price:.2f} | Entry: {entry} | Exit: {exit_signal} | ML: {ml_ok if use_ml else 'N/A'}")
-            
-            # Execute trades
-            if entry and ml_ok and symbol not in self.positions:
+        
+        if df is None or df.empty:
+            logger.warning(f'No OHLCV data available for {symbol}')
+            return
+        
+        # Generate signals
+        with self.metrics.span('indicators'):
+            signals = self.signal_engine.evaluate(df, {self.active_strategy: strategy}, symbol, self.fetch_ohlcv_df)
+        self._act_on_signal(strategy, symbol, df, signals[self.active_strategy].iloc[-1], pipeline, verbose)
+
+    def _run_panel(self, strategy, symbols, limit, pipeline, verbose):
+        """One signal evaluation for all `symbols` at once on a time x symbol panel."""
+        timeframe = strategy.params.get('timeframe', '5m')
+        with self.metrics.span('ohlcv_fetch'):
+            frames = {symbol: self.fetch_ohlcv_df(symbol, timeframe=timeframe, limit=limit) for symbol in symbols}
+        for symbol in [s for s, df in frames.items() if df is None or df.empty]:
+            logger.warning(f'No OHLCV data available for {symbol}')
+            del frames[symbol]
+        if not frames:
+            return
+        
+        with self.metrics.span('indicators'):
+            panel = Panel(frames)
+            signals = self.signal_engine.evaluate_panel(panel, {self.active_strategy: strategy}, self.fetch_ohlcv_df)
+            latest = panel.latest(signals[self.active_strategy])
+        ml_preds = None
+        if strategy.params.get('use_ml', False):
+            # One round of predictions for the whole universe (batched in the ML workers)
+            with self.metrics.span('lstm'):
+                ml_preds = self.predict_next_closes(frames, timeframe=strategy.params.get('timeframe', '5m'))
+        for symbol in panel.symbols:
+            self._act_on_signal(strategy, symbol, frames[symbol], latest[symbol], pipeline, verbose, ml_preds)
+
+    def _act_on_signal(self, strategy, symbol, df, latest, pipeline, verbose, ml_preds=None):
+        """Turn the latest signal row for `symbol` into an order (through `pipeline` when given).
+
+        `ml_preds` ({symbol: prediction}) replaces the per-symbol LSTM call.
+        """
+        entry = bool(latest.get('entry', False))
+        exit_signal = bool(latest.get('exit', False))
+        price = float(df['close'].iloc[-1])
+        self.mark_price(symbol, price)
+        
+        # ML enhancement
+        use_ml = strategy.params.get('use_ml', False)
+        ml_ok = True
+        if use_ml:
+            if ml_preds is not None:
+                pred = ml_preds.get(symbol)
+            else:
+                with self.metrics.span('lstm'):
+                    pred = self.predict_next_close(symbol, df, timeframe=strategy.params.get('timeframe', '5m'))
+            ml_ok = pred is not None and pred > price
+        
+        if verbose:
+            print(f"{symbol} Price: ${price:.2f} | Entry: {entry} | Exit: {exit_signal} | ML: {ml_ok if use_ml else 'N/A'}")
+        
+        # Execute trades
+        submit = pipeline.submit if pipeline is not None else self.place_order
+        if entry and ml_ok and symbol not in self.positions:
+            with self.metrics.span('equity', caller='sizing'):
                 equity = self.get_equity()
-                amount = min(
-                    equity * self.risk_settings.get('max_position_pct', 0.01),
-                    MAX_TRADE_USD
-                )
-                self.place_order('buy', symbol, amount)
-            
-            elif exit_signal and symbol in self.positions:
-                pos = self.positions[symbol]
-                amount = pos['qty'] * price
-                self.place_order('sell', symbol, amount)
-            
-            time.sleep(interval_seconds)
+            amount = min(
+                equity * self.risk_settings.get('max_position_pct', 0.01),
+                MAX_TRADE_USD
+            )
+            submit('buy', symbol, amount, tags=self._signal_tags(latest, 'entry'))
         
-        print(f'\n{mode} Bot loop complete!')
-        self.save_state()
+        elif exit_signal and symbol in self.positions:
+            pos = self.positions[symbol]
+            amount = pos['qty'] * price
+            submit('sell', symbol, amount, tags=self._signal_tags(latest, 'exit'))
+
+    def _signal_tags(self, latest, kind):
+        """Trade log attribution for a signal: the strategy, plus the voters and score for an ensemble."""
+        tags = {'strategy': self.active_strategy}
+        if f'{kind}_votes' in latest:
+            tags['votes'] = latest[f'{kind}_votes']
+            tags['score'] = round(float(latest[f'{kind}_score']), 4)
+        return tags
+
+    def replay(self, sim_exchange, interval_seconds=300, cycles=None, verbose=False):
+        """Replay stored candles through start_bot() on a simulated exchange (paper mode only).
+
+        Returns the trades made during the replay.
+        """
+        if not getattr(sim_exchange, 'simulated', False):
+            raise ValueError('replay() requires a simulated exchange')
+        if self.is_live():
+            raise RuntimeError('Disable live trading before replaying market data')
+        self.exchange = sim_exchange
+        self.paper_mode = True
+        if cycles is None:
+            cycles = sim_exchange.steps_remaining(interval_seconds)
+        start = self._now()
+        self.start_bot(cycles=cycles, interval_seconds=interval_seconds, verbose=verbose)
+        return self.trade_log.query(start=start)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='CryptoPiggy Trading Bot')
     parser.add_argument('--dry-run', action='store_true', help='Dry-run mode (no real orders)')
+    parser.add_argument('--metrics-port', type=int, default=int(os.getenv('METRICS_PORT', '0')),
+                        help='Serve Prometheus metrics on this local port (0 = disabled)')
+    parser.add_argument('--profile', choices=PROFILE_MODES, help='Profile menu actions (deterministic cprofile or sampling)')
+    parser.add_argument('--profile-dir', default='profiles', help='Where profile output is written')
+    parser.add_argument('--profile-top', type=int, default=25, help='Hotspots listed in the profile summary')
     args = parser.parse_args()
     
     bot = CryptoPiggyTop2026()
+    if args.profile:
+        bot.profiler = Profiler(mode=args.profile, out_dir=args.profile_dir, top_n=args.profile_top)
+        logger.info(f'🔬 Profiling enabled ({args.profile}); output in {args.profile_dir}/')
+    if args.metrics_port:
+        bot.metrics.start_http_server(args.metrics_port)
+    
+    if len(bot.pending_orders):
+        print(f"Reconciling pending live orders: {bot.reconcile_pending_orders()}")
     
     if args.dry_run:
         bot.dry_run = True
@@ -1073,3 +1894,8 @@ if __name__ == "__main__":
         bot.save_state()
         print(f"\n❌ Fatal error: {e}")
         sys.exit(1)
+    finally:
+        # Finish queued orders, then deliver any alerts still queued (e.g. the auto-disable notice)
+        bot.risk.stop()
+        bot.stop_execution()
+        bot.notifier.stop()
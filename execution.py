@@ -0,0 +1,196 @@
+"""
+Asynchronous order execution pipeline.
+
+Signal code calls ExecutionPipeline.submit(), which only enqueues an order
+intent and returns a Future. A dedicated worker thread runs the pre-trade
+checks (daily limits, validation, price) and the submission, so the
+signal loop moves on to the next symbol immediately. The bot's state_lock
+is held for those checks and for booking the fill, never across the
+exchange/backend round trip. State persistence is debounced onto a
+separate thread and Telegram alerts already go through the background
+notifier, so neither sits between a signal and its order.
+
+Latency is recorded in the bot's metrics as the `order_queue_wait` and
+`signal_to_submit` stages (intent created -> order handed to the
+exchange/backend).
+"""
+
+import time
+import queue
+import logging
+import itertools
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+
+class IntentFuture(Future):
+    # Why a rejected intent resolved to None (an order_rejections_total reason, 'dropped' or 'failed')
+    reason = None
+
+
+class OrderIntent:
+    __slots__ = ('id', 'side', 'symbol', 'amount_usd', 'guard', 'tags', 'created', 'future')
+
+    def __init__(self, id, side, symbol, amount_usd, guard=None, tags=None):
+        self.id = id
+        self.side = side
+        self.symbol = symbol
+        self.amount_usd = amount_usd
+        self.guard = guard
+        self.tags = tags
+        self.created = time.perf_counter()
+        self.future = IntentFuture()
+
+
+class ExecutionPipeline:
+    def __init__(self, bot, max_queue=1000, save_interval=1.0):
+        """`save_interval` debounces state saves: bursts of fills are persisted once."""
+        self.bot = bot
+        self.save_interval = float(save_interval)
+        self._queue = queue.Queue(maxsize=int(max_queue))
+        self._ids = itertools.count(1)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._dirty = threading.Event()
+        self._stopping = threading.Event()
+        self._worker = None
+        self._persister = None
+
+    @property
+    def running(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def start(self):
+        if self.running:
+            return self
+        self._stopping.clear()
+        self._worker = threading.Thread(target=self._run, name='order-executor', daemon=True)
+        self._persister = threading.Thread(target=self._persist_loop, name='state-persister', daemon=True)
+        self._worker.start()
+        self._persister.start()
+        return self
+
+    def stop(self, timeout=10.0):
+        """Finish queued intents, persist once more and stop both threads."""
+        if not self.running:
+            return
+        self._queue.put(None)
+        self._worker.join(timeout)
+        self._stopping.set()
+        self._dirty.set()
+        self._persister.join(timeout)
+        self._worker = self._persister = None
+
+    def submit(self, side, symbol, amount_usd, guard=None, tags=None):
+        """Enqueue an order intent; never blocks. The Future resolves to place_order()'s result.
+
+        `guard()` is re-checked on the worker under the state lock; a falsy
+        result drops the intent as stale (e.g. the position it exits is gone).
+        `tags` are passed to the trade log like place_order(tags=...).
+        Guarded sells tagged strategy='risk' (risk engine exits) skip the
+        daily trade/loss limits and the minimum size: a stop must be able to
+        close the position after the day's cap is hit or once it is tiny.
+        A rejected intent's future carries the reason in `future.reason`.
+        """
+        intent = OrderIntent(next(self._ids), side, symbol, amount_usd, guard, tags)
+        with self._lock:
+            self._in_flight[intent.id] = intent
+        try:
+            self._queue.put_nowait(intent)
+        except queue.Full:
+            logger.error(f"Order queue full; dropping {side} {symbol} ${amount_usd:.2f}")
+            intent.future.reason = 'dropped'
+            self._finish(intent, None, 'dropped')
+        return intent.future
+
+    def pending(self, symbol=None):
+        """Intents queued or executing, optionally for one symbol."""
+        with self._lock:
+            return sum(1 for i in self._in_flight.values() if symbol is None or i.symbol == symbol)
+
+    def drain(self, timeout=30.0):
+        """Block until every submitted intent has been executed. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    # ----- worker -----
+
+    def _run(self):
+        while True:
+            intent = self._queue.get()
+            if intent is None:
+                break
+            try:
+                result = self._execute(intent)
+                outcome = 'filled' if result else 'rejected'
+            except Exception as e:
+                logger.exception(f"Order intent {intent.id} failed: {e}")
+                intent.future.reason = 'failed'
+                result, outcome = None, 'failed'
+            self._finish(intent, result, outcome)
+
+    def _execute(self, intent):
+        bot = self.bot
+        bot.metrics.observe('stage_seconds', time.perf_counter() - intent.created, stage='order_queue_wait')
+        risk_exit = (intent.side == 'sell' and intent.guard is not None
+                     and (intent.tags or {}).get('strategy') == 'risk')
+        with bot.metrics.span('place_order', path='pipeline'):
+            # The lock covers the checks only; _execute_order takes it again to book the fill,
+            # so save_state() and synchronous orders never wait on the exchange round trip
+            with bot.state_lock:
+                if not risk_exit:
+                    with bot.metrics.span('daily_limits'):
+                        limits_ok = bot._check_daily_limits()
+                    if not limits_ok:
+                        logger.error("Order rejected: daily limits exceeded")
+                        return self._reject(intent, 'daily_limits')
+                if intent.guard is not None and not intent.guard():
+                    logger.info(f"Dropping stale {intent.side} {intent.symbol} intent")
+                    return self._reject(intent, 'stale_intent')
+                side, amount_usd, reason = bot._validate_order(intent.side, intent.symbol, intent.amount_usd,
+                                                               risk_exit=risk_exit)
+                if reason:
+                    return self._reject(intent, reason)
+            price = bot._order_price(intent.symbol)
+            bot.metrics.observe('stage_seconds', time.perf_counter() - intent.created, stage='signal_to_submit')
+            result = bot._execute_order(side, intent.symbol, amount_usd, price, persist=False, tags=intent.tags)
+        if result:
+            self._dirty.set()
+        return result
+
+    def _reject(self, intent, reason):
+        intent.future.reason = reason
+        return self.bot._reject(reason)
+
+    def _finish(self, intent, result, outcome):
+        self.bot.metrics.inc('order_intents_total', outcome=outcome)
+        with self._idle:
+            self._in_flight.pop(intent.id, None)
+            if not self._in_flight:
+                self._idle.notify_all()
+        intent.future.set_result(result)
+
+    # ----- persistence -----
+
+    def _persist_loop(self):
+        while True:
+            self._dirty.wait()
+            if not self._stopping.is_set():
+                # Let a burst of fills land before writing state once
+                self._stopping.wait(self.save_interval)
+            self._dirty.clear()
+            try:
+                self.bot.save_state()
+            except Exception:
+                logger.exception("Background state save failed")
+            if self._stopping.is_set():
+                break
@@ -0,0 +1,293 @@
+"""
+Feature store: normalized multivariate ML inputs built incrementally from candles.
+
+The LSTM used to see only closes min-max scaled over whatever history a
+call happened to get. FeatureStore instead keeps, per (symbol, timeframe,
+feature set), a float32 (rows x features) matrix of causal, normalized
+features: log returns, rolling z-scores of price, returns and volume,
+bar range, RSI and EMA distance. When candles arrive only the new rows are
+computed, from the raw candles of the last `lookback` bars each feature
+needs, so a cycle costs a few rows rather than the whole history. A
+candle sent again with the same timestamp (the bar still forming)
+replaces the last row.
+
+windows() and latest_window() return strided views into the stored
+matrix, so training and inference read the same precomputed values
+without copying them. Features are registered like panel indicators:
+
+    @register_feature('my_feature', lookback=20)
+    def _my_feature(bars): ...   # bars: {'open','high','low','close','volume'} -> array
+"""
+
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from ohlcv import Candles, PRICE_COLUMNS
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+FEATURES = {}
+
+FEATURE_SETS = {
+    'default': ('ret', 'ret_z', 'close_z', 'volume_z', 'range', 'rsi', 'ema_gap'),
+    'close': ('close_z',),
+}
+
+Z_WINDOW = 50
+# EMA-style recurrences are cut to this many time constants; (1 - 1/14) ** (40 * 14) ~ 1e-18
+EMA_HORIZON = 40
+
+
+def register_feature(name, lookback, warmup=None):
+    """Register `fn(bars) -> array` where row i may use the `lookback` rows before it.
+
+    The first `warmup` rows (default `lookback`) of a history are undefined (NaN).
+    """
+    def wrap(fn):
+        FEATURES[name] = (fn, int(lookback), int(lookback if warmup is None else warmup))
+        return fn
+    return wrap
+
+
+def _rolling_sum(values, window):
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums
+
+
+def _zscore(values, window):
+    """(x - rolling mean) / rolling std (population) over `window` rows; NaN until a full window, 0 when flat."""
+    out = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < window:
+        return out
+    # Leading NaNs only; centre before summing so squares keep their precision
+    x = values[valid[0]:] - np.mean(values[valid[0]:])
+    mean = _rolling_sum(x, window) / window
+    var = np.maximum(_rolling_sum(x * x, window) / window - mean * mean, 0.0)
+    std = np.sqrt(var)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.where(std > 1e-12 * (np.abs(mean) + 1), (x - mean) / std, 0.0)
+    out[valid[0] + window - 1:] = z[window - 1:]
+    return out
+
+
+def _decay(values, factor, initial=0.0):
+    """y[t] = factor * y[t-1] + values[t], starting from y[-1] = `initial`."""
+    return lfilter([1.0], [1.0, -factor], values, zi=[factor * initial])[0]
+
+
+def _log_return(close):
+    out = np.full(len(close), np.nan)
+    out[1:] = np.log(close[1:] / close[:-1])
+    return out
+
+
+@register_feature('ret', lookback=1)
+def _ret(bars):
+    return _log_return(bars['close'])
+
+
+@register_feature('ret_z', lookback=Z_WINDOW)
+def _ret_z(bars):
+    return _zscore(_log_return(bars['close']), Z_WINDOW)
+
+
+@register_feature('close_z', lookback=Z_WINDOW - 1)
+def _close_z(bars):
+    return _zscore(bars['close'], Z_WINDOW)
+
+
+@register_feature('volume_z', lookback=Z_WINDOW - 1)
+def _volume_z(bars):
+    return _zscore(np.log1p(bars['volume']), Z_WINDOW)
+
+
+@register_feature('range', lookback=0)
+def _range(bars):
+    return (bars['high'] - bars['low']) / bars['close']
+
+
+@register_feature('rsi', lookback=EMA_HORIZON * 14, warmup=14)
+def _rsi(bars, length=14):
+    # Wilder's RSI (pandas_ta's RMA of gains and losses), centred to [-0.5, 0.5].
+    # Both averages share one normalizer, so it cancels in gains / (gains + losses)
+    change = np.diff(bars['close'], prepend=np.nan)[1:]
+    gains = _decay(np.clip(change, 0, None), 1 - 1 / length)
+    losses = _decay(-np.clip(change, None, 0), 1 - 1 / length)
+    total = gains + losses
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = np.where(total > 0, gains / total, 0.5) - 0.5
+    out = np.full(len(bars['close']), np.nan)
+    out[length:] = rsi[length - 1:]
+    return out
+
+
+@register_feature('ema_gap', lookback=EMA_HORIZON * 20, warmup=19)
+def _ema_gap(bars, length=20):
+    # ewm(span, adjust=False): starts at the first close
+    close = bars['close']
+    alpha = 2 / (length + 1)
+    ema = _decay(alpha * close, 1 - alpha, initial=close[0] if len(close) else 0.0)
+    out = close / ema - 1
+    out[:length - 1] = np.nan
+    return out
+
+
+def resolve(feature_set):
+    """A feature set name from FEATURE_SETS, or a sequence of feature names, as a tuple of names."""
+    names = FEATURE_SETS.get(feature_set) if isinstance(feature_set, str) else tuple(feature_set)
+    if not names:
+        raise KeyError(f'Unknown feature set {feature_set!r}')
+    unknown = [n for n in names if n not in FEATURES]
+    if unknown:
+        raise KeyError(f'Unknown features: {", ".join(unknown)}')
+    return tuple(names)
+
+
+def _as_columns(candles):
+    """(timestamps, {column: float64 array}) from Candles, an OHLCV DataFrame or Nx6 rows."""
+    if isinstance(candles, pd.DataFrame):
+        candles = Candles.from_frame(candles)
+    elif not isinstance(candles, Candles):
+        candles = Candles.from_array(candles)
+    return candles.timestamp, {c: candles.column(c).astype(np.float64) for c in PRICE_COLUMNS}
+
+
+class _FeatureSeries:
+    """Growable row buffers for one (symbol, timeframe, feature set)."""
+
+    def __init__(self, names, max_rows):
+        self.names = names
+        self.lookback = max(FEATURES[n][1] for n in names)
+        # Rows before this hold NaN in some feature
+        self.warmup = max(FEATURES[n][2] for n in names)
+        self.max_rows = max_rows
+        self.n = 0
+        self.timestamp = np.empty(0, dtype=np.int64)
+        self.close = np.empty(0)
+        self.values = np.empty((0, len(names)), dtype=np.float32)
+        # Raw candles of the last `lookback` + 1 rows, the context new rows are computed from
+        self.raw = {c: np.empty(0) for c in PRICE_COLUMNS}
+
+    def _reserve(self, extra):
+        need = self.n + extra
+        if need <= len(self.timestamp):
+            return
+        keep = self.n
+        if need > self.max_rows:
+            # Drop the oldest rows; views handed out earlier keep the old buffers alive
+            keep = max(0, self.max_rows - extra)
+        start = self.n - keep
+        capacity = max(need - start, min(self.max_rows, 2 * max(len(self.timestamp), 1024)))
+        timestamp = np.empty(capacity, dtype=np.int64)
+        close = np.empty(capacity)
+        values = np.empty((capacity, len(self.names)), dtype=np.float32)
+        timestamp[:keep] = self.timestamp[start:self.n]
+        close[:keep] = self.close[start:self.n]
+        values[:keep] = self.values[start:self.n]
+        self.timestamp, self.close, self.values = timestamp, close, values
+        self.warmup = max(0, self.warmup - start)
+        self.n = keep
+
+    def append(self, ts, cols):
+        """Add candles `ts`/`cols`; returns the number of rows computed."""
+        if self.n:
+            last = self.timestamp[self.n - 1]
+            fresh = ts >= last
+            ts, cols = ts[fresh], {c: v[fresh] for c, v in cols.items()}
+            if len(ts) and ts[0] == last:
+                # The last bar was still forming: recompute it from its final values
+                self.n -= 1
+                self.raw = {c: v[:-1] for c, v in self.raw.items()}
+        if not len(ts):
+            return 0
+        history = len(self.raw['close'])
+        bars = {c: np.concatenate([self.raw[c], cols[c]]) for c in PRICE_COLUMNS}
+        block = np.column_stack([FEATURES[name][0](bars) for name in self.names])[history:]
+        if len(ts) > self.max_rows:
+            ts, block, closes = ts[-self.max_rows:], block[-self.max_rows:], cols['close'][-self.max_rows:]
+            self.warmup = max(0, self.warmup - (len(cols['close']) - self.max_rows))
+        else:
+            closes = cols['close']
+        self._reserve(len(ts))
+        end = self.n + len(ts)
+        self.timestamp[self.n:end] = ts
+        self.close[self.n:end] = closes
+        self.values[self.n:end] = block
+        self.n = end
+        self.raw = {c: v[-(self.lookback + 1):] for c, v in bars.items()}
+        return len(block)
+
+
+class FeatureStore:
+    def __init__(self, max_rows=20000, metrics=None):
+        """Keeps at most `max_rows` feature rows per (symbol, timeframe, feature set)."""
+        self.max_rows = int(max_rows)
+        self.metrics = metrics
+        self._series = {}
+        self._lock = threading.RLock()
+
+    def _get(self, symbol, timeframe, feature_set, create=False):
+        key = (symbol, timeframe, resolve(feature_set))
+        series = self._series.get(key)
+        if series is None:
+            if not create:
+                raise KeyError(f'No features for {key}')
+            series = self._series[key] = _FeatureSeries(key[2], self.max_rows)
+        return series
+
+    def update(self, symbol, timeframe, candles, feature_set='default'):
+        """Add the candles newer than the stored ones (or replacing the last); returns rows computed."""
+        ts, cols = _as_columns(candles)
+        with self._lock:
+            added = self._get(symbol, timeframe, feature_set, create=True).append(ts, cols)
+        if self.metrics is not None and added:
+            self.metrics.inc('feature_rows_total', added, timeframe=timeframe)
+        return added
+
+    def names(self, feature_set='default'):
+        return resolve(feature_set)
+
+    def __len__(self):
+        return len(self._series)
+
+    def rows(self, symbol, timeframe, feature_set='default'):
+        """(timestamps, closes, features) of every stored row: views, features float32 (rows x features)."""
+        with self._lock:
+            s = self._get(symbol, timeframe, feature_set)
+            return s.timestamp[:s.n], s.close[:s.n], s.values[:s.n]
+
+    def first_valid(self, symbol, timeframe, feature_set='default'):
+        """Index of the first row whose features all had their full lookback."""
+        with self._lock:
+            s = self._get(symbol, timeframe, feature_set)
+            return min(s.warmup, s.n)
+
+    def windows(self, symbol, timeframe, window, feature_set='default', valid=True):
+        """(N, window, features) strided view of every `window`-row run (from first_valid() with `valid`)."""
+        _, _, values = self.rows(symbol, timeframe, feature_set)
+        if valid:
+            values = values[self.first_valid(symbol, timeframe, feature_set):]
+        if len(values) < window:
+            return np.empty((0, window, values.shape[1]), dtype=np.float32)
+        return np.lib.stride_tricks.sliding_window_view(values, window, axis=0).transpose(0, 2, 1)
+
+    def latest_window(self, symbol, timeframe, window, feature_set='default'):
+        """(window, features) view of the newest rows, or None when fewer valid rows are stored."""
+        _, _, values = self.rows(symbol, timeframe, feature_set)
+        if len(values) - self.first_valid(symbol, timeframe, feature_set) < window:
+            return None
+        return values[-window:]
+
+    def clear(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._series.clear()
+            else:
+                for key in [k for k in self._series if k[0] == symbol]:
+                    del self._series[key]
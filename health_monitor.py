@@ -0,0 +1,159 @@
+"""
+Background backend health monitoring.
+
+One HealthMonitor thread per backend URL probes `/api/health` on a fixed
+interval and publishes the result to every subscriber, so Streamlit
+sessions and bot instances read a cached status instead of blocking on
+the network. Hysteresis (consecutive failures to go down, consecutive
+successes to come back up) keeps a single slow probe from flapping live
+trading off and on.
+"""
+
+import time
+import weakref
+import logging
+import threading
+
+try:
+    import requests
+except Exception:
+    requests = None
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def probe(url, timeout=5.0):
+    """One synchronous health check. Returns (ok, message, latency_ms)."""
+    if requests is None:
+        return False, 'requests_unavailable', None
+    if not url:
+        return False, 'no_backend_url', None
+    start = time.perf_counter()
+    try:
+        resp = requests.get(f"{url}/api/health", timeout=timeout)
+    except Exception as e:
+        return False, str(e), (time.perf_counter() - start) * 1000
+    latency_ms = (time.perf_counter() - start) * 1000
+    if resp.status_code == 200:
+        return True, 'ok', latency_ms
+    snippet = (resp.text or '').strip().replace('\n', ' ')[:200]
+    return False, f"http_{resp.status_code}: {snippet or 'empty_response'}", latency_ms
+
+
+class HealthMonitor:
+    def __init__(self, url, interval=15.0, timeout=5.0, fail_threshold=2, recover_threshold=2):
+        self.url = url
+        self.interval = float(interval)
+        self.timeout = float(timeout)
+        self.fail_threshold = max(1, int(fail_threshold))
+        self.recover_threshold = max(1, int(recover_threshold))
+        # None until the first probe completes
+        self.healthy = None
+        self.message = 'checking'
+        self.latency_ms = None
+        self.last_checked = None
+        self.last_change = None
+        self._streak = 0
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f'health-{self.url}', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def refresh(self):
+        """Ask the prober to check now instead of waiting for the next interval."""
+        self._wake.set()
+
+    def status(self):
+        with self._lock:
+            return {
+                'url': self.url,
+                'healthy': self.healthy,
+                'message': self.message,
+                'latency_ms': self.latency_ms,
+                'last_checked': self.last_checked,
+                'last_change': self.last_change,
+            }
+
+    def subscribe(self, callback):
+        """Call `callback(status)` after every probe. Bound methods are held weakly."""
+        ref = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else (lambda cb=callback: cb)
+        with self._lock:
+            self._subscribers.append(ref)
+            checked = self.last_checked is not None
+        if checked:
+            callback(self.status())
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [ref for ref in self._subscribers if ref() not in (None, callback)]
+
+    def record(self, ok, message, latency_ms):
+        """Fold one probe result into the hysteresis state and notify subscribers."""
+        with self._lock:
+            self.message = message
+            self.latency_ms = latency_ms
+            self.last_checked = time.time()
+            if self.healthy is None:
+                changed = True
+                self.healthy = ok
+                self._streak = 0
+            elif ok == self.healthy:
+                changed = False
+                self._streak = 0
+            else:
+                self._streak += 1
+                needed = self.recover_threshold if ok else self.fail_threshold
+                changed = self._streak >= needed
+                if changed:
+                    self.healthy = ok
+                    self._streak = 0
+            if changed:
+                self.last_change = self.last_checked
+            subscribers = list(self._subscribers)
+        if changed:
+            log = logger.info if ok else logger.warning
+            log(f"Backend {self.url} is {'healthy' if ok else 'unhealthy'} ({message})")
+        status = self.status()
+        alive = []
+        for ref in subscribers:
+            callback = ref()
+            if callback is None:
+                continue
+            alive.append(ref)
+            try:
+                callback(status)
+            except Exception:
+                logger.exception("Health subscriber failed")
+        if len(alive) != len(subscribers):
+            with self._lock:
+                self._subscribers = [ref for ref in self._subscribers if ref() is not None]
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.record(*probe(self.url, self.timeout))
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+def get_monitor(url, interval=15.0, timeout=5.0, fail_threshold=2, recover_threshold=2):
+    """Shared, already-started monitor for `url` (one per process, reused across sessions)."""
+    with _monitors_lock:
+        monitor = _monitors.get(url)
+        if monitor is None:
+            monitor = _monitors[url] = HealthMonitor(url, interval, timeout, fail_threshold, recover_threshold)
+        return monitor.start()
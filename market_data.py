@@ -0,0 +1,213 @@
+"""
+Multi-timeframe market data from one stream of base candles.
+
+DataProvider keeps closed base candles (1m by default) per symbol and
+derives every higher timeframe (5m/15m/1h/4h/1d...) by vectorized
+resampling. Derived bars are cached and extended incrementally: a refresh
+fetches only the base candles since the last one, and only the new base
+tail is resampled. Any number of timeframes for a symbol therefore costs
+one exchange call per base interval. A timeframe whose history is longer
+than the base window is seeded once with a direct fetch and then kept
+current from the base. Timeframes the base cannot build (not a multiple
+of it, or calendar months and years) are fetched directly.
+
+Strategies reach it through BaseStrategy.informative() and can align a
+higher timeframe onto their own candles with merge_timeframe().
+"""
+
+import time
+import logging
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from ohlcv import Candles
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+_TF_UNITS = {'s': 1_000, 'm': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000,
+             'M': 2_592_000_000, 'y': 31_536_000_000}
+# Months and years follow the calendar, so their bars are not fixed-width buckets of base candles
+_CALENDAR_UNITS = {'M', 'y'}
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def timeframe_to_ms(timeframe):
+    """'5m' -> 300000. Same unit letters and nominal lengths as ccxt (1M is 30 days)."""
+    unit = timeframe[-1:]
+    if unit not in _TF_UNITS or not timeframe[:-1].isdigit():
+        raise ValueError(f'Unsupported timeframe {timeframe!r} (units: {", ".join(_TF_UNITS)})')
+    return int(timeframe[:-1]) * _TF_UNITS[unit]
+
+
+def resample_ohlcv(arr, base_ms, tf_ms, drop_leading=True):
+    """Aggregate a sorted Nx6 [ts, o, h, l, c, v] array of `base_ms` candles into `tf_ms` bars.
+
+    The trailing bucket is dropped until its last base candle has closed.
+    With `drop_leading`, so is a leading bucket the data starts in the
+    middle of (pass False when `arr` is known to start on a bucket).
+    """
+    if tf_ms < base_ms or tf_ms % base_ms:
+        raise ValueError(f'Cannot resample {base_ms}ms candles to {tf_ms}ms')
+    if len(arr) == 0:
+        return np.empty((0, 6))
+    buckets = (arr[:, 0] // tf_ms).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(arr)] - 1
+    out = np.empty((len(starts), 6))
+    out[:, 0] = buckets[starts] * tf_ms
+    out[:, 1] = arr[starts, 1]
+    out[:, 2] = np.maximum.reduceat(arr[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(arr[:, 3], starts)
+    out[:, 4] = arr[ends, 4]
+    out[:, 5] = np.add.reduceat(arr[:, 5], starts)
+    if arr[-1, 0] + base_ms < out[-1, 0] + tf_ms:
+        out = out[:-1]
+    if drop_leading and len(out) and arr[0, 0] > out[0, 0]:
+        out = out[1:]
+    return out
+
+
+def to_frame(arr):
+    """Nx6 candle array -> the bot's OHLCV DataFrame schema."""
+    df = pd.DataFrame(np.asarray(arr, dtype=float).reshape(-1, 6), columns=OHLCV_COLUMNS)
+    df['timestamp'] = df['timestamp'].astype(np.int64)
+    df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+
+def merge_timeframe(df, other, timeframe, base_timeframe, columns=None):
+    """Attach `other` (bars of `timeframe`) to `df` (bars of `base_timeframe`) without lookahead.
+
+    Each row of `df` gets the latest `timeframe` bar that had closed by the
+    time that row closed. Merged columns are suffixed with `_<timeframe>`.
+    """
+    tf_ms, base_ms = timeframe_to_ms(timeframe), timeframe_to_ms(base_timeframe)
+    columns = [c for c in (columns or other.columns) if c not in ('timestamp', 'datetime')]
+    right = other[['timestamp'] + columns].rename(columns={c: f'{c}_{timeframe}' for c in columns})
+    # A bar opened at T is usable by the base row opened at T + tf - base (both closed by then)
+    right = right.assign(_available=right['timestamp'] + tf_ms - base_ms).drop(columns='timestamp')
+    merged = pd.merge_asof(df.sort_values('timestamp'), right.sort_values('_available'),
+                           left_on='timestamp', right_on='_available', direction='backward')
+    return merged.drop(columns='_available')
+
+
+class DataProvider:
+    def __init__(self, fetch, base_timeframe='1m', clock=None, max_base=20000, max_bars=5000,
+                 fetch_limit=1000, metrics=None):
+        """`fetch(symbol, timeframe, since, limit)` returns Nx6 candles (a ccxt fetch_ohlcv)."""
+        self.fetch = fetch
+        self.base_timeframe = base_timeframe
+        self.base_ms = timeframe_to_ms(base_timeframe)
+        self.clock = clock or time.time
+        self.max_base = int(max_base)
+        self.max_bars = int(max_bars)
+        self.fetch_limit = int(fetch_limit)
+        self.metrics = metrics
+        self.fetches = Counter()
+        self._base = {}
+        self._bars = {}
+        self._seeded = {}
+        self._lock = threading.RLock()
+
+    def _fetch(self, symbol, timeframe, since, limit, kind):
+        self.fetches[(timeframe, kind)] += 1
+        if self.metrics is not None:
+            self.metrics.inc('ohlcv_fetches_total', timeframe=timeframe, kind=kind)
+        rows = self.fetch(symbol, timeframe, since, limit)
+        if not rows:
+            return np.empty((0, 6))
+        arr = np.asarray(rows, dtype=float).reshape(-1, 6)
+        # Exchanges include the candle still forming; only closed candles are cached
+        try:
+            tf_ms = timeframe_to_ms(timeframe)
+        except ValueError:
+            # No length to test against: the newest candle is the forming one
+            return arr[:-1]
+        closed = arr[:, 0] + tf_ms <= self.clock() * 1000
+        return arr[closed]
+
+    def refresh(self, symbol, force=False):
+        """Pull base candles closed since the last refresh. Returns how many were added."""
+        with self._lock:
+            base = self._base.get(symbol)
+            # The candle after the last cached one has not closed yet
+            if not force and base is not None and len(base) and self.clock() * 1000 < base[-1, 0] + 2 * self.base_ms:
+                return 0
+            added = 0
+            while True:
+                since = None if base is None or not len(base) else int(base[-1, 0] + self.base_ms)
+                rows = self._fetch(symbol, self.base_timeframe, since, self.fetch_limit, 'base')
+                if base is not None and len(base) and len(rows):
+                    rows = rows[rows[:, 0] > base[-1, 0]]
+                if not len(rows):
+                    break
+                base = rows if base is None else np.concatenate([base, rows])
+                added += len(rows)
+                # Keep paging only while full pages come back (catching up after a gap)
+                if since is None or len(rows) < self.fetch_limit - 1 or added >= self.max_base:
+                    break
+            if base is not None:
+                self._base[symbol] = base[-self.max_base:]
+            return added
+
+    def ohlcv(self, symbol, timeframe='5m', limit=300):
+        """Closed bars of `timeframe` as an Nx6 array (at most `limit`)."""
+        with self._lock:
+            self.refresh(symbol)
+            try:
+                tf_ms = timeframe_to_ms(timeframe)
+            except ValueError as e:
+                logger.warning(f"{e}; fetching {symbol} {timeframe} bars directly")
+                tf_ms = None
+            if tf_ms is None or timeframe[-1] in _CALENDAR_UNITS or tf_ms % self.base_ms:
+                # Not derivable from the base candles
+                return self._fetch(symbol, timeframe, None, limit, 'direct')
+            base = self._base.get(symbol, np.empty((0, 6)))
+            key = (symbol, timeframe)
+            bars = self._bars.get(key)
+            if tf_ms == self.base_ms:
+                bars = base
+            else:
+                if bars is not None and len(bars):
+                    tail = base[np.searchsorted(base[:, 0], bars[-1, 0] + tf_ms, side='left'):]
+                    new = resample_ohlcv(tail, self.base_ms, tf_ms, drop_leading=False)
+                    bars = np.concatenate([bars, new]) if len(new) else bars
+                else:
+                    bars = resample_ohlcv(base, self.base_ms, tf_ms)
+            if len(bars) < limit and limit > self._seeded.get(key, 0):
+                # History beyond the base window: one direct fetch per deeper `limit`, then kept current from the base
+                self._seeded[key] = limit
+                if len(bars):
+                    missing = limit - len(bars)
+                    seed = self._fetch(symbol, timeframe, int(bars[0, 0]) - missing * tf_ms, missing, 'seed')
+                    seed = seed[seed[:, 0] < bars[0, 0]]
+                else:
+                    seed = self._fetch(symbol, timeframe, None, limit, 'seed')
+                bars = np.concatenate([seed, bars]) if len(seed) else bars
+            if tf_ms == self.base_ms:
+                self._base[symbol] = bars[-max(self.max_base, limit):]
+            else:
+                self._bars[key] = bars[-max(self.max_bars, limit):]
+            return bars[-limit:] if limit else bars
+
+    def ohlcv_df(self, symbol, timeframe='5m', limit=300):
+        return to_frame(self.ohlcv(symbol, timeframe, limit))
+
+    def candles(self, symbol, timeframe='5m', limit=300):
+        """Closed bars of `timeframe` as compact ohlcv.Candles."""
+        return Candles.from_array(self.ohlcv(symbol, timeframe, limit))
+
+    def clear(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._base.clear()
+                self._bars.clear()
+                self._seeded.clear()
+                return
+            self._base.pop(symbol, None)
+            for key in [k for k in self._bars if k[0] == symbol]:
+                del self._bars[key]
+            self._seeded = {k: depth for k, depth in self._seeded.items() if k[0] != symbol}
@@ -0,0 +1,183 @@
+"""
+Lightweight in-process metrics for the CryptoPiggy bot.
+
+Counters and latency histograms are aggregated in memory and exported in
+Prometheus text format, either via render_prometheus() or a small local
+HTTP endpoint (start_http_server). `span()` times a block of code into
+the stage histogram, so a slow cycle can be attributed to the OHLCV fetch,
+indicators, LSTM, equity lookups, ticker or the order round trip.
+"""
+
+import time
+import bisect
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+PREFIX = 'cryptopiggy_'
+# Seconds; covers sub-millisecond in-memory checks up to slow network calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1024):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def quantile(self, q):
+        """Quantile over the most recent observations (exact, not bucket-interpolated)."""
+        if not self.recent:
+            return None
+        data = sorted(self.recent)
+        return data[min(len(data) - 1, int(q * len(data)))]
+
+
+def _label_str(labels):
+    if not labels:
+        return ''
+    inner = ','.join(f'{k}="{str(v)}"' for k, v in labels)
+    return '{' + inner + '}'
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._server = None
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._counters.setdefault(name, {})
+            family[key] = family.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._histograms.setdefault(name, {})
+            hist = family.get(key)
+            if hist is None:
+                hist = family[key] = Histogram()
+            hist.observe(value)
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Time a block into the stage_seconds histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - start, stage=stage, **labels)
+
+    def counter(self, name, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            return self._counters.get(name, {}).get(key, 0)
+
+    def counter_total(self, name):
+        with self._lock:
+            return sum(self._counters.get(name, {}).values())
+
+    def histogram(self, name, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            return self._histograms.get(name, {}).get(key)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    # ----- export -----
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            for name, family in sorted(self._counters.items()):
+                full = PREFIX + name
+                if name in self._help:
+                    lines.append(f'# HELP {full} {self._help[name]}')
+                lines.append(f'# TYPE {full} counter')
+                for labels, value in sorted(family.items()):
+                    lines.append(f'{full}{_label_str(labels)} {value}')
+            for name, family in sorted(self._histograms.items()):
+                full = PREFIX + name
+                if name in self._help:
+                    lines.append(f'# HELP {full} {self._help[name]}')
+                lines.append(f'# TYPE {full} histogram')
+                for labels, hist in sorted(family.items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f'{full}_bucket{_label_str(labels + (("le", repr(bound)),))} {cumulative}')
+                    lines.append(f'{full}_bucket{_label_str(labels + (("le", "+Inf"),))} {hist.count}')
+                    lines.append(f'{full}_sum{_label_str(labels)} {hist.sum}')
+                    lines.append(f'{full}_count{_label_str(labels)} {hist.count}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """{'stages': {stage: {count, p50_ms, p95_ms, max_ms}}, 'counters': {name: total}}"""
+        stages = {}
+        with self._lock:
+            for labels, hist in self._histograms.get('stage_seconds', {}).items():
+                stage = dict(labels).get('stage', '') + ''.join(f':{v}' for k, v in labels if k != 'stage')
+                if not hist.recent:
+                    continue
+                stages[stage] = {
+                    'count': hist.count,
+                    'p50_ms': hist.quantile(0.5) * 1000,
+                    'p95_ms': hist.quantile(0.95) * 1000,
+                    'max_ms': max(hist.recent) * 1000,
+                }
+            counters = {name: sum(family.values()) for name, family in self._counters.items()}
+        return {'stages': stages, 'counters': counters}
+
+    def start_http_server(self, port=9108, host='127.0.0.1'):
+        """Serve /metrics in Prometheus text format from a daemon thread."""
+        if self._server is not None:
+            return self._server
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        logger.info(f"Metrics endpoint listening on http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server
+
+    def stop_http_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,565 @@
+"""
+LSTM next-close predictor: training helpers and streaming inference.
+
+predict_next_close_series() (backtests) trains a fresh model per call and
+scores every 50-close window from scratch. The live loop only ever needs
+the prediction after the newest candle, so StreamingLSTM keeps each
+symbol's LSTM hidden/cell state and advances it one timestep per new
+close instead of re-running the whole window (plus one step for the
+still-forming last candle). Every `resync_every` steps, or when the
+candles no longer continue the stream (gap, restart), the state is
+rebuilt from a full window, which also re-fits the min-max scale.
+
+export_model() saves a trained predictor for CPU inference as TorchScript
+(.pt) or ONNX (.onnx), optionally with int8 dynamic quantization of the
+LSTM and Linear weights; load_model() returns an object with the same
+forward()/step() interface, so StreamingLSTM and the bot run any of them.
+Whether int8 pays off depends on the CPU: compare_models() (or
+`python ml.py --compare`) reports latency and prediction error against
+the eager fp32 model.
+"""
+
+import os
+import time
+import logging
+import argparse
+import tempfile
+import json
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+# Optional: ONNX export needs `onnx`, loading needs `onnxruntime`
+try:
+    import onnxruntime
+except Exception:
+    onnxruntime = None
+
+HIDDEN_SIZE = 64
+NUM_LAYERS = 2
+# Feature models predict the next log return in percent
+RETURN_SCALE = 100.0
+
+State = Optional[Tuple[torch.Tensor, torch.Tensor]]
+
+
+class LSTMPredictor(nn.Module):
+    symbols: List[str]
+    features: List[str]
+
+    def __init__(self, symbols=None, embed_dim=4, features=()):
+        """With `symbols`, every timestep also gets a learned `embed_dim` vector for its symbol.
+
+        `features` names the FeatureStore columns the model reads; empty means scaled closes only.
+        """
+        super().__init__()
+        self.symbols = list(symbols or [])
+        self.features = list(features)
+        self.n_features = max(1, len(self.features))
+        self.embed_dim = embed_dim if self.symbols else 0
+        self.embed = nn.Embedding(len(self.symbols), embed_dim) if self.symbols else None
+        self.lstm = nn.LSTM(self.n_features + self.embed_dim, HIDDEN_SIZE, NUM_LAYERS, batch_first=True)
+        self.fc = nn.Linear(HIDDEN_SIZE, 1)
+
+    def _inputs(self, x, symbol: Optional[torch.Tensor]):
+        embed = self.embed
+        if embed is None:
+            return x
+        if symbol is None:
+            symbol = torch.full((x.shape[0],), -1, dtype=torch.long)
+        # Symbols the model was not trained on (index -1) get the zero vector
+        e = embed(symbol.clamp(min=0)) * (symbol >= 0).unsqueeze(1).to(x.dtype)
+        e = e[:, None, :].expand(-1, x.shape[1], -1)
+        return torch.cat([x, e], dim=2)
+
+    def forward(self, x, state: State = None, symbol: Optional[torch.Tensor] = None):
+        out, state = self.lstm(self._inputs(x, symbol), state)
+        return self.fc(out[:, -1, :])
+
+    @torch.jit.export
+    def step(self, x, state: State = None,
+             symbol: Optional[torch.Tensor] = None) -> Tuple[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+        """Run (batch, steps, 1) inputs from `state`; returns (prediction after the last step, new state).
+
+        `symbol` is a (batch,) index into symbol_names() (-1: unknown) for models trained with embeddings.
+        """
+        out, state = self.lstm(self._inputs(x, symbol), state)
+        return self.fc(out[:, -1, :]), state
+
+    @torch.jit.export
+    def symbol_names(self) -> List[str]:
+        return self.symbols
+
+    @torch.jit.export
+    def feature_names(self) -> List[str]:
+        return self.features
+
+
+class GRUPredictor(nn.Module):
+    """Closes-only GRU with the LSTMPredictor layout (one gate fewer per cell)."""
+
+    def __init__(self):
+        super().__init__()
+        self.gru = nn.GRU(1, HIDDEN_SIZE, NUM_LAYERS, batch_first=True)
+        self.fc = nn.Linear(HIDDEN_SIZE, 1)
+
+    def forward(self, x):
+        out, _ = self.gru(x)
+        return self.fc(out[:, -1, :])
+
+
+def symbol_index(model, symbol):
+    """(1,) index tensor of `symbol` for an embedding model; None when it has no embedding for it."""
+    names = model.symbol_names()
+    return torch.tensor([names.index(symbol)]) if symbol in names else None
+
+
+def minmax_scale(closes):
+    """Scale to [0, 1] over the whole series. Returns (scaled, min, range)."""
+    arr = np.asarray(closes, dtype=float)
+    minv, maxv = arr.min(), arr.max()
+    denom = maxv - minv if maxv != minv else 1.0
+    return (arr - minv) / denom, minv, denom
+
+
+def make_windows(scaled, window):
+    """(X, y): every `window`-long run of `scaled` and the value that follows it."""
+    scaled = np.asarray(scaled)
+    if len(scaled) <= window:
+        return np.empty((0, window)), np.empty(0)
+    # Strided views over `scaled`, no per-window copies
+    return np.lib.stride_tricks.sliding_window_view(scaled, window)[:-1], scaled[window:]
+
+
+def train_lstm(closes, window=50, epochs=5, model=None, lr=0.001):
+    """Fit `model` (a new LSTMPredictor by default) on min-max scaled closes; returns it in eval mode."""
+    scaled, _, _ = minmax_scale(closes)
+    X, y = make_windows(scaled, window)
+    return fit_full_batch(model or LSTMPredictor(), X, y, epochs, lr)
+
+
+def fit_full_batch(model, X, y, epochs=5, lr=0.001):
+    """`epochs` full-batch Adam steps of `model` on (rows x window) windows X and targets y; returns it in eval mode."""
+    optim_local = optim.Adam(model.parameters(), lr=lr)
+    loss_fn = nn.MSELoss()
+    model.train()
+    X_t = torch.tensor(X[:, :, None], dtype=torch.float32)
+    y_t = torch.tensor(y[:, None], dtype=torch.float32)
+    for epoch in range(epochs):
+        optim_local.zero_grad()
+        loss = loss_fn(model(X_t), y_t)
+        loss.backward()
+        optim_local.step()
+    model.eval()
+    return model
+
+
+def predict_series(closes, window=50, epochs=5):
+    """Train a fresh model on `closes` and predict the next close after every `window`-long run.
+
+    Aligned with `closes`: the first `window` entries are the closes themselves.
+    """
+    from predictors import predict_series as run
+    return run(closes, window, 'lstm', {'epochs': epochs})
+
+
+class _Windows:
+    """Training rows spread over several (X, y, symbol id) tensors, gathered one batch at a time.
+
+    X tensors may be strided views (of a scaled series or a feature store
+    buffer); only the rows of each batch are copied.
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.offsets = np.cumsum([0] + [len(X) for X, _, _ in parts])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def batch(self, index):
+        index = np.asarray(index)
+        part = np.searchsorted(self.offsets, index, side='right') - 1
+        X, y, ids = [], [], []
+        for p in np.unique(part):
+            rows = torch.as_tensor(index[part == p] - self.offsets[p])
+            Xp, yp, symbol = self.parts[p]
+            X.append(Xp[rows])
+            y.append(yp[rows])
+            ids.append(torch.full((len(rows),), symbol, dtype=torch.long))
+        return torch.cat(X), torch.cat(y), torch.cat(ids)
+
+
+def strided_windows(values, window):
+    """(N - window + 1, window, features) view of a (N, features) tensor: every `window`-row run, no copy."""
+    n, width = values.shape
+    return values.as_strided((max(0, n - window + 1), window, width), (width, width, 1))
+
+
+def train_multi(series, window=50, **params):
+    """Train one model on the closes of several symbols; returns (model, history).
+
+    `series` is {symbol: closes}. Each symbol is min-max scaled over its own
+    history (as at inference). See fit_windows() for the training options.
+    """
+    datasets = {}
+    for symbol, closes in series.items():
+        if len(closes) > window + 1:
+            scaled = torch.from_numpy(minmax_scale(closes)[0].astype(np.float32))
+            datasets[symbol] = (strided_windows(scaled[:, None], window)[:-1], scaled[window:, None])
+    if not datasets:
+        raise ValueError(f'Need more than {window + 1} closes for at least one symbol')
+    return fit_windows(datasets, window, **params)
+
+
+def train_features(store, symbols, timeframe, feature_set='default', window=50, **params):
+    """Train one model on FeatureStore windows of `symbols` to predict the next log return; returns (model, history).
+
+    Windows are strided views of the store's buffers. Targets are the next
+    bar's log return times RETURN_SCALE; predict_from_features() turns the
+    prediction back into a price.
+    """
+    from features import resolve
+    names = resolve(feature_set)
+    datasets = {}
+    for symbol in symbols:
+        try:
+            _, closes, values = store.rows(symbol, timeframe, names)
+            start = store.first_valid(symbol, timeframe, names)
+        except KeyError:
+            continue
+        if len(values) - start <= window + 1:
+            continue
+        target = RETURN_SCALE * np.log(closes[start + window:] / closes[start + window - 1:-1])
+        datasets[symbol] = (strided_windows(torch.from_numpy(values[start:]), window)[:-1],
+                            torch.from_numpy(target.astype(np.float32))[:, None])
+    if not datasets:
+        raise ValueError(f'Need more than {window + 1} feature rows for at least one symbol')
+    return fit_windows(datasets, window, features=names, **params)
+
+
+def model_features(model):
+    """Feature names a model (eager, TorchScript or ONNX) reads; empty for closes-only models."""
+    return tuple(getattr(model, 'feature_names', list)())
+
+
+def predict_from_features(model, store, symbol, timeframe, window=50):
+    """Next-close prediction for a model from train_features(), from the newest stored feature rows."""
+    names = model_features(model)
+    view = store.latest_window(symbol, timeframe, window, names)
+    if view is None:
+        return None
+    with torch.no_grad():
+        pred = float(model(torch.from_numpy(view)[None], None, symbol_index(model, symbol)))
+    _, closes, _ = store.rows(symbol, timeframe, names)
+    return float(closes[-1] * np.exp(pred / RETURN_SCALE))
+
+
+def fit_windows(datasets, window, features=(), epochs=100, batch_size=256, val_frac=0.2, patience=5, lr=0.001,
+                embed=False, threads=None, checkpoint=None, seed=0, min_delta=1e-6):
+    """Train one model on {symbol: (X windows, y targets)} tensors; returns (model, history).
+
+    Each symbol's last `val_frac` of windows is held out, so validation
+    never sees bars the model trained on. Windows of all symbols are
+    shuffled together into `batch_size` mini-batches; training stops once
+    validation loss has not improved for `patience` epochs (or at `epochs`),
+    and the best weights are returned. `features` names the input columns
+    (empty: closes only), `embed` adds a learned per-symbol embedding,
+    `threads` caps torch's intra-op threads while training, and
+    `checkpoint` is a file the run is saved to after every epoch and
+    resumed from when it exists. `history` holds one
+    {'epoch', 'train_loss', 'val_loss'} per epoch.
+    """
+    symbols = list(datasets)
+    train, val = [], []
+    for i, (X, y) in enumerate(datasets.values()):
+        cut = len(X) - max(1, int(len(X) * val_frac)) if val_frac else len(X)
+        train.append((X[:cut], y[:cut], i))
+        val.append((X[cut:], y[cut:], i))
+    train = _Windows(train)
+    X_val, y_val, id_val = _Windows(val).batch(np.arange(len(_Windows(val))))
+    torch.manual_seed(seed)
+    model = LSTMPredictor(symbols if embed else None, features=features)
+    optim_local = optim.Adam(model.parameters(), lr=lr)
+    loss_fn = nn.MSELoss()
+    run = {'epoch': 0, 'best_val': float('inf'), 'best_state': None, 'bad_epochs': 0, 'history': []}
+    config = {'symbols': symbols, 'window': window, 'embed': bool(embed), 'features': list(features), 'samples': len(train)}
+    if checkpoint and os.path.exists(checkpoint):
+        saved = torch.load(checkpoint, weights_only=False)
+        if saved['config'] == config:
+            model.load_state_dict(saved['model'])
+            optim_local.load_state_dict(saved['optimizer'])
+            run = saved['run']
+            logger.info(f"Resuming LSTM training from {checkpoint} at epoch {run['epoch']}")
+        else:
+            logger.warning(f"Ignoring LSTM checkpoint {checkpoint}: trained on different data")
+
+    previous_threads = torch.get_num_threads()
+    if threads:
+        torch.set_num_threads(threads)
+    try:
+        while run['epoch'] < epochs and run['bad_epochs'] < patience:
+            model.train()
+            # Seeded per epoch, so a resumed run shuffles exactly like an uninterrupted one
+            order = torch.randperm(len(train), generator=torch.Generator().manual_seed(seed + run['epoch'])).numpy()
+            total = 0.0
+            for start in range(0, len(order), batch_size):
+                X, y, ids = train.batch(order[start:start + batch_size])
+                optim_local.zero_grad()
+                loss = loss_fn(model(X, symbol=ids if embed else None), y)
+                loss.backward()
+                optim_local.step()
+                total += loss.item() * len(X)
+            model.eval()
+            with torch.no_grad():
+                val_loss = loss_fn(model(X_val, symbol=id_val if embed else None), y_val).item() if len(X_val) else total / len(train)
+            run['epoch'] += 1
+            run['history'].append({'epoch': run['epoch'], 'train_loss': total / len(train), 'val_loss': val_loss})
+            if val_loss < run['best_val'] - min_delta:
+                run['best_val'], run['bad_epochs'] = val_loss, 0
+                run['best_state'] = {k: v.detach().clone() for k, v in model.state_dict().items()}
+            else:
+                run['bad_epochs'] += 1
+            if checkpoint:
+                tmp = checkpoint + '.tmp'
+                torch.save({'config': config, 'model': model.state_dict(), 'optimizer': optim_local.state_dict(), 'run': run}, tmp)
+                os.replace(tmp, checkpoint)
+    finally:
+        torch.set_num_threads(previous_threads)
+    if run['best_state'] is not None:
+        model.load_state_dict(run['best_state'])
+    model.eval()
+    logger.info(f"Trained shared LSTM on {len(symbols)} symbols / {len(train)} windows: "
+                f"{run['epoch']} epochs, best val loss {run['best_val']:.6f}")
+    return model, run['history']
+
+
+class StreamingLSTM:
+    def __init__(self, model, window=50, resync_every=None, metrics=None):
+        """`resync_every` streamed steps (default: `window`) before the state is rebuilt from a full window."""
+        self.model = model
+        self.window = int(window)
+        self.resync_every = int(resync_every or window)
+        self.metrics = metrics
+        self._streams = {}
+
+    def reset(self, key=None):
+        if key is None:
+            self._streams.clear()
+        else:
+            self._streams.pop(key, None)
+
+    def predict(self, key, closes, timestamps):
+        """Predicted next close after the last of `closes` (with matching `timestamps`) for stream `key`.
+
+        The last candle may still be forming, so the stored state only ever
+        covers the candles before it: closes between the stored one and the
+        last are committed to the state, the last is run on a throwaway copy.
+        Returns None with fewer than `window` closes.
+        """
+        closes = np.asarray(closes, dtype=float)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if len(closes) < self.window:
+            return None
+        stream = self._streams.get(key)
+        new = None
+        if stream is not None:
+            # The stream continues only if its last candle is still in this history
+            at = np.searchsorted(timestamps, stream['ts'])
+            if at < len(timestamps) - 1 and timestamps[at] == stream['ts']:
+                new = closes[at + 1:-1]
+                if stream['steps'] + len(new) > self.resync_every:
+                    new = None
+        with torch.no_grad():
+            if new is None:
+                stream = self._resync(key, closes)
+            elif len(new):
+                _, stream['state'] = self.model.step(self._scaled(stream, new), stream['state'], stream['symbol'])
+                stream['steps'] += len(new)
+                self._count(len(new), 'stream')
+            stream['ts'] = int(timestamps[-2])
+            pred, _ = self.model.step(self._scaled(stream, closes[-1:]), stream['state'], stream['symbol'])
+            self._count(1, 'stream')
+        return float(pred.numpy().ravel()[0]) * stream['denom'] + stream['min']
+
+    @staticmethod
+    def _scaled(stream, closes):
+        return torch.tensor(((closes - stream['min']) / stream['denom'])[None, :, None], dtype=torch.float32)
+
+    def _resync(self, key, closes):
+        # Same scale as predict_next_close_series: min-max over the history we were given
+        _, minv, denom = minmax_scale(closes)
+        stream = {'state': None, 'min': minv, 'denom': denom, 'steps': 0, 'symbol': symbol_index(self.model, key)}
+        _, stream['state'] = self.model.step(self._scaled(stream, closes[-self.window:-1]), None, stream['symbol'])
+        self._streams[key] = stream
+        self._count(self.window - 1, 'resync')
+        return stream
+
+    def _count(self, steps, mode):
+        if self.metrics is not None:
+            self.metrics.inc('lstm_timesteps_total', steps, mode=mode)
+
+
+# ----- export -----
+
+def quantize(model):
+    """Copy of `model` with int8 dynamic quantization of its LSTM and Linear weights (activations stay float)."""
+    return torch.ao.quantization.quantize_dynamic(model, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+
+
+class _StepGraph(nn.Module):
+    """step() with the state (and symbol index, for embedding models) as explicit tensors, the shape ONNX graphs need."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, x, h, c, *symbol):
+        pred, (h, c) = self.model.step(x, (h, c), symbol[0] if symbol else None)
+        return pred, h, c
+
+
+def export_model(model, path, quantize_int8=False):
+    """Save an eager LSTMPredictor for CPU inference; the format follows the suffix (.pt TorchScript, .onnx ONNX)."""
+    model = model.eval()
+    if path.endswith('.onnx'):
+        _export_onnx(model, path, quantize_int8)
+    elif path.endswith('.pt'):
+        torch.jit.save(torch.jit.script(quantize(model) if quantize_int8 else model), path)
+    else:
+        raise ValueError(f'Unknown model format for {path} (expected .pt or .onnx)')
+    logger.info(f"Exported LSTM model to {path}{' (int8)' if quantize_int8 else ''}")
+    return path
+
+
+def _export_onnx(model, path, quantize_int8):
+    try:
+        import onnx
+    except ImportError:
+        raise ImportError('onnx is required to export ONNX models') from None
+    # PyTorch's quantized LSTM has no ONNX export, so int8 is applied to the exported graph instead
+    target = path + '.fp32' if quantize_int8 else path
+    state = torch.zeros(NUM_LAYERS, 1, HIDDEN_SIZE)
+    inputs, names = (torch.zeros(1, 2, model.n_features), state, state), ['x', 'h', 'c']
+    dynamic_axes = {'x': {0: 'batch', 1: 'steps'}, 'h': {1: 'batch'}, 'c': {1: 'batch'}}
+    if model.symbols:
+        inputs, names = inputs + (torch.zeros(1, dtype=torch.long),), names + ['symbol']
+        dynamic_axes['symbol'] = {0: 'batch'}
+    torch.onnx.export(_StepGraph(model), inputs, target, input_names=names, output_names=['pred', 'h_out', 'c_out'],
+                      dynamic_axes=dynamic_axes, dynamo=False)
+    # Embedding models need the symbol order at load time
+    graph = onnx.load(target)
+    graph.metadata_props.add(key='symbols', value=json.dumps(model.symbols))
+    graph.metadata_props.add(key='features', value=json.dumps(model.features))
+    onnx.save(graph, target)
+    if quantize_int8:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        try:
+            quantize_dynamic(target, path, weight_type=QuantType.QInt8)
+        finally:
+            os.remove(target)
+
+
+class OnnxPredictor:
+    """onnxruntime session behind the LSTMPredictor forward()/step() interface."""
+
+    def __init__(self, path, threads=None):
+        if onnxruntime is None:
+            raise ImportError('onnxruntime is required to load ONNX models')
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads or torch.get_num_threads()
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.symbols = json.loads(meta.get('symbols', '[]'))
+        self.features = json.loads(meta.get('features', '[]'))
+
+    def eval(self):
+        return self
+
+    def symbol_names(self):
+        return self.symbols
+
+    def feature_names(self):
+        return self.features
+
+    def step(self, x, state=None, symbol=None):
+        if state is None:
+            state = (torch.zeros(NUM_LAYERS, x.shape[0], HIDDEN_SIZE),) * 2
+        feed = {
+            'x': x.numpy().astype(np.float32),
+            'h': state[0].numpy().astype(np.float32),
+            'c': state[1].numpy().astype(np.float32),
+        }
+        if self.symbols:
+            feed['symbol'] = (symbol if symbol is not None else torch.full((x.shape[0],), -1, dtype=torch.long)).numpy()
+        pred, h, c = self.session.run(None, feed)
+        return torch.from_numpy(pred), (torch.from_numpy(h), torch.from_numpy(c))
+
+    def __call__(self, x, state=None, symbol=None):
+        return self.step(x, state, symbol)[0]
+
+
+def load_model(path):
+    """Load an artifact written by export_model() for inference."""
+    if path.endswith('.onnx'):
+        return OnnxPredictor(path)
+    return torch.jit.load(path, map_location='cpu').eval()
+
+
+def compare_models(reference, candidates, closes, window=50, repeat=100):
+    """Latency of one full-window prediction and error vs `reference` (eager fp32) for each candidate.
+
+    Returns {name: {'latency_ms', 'mean_abs_err', 'max_abs_err'}} with errors
+    in price units over every window of `closes`.
+    """
+    scaled, minv, denom = minmax_scale(closes)
+    X, _ = make_windows(scaled, window)
+    X_t = torch.tensor(X[:, :, None], dtype=torch.float32)
+    one = X_t[-1:]
+    with torch.no_grad():
+        expected = reference(X_t).numpy().ravel() * denom + minv
+        report = {}
+        for name, model in {'eager_fp32': reference, **candidates}.items():
+            model(one)  # warm-up (TorchScript optimizes on the first runs)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                model(one)
+            latency = (time.perf_counter() - start) / repeat
+            err = np.abs(model(X_t).numpy().ravel() * denom + minv - expected)
+            report[name] = {'latency_ms': latency * 1000, 'mean_abs_err': float(err.mean()), 'max_abs_err': float(err.max())}
+    return report
+
+
+if __name__ == "__main__":
+    from synthetic_market import SyntheticMarket
+
+    parser = argparse.ArgumentParser(description='Export the LSTM predictor and compare optimized variants')
+    parser.add_argument('--candles', type=int, default=2000, help='Synthetic 5m closes to train and score on')
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--export', help='Write the trained model here (.pt TorchScript or .onnx)')
+    parser.add_argument('--int8', action='store_true', help='Apply int8 dynamic quantization to the export')
+    parser.add_argument('--compare', action='store_true', help='Print latency and error of each variant vs eager fp32')
+    args = parser.parse_args()
+
+    closes = SyntheticMarket(seed=42, timeframe='5m').generate_one(args.candles)['close'].to_numpy()
+    model = train_lstm(closes, epochs=args.epochs)
+    if args.export:
+        export_model(model, args.export, quantize_int8=args.int8)
+    if args.compare:
+        with tempfile.TemporaryDirectory() as tmp:
+            variants = {'int8_eager': quantize(model)}
+            for name, path, int8 in (('torchscript_fp32', 'fp32.pt', False), ('torchscript_int8', 'int8.pt', True),
+                                     ('onnx_fp32', 'fp32.onnx', False), ('onnx_int8', 'int8.onnx', True)):
+                try:
+                    variants[name] = load_model(export_model(model, os.path.join(tmp, path), quantize_int8=int8))
+                except ImportError as e:
+                    print(f"  skipping {name}: {e}")
+            report = compare_models(model, variants, closes)
+        print(f"  {'variant':<18} {'latency':>10} {'mean |err|':>12} {'max |err|':>12}   (threads={torch.get_num_threads()})")
+        for name, row in report.items():
+            print(f"  {name:<18} {row['latency_ms']:8.3f}ms {row['mean_abs_err']:12.4f} {row['max_abs_err']:12.4f}")
@@ -0,0 +1,333 @@
+"""
+LSTM work in separate processes.
+
+Torch training and inference hold the GIL and use every intra-op thread
+they are given, so running them inside the bot loop or a Streamlit rerun
+stalls order placement and the UI. MLWorkerPool moves that work into
+spawned worker processes:
+
+- inference workers hold the live model and answer predict requests.
+  Requests that arrive together are batched: a dispatcher thread per
+  worker collects up to `max_batch` pending windows (waiting at most
+  `batch_wait` seconds for more), writes them into a shared-memory block
+  owned by that worker and sends one message; the worker runs the whole
+  batch and writes the predictions back into the same block.
+- one training worker runs train_multi() and predictors.predict_series()
+  jobs one at a time, reading their closes from a per-job shared-memory
+  block.
+  Trained weights are pushed to the inference workers when the job ends.
+
+Every worker is limited to its own torch thread budget, so the pool never
+competes with the bot process for more cores than it was given. Requests
+return concurrent.futures.Future objects.
+"""
+
+import io
+import time
+import atexit
+import queue
+import logging
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from concurrent.futures import Future
+
+import numpy as np
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+
+# ----- worker processes -----
+
+def _limit_threads(threads):
+    import torch
+    torch.set_num_threads(max(1, int(threads)))
+    return torch
+
+
+def _inference_main(conn, shm_name, max_batch, window, threads):
+    """Inference worker: answers ('predict', n, symbols) from the shared block; ('load', ...) swaps the model."""
+    torch = _limit_threads(threads)
+    from ml import LSTMPredictor, load_model
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    inputs = np.ndarray((max_batch, window), dtype=np.float32, buffer=shm.buf)
+    outputs = np.ndarray(max_batch, dtype=np.float32, buffer=shm.buf, offset=inputs.nbytes)
+    model = None
+    try:
+        while True:
+            msg = conn.recv()
+            if msg[0] == 'stop':
+                break
+            try:
+                if msg[0] == 'load':
+                    _, state, symbols, path = msg
+                    if path:
+                        model = load_model(path)
+                    else:
+                        model = LSTMPredictor(symbols or None)
+                        model.load_state_dict(torch.load(io.BytesIO(state), weights_only=True))
+                        model.eval()
+                    conn.send(('ok', None))
+                elif msg[0] == 'predict':
+                    _, n, symbols = msg
+                    if model is None:
+                        outputs[:n] = np.nan
+                    else:
+                        names = model.symbol_names()
+                        ids = torch.tensor([names.index(s) if s in names else -1 for s in symbols])
+                        x = torch.from_numpy(inputs[:n].copy())[:, :, None]
+                        with torch.no_grad():
+                            outputs[:n] = model(x, None, ids if names else None).numpy().ravel()
+                    conn.send(('ok', None))
+            except Exception as e:
+                conn.send(('error', repr(e)))
+    finally:
+        del inputs, outputs
+        shm.close()
+
+
+def _training_main(conn, threads):
+    """Training worker: ('train', ...) and ('series', ...) jobs read their closes from a shared block."""
+    torch = _limit_threads(threads)
+    from ml import train_multi
+    from predictors import predict_series
+
+    while True:
+        msg = conn.recv()
+        if msg[0] == 'stop':
+            break
+        _, kind, shm_name, offsets, params = msg
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                closes = np.ndarray(offsets[-1][2], dtype=np.float64, buffer=shm.buf).copy()
+            finally:
+                shm.close()
+            if kind == 'series':
+                result = predict_series(closes, **params)
+            else:
+                series = {symbol: closes[start:end] for symbol, start, end in offsets[:-1]}
+                model, history = train_multi(series, **params)
+                buf = io.BytesIO()
+                torch.save(model.state_dict(), buf)
+                result = {'state': buf.getvalue(), 'symbols': model.symbol_names(), 'history': history}
+            conn.send(('ok', result))
+        except Exception as e:
+            conn.send(('error', repr(e)))
+
+
+# ----- pool -----
+
+class _Worker:
+    def __init__(self, process, conn, shm=None):
+        self.process = process
+        self.conn = conn
+        self.shm = shm
+        self.lock = threading.Lock()
+
+    def call(self, *msg):
+        """One request/reply round trip; the lock keeps replies paired with their requests."""
+        with self.lock:
+            self.conn.send(msg)
+            status, result = self.conn.recv()
+        if status != 'ok':
+            raise RuntimeError(f'ML worker error: {result}')
+        return result
+
+
+class MLWorkerPool:
+    def __init__(self, workers=1, threads=1, train_threads=None, window=50, max_batch=64, batch_wait=0.002, metrics=None):
+        """`workers` inference processes with `threads` torch threads each, plus one training process (`train_threads`).
+
+        Processes are started on first use.
+        """
+        self.workers = max(1, int(workers))
+        self.threads = max(1, int(threads))
+        self.train_threads = int(train_threads or threads)
+        self.window = int(window)
+        self.max_batch = int(max_batch)
+        self.batch_wait = float(batch_wait)
+        self.metrics = metrics
+        self.ready = False
+        self._requests = queue.Queue()
+        self._jobs = queue.Queue()
+        self._inference = []
+        self._trainer = None
+        self._threads = []
+        self._lock = threading.Lock()
+        self._ctx = mp.get_context('spawn')
+
+    @property
+    def running(self):
+        return bool(self._inference)
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return self
+            block = self.max_batch * self.window * 4 + self.max_batch * 4
+            for i in range(self.workers):
+                shm = shared_memory.SharedMemory(create=True, size=block)
+                parent, child = self._ctx.Pipe()
+                process = self._ctx.Process(target=_inference_main, name=f'ml-inference-{i}', daemon=True,
+                                            args=(child, shm.name, self.max_batch, self.window, self.threads))
+                process.start()
+                worker = _Worker(process, parent, shm)
+                self._inference.append(worker)
+                self._spawn_thread(self._dispatch, f'ml-dispatch-{i}', worker)
+            parent, child = self._ctx.Pipe()
+            process = self._ctx.Process(target=_training_main, name='ml-training', daemon=True,
+                                        args=(child, self.train_threads))
+            process.start()
+            self._trainer = _Worker(process, parent)
+            self._spawn_thread(self._run_jobs, 'ml-jobs', self._trainer)
+            atexit.register(self.close)
+        return self
+
+    def _spawn_thread(self, target, name, worker):
+        thread = threading.Thread(target=target, args=(worker,), name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def close(self, timeout=5.0):
+        """Stop the worker processes and release their shared memory."""
+        with self._lock:
+            if not self.running:
+                return
+            for _ in self._inference:
+                self._requests.put(None)
+            self._jobs.put(None)
+            for thread in self._threads:
+                thread.join(timeout)
+            for worker in self._inference + [self._trainer]:
+                try:
+                    worker.conn.send(('stop',))
+                except (OSError, BrokenPipeError):
+                    pass
+                worker.process.join(timeout)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+                if worker.shm is not None:
+                    worker.shm.close()
+                    worker.shm.unlink()
+            self._inference, self._trainer, self._threads = [], None, []
+            self.ready = False
+
+    # ----- inference -----
+
+    def predict(self, closes, symbol=None):
+        """Future of the predicted next close after `closes` (None until a model is loaded)."""
+        closes = np.asarray(closes, dtype=float)
+        future = Future()
+        if len(closes) < self.window:
+            future.set_result(None)
+            return future
+        self.start()
+        # Same scale as the in-process paths: min-max over the history we were given
+        minv, maxv = closes.min(), closes.max()
+        denom = maxv - minv if maxv != minv else 1.0
+        self._requests.put(((closes[-self.window:] - minv) / denom, minv, denom, symbol, future))
+        return future
+
+    def predict_many(self, histories):
+        """{key: closes} (or {key: (closes, symbol)}) -> {key: prediction}; submitted together so they share batches."""
+        futures = {}
+        for key, history in histories.items():
+            closes, symbol = history if isinstance(history, tuple) else (history, key)
+            futures[key] = self.predict(closes, symbol)
+        return {key: future.result() for key, future in futures.items()}
+
+    def _dispatch(self, worker):
+        inputs = np.ndarray((self.max_batch, self.window), dtype=np.float32, buffer=worker.shm.buf)
+        outputs = np.ndarray(self.max_batch, dtype=np.float32, buffer=worker.shm.buf, offset=inputs.nbytes)
+        while True:
+            first = self._requests.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.batch_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._requests.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Shutdown marker for another dispatcher; hand it back after this batch
+                    self._requests.put(None)
+                    break
+                batch.append(item)
+            for row, item in enumerate(batch):
+                inputs[row] = item[0]
+            try:
+                worker.call('predict', len(batch), [item[3] for item in batch])
+            except Exception as e:
+                for item in batch:
+                    item[4].set_exception(e)
+                continue
+            if self.metrics is not None:
+                self.metrics.observe('ml_batch_size', len(batch))
+            for row, (_, minv, denom, _, future) in enumerate(batch):
+                pred = float(outputs[row])
+                future.set_result(None if np.isnan(pred) else pred * denom + minv)
+
+    def load_state(self, state, symbols=None):
+        """Send serialized LSTMPredictor weights (torch.save of a state_dict) to every inference worker."""
+        self.start()
+        for worker in self._inference:
+            worker.call('load', state, list(symbols or []), None)
+        self.ready = True
+
+    def load_model(self, path):
+        """Serve an export_model() artifact from every inference worker."""
+        self.start()
+        for worker in self._inference:
+            worker.call('load', None, None, path)
+        self.ready = True
+
+    # ----- training -----
+
+    def train(self, series, window=50, **params):
+        """Future of {'state', 'symbols', 'history'} from train_multi(series, window, **params) in the training worker.
+
+        The trained weights are loaded into the inference workers before the future completes.
+        """
+        return self._submit('train', dict(series), dict(params, window=window))
+
+    def predict_series(self, closes, window=50, epochs=5, backend='lstm'):
+        """Future of predictors.predict_series() with `backend` computed in the training worker."""
+        return self._submit('series', {None: closes}, {'window': window, 'backend': backend, 'params': {'epochs': epochs}})
+
+    def _submit(self, kind, series, params):
+        self.start()
+        future = Future()
+        self._jobs.put((kind, series, params, future))
+        return future
+
+    def _run_jobs(self, worker):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            kind, series, params, future = job
+            arrays = [np.asarray(closes, dtype=np.float64) for closes in series.values()]
+            total = sum(len(a) for a in arrays)
+            shm = shared_memory.SharedMemory(create=True, size=max(8, total * 8))
+            try:
+                block = np.ndarray(total, dtype=np.float64, buffer=shm.buf)
+                offsets, start = [], 0
+                for symbol, arr in zip(series, arrays):
+                    block[start:start + len(arr)] = arr
+                    offsets.append((symbol, start, start + len(arr)))
+                    start += len(arr)
+                offsets.append((None, 0, total))
+                del block
+                result = worker.call('job', kind, shm.name, offsets, params)
+                if kind == 'train':
+                    self.load_state(result['state'], result['symbols'])
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                shm.close()
+                shm.unlink()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the trading backend proxy.
+
+Implements the endpoints the bot talks to (/api/health, /api/credentials,
+/api/balance/{userId}, /api/trade, /api/trade/batch, /api/trade/{clientOrderId})
+with configurable latency, jitter, injected error rate, a requests-per-second
+cap (429 when exceeded) and a bounded worker pool (requests queue once
+`workers` are busy). Orders are deduplicated on clientOrderId like the real
+backend, and `stall_rate` delays the response *after* an order executes to
+reproduce "timed out but filled". Used by
+backend_load.py and the integration tests; never talks to a real exchange.
+
+Run standalone with:
+    python mock_backend.py --port 8000 --latency-ms 40 --error-rate 0.01 --max-rps 200
+"""
+
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+import itertools
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+DEFAULT_PRICES = {'BTC/USDT': 50000.0, 'ETH/USDT': 3000.0, 'SOL/USDT': 150.0, 'ADA/USDT': 0.5, 'XRP/USDT': 0.6}
+
+
+class _TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The stdlib default backlog of 5 resets connections long before the mock's own limits kick in
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients that gave up (e.g. on a stalled response) close the socket before the reply
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class MockBackend:
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=20.0, jitter_ms=5.0, error_rate=0.0,
+                 max_rps=None, workers=None, prices=None, starting_usdt=10000.0, fee=0.001, seed=None,
+                 batch_endpoint=True, stall_rate=0.0, stall_ms=0.0):
+        self.host = host
+        self.port = port
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.error_rate = float(error_rate)
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self.starting_usdt = float(starting_usdt)
+        self.fee = float(fee)
+        self.batch_endpoint = bool(batch_endpoint)
+        self.stall_rate = float(stall_rate)
+        self.stall_ms = float(stall_ms)
+        self.balances = {}
+        self.credentials = {}
+        self.orders = {}
+        self.orders_by_client_id = {}
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._order_ids = itertools.count(1)
+        self._bucket = _TokenBucket(max_rps) if max_rps else None
+        self._workers = threading.BoundedSemaphore(int(workers)) if workers else None
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self._server.server_address[1]}" if self._server else None
+
+    # ----- lifecycle -----
+
+    def start(self):
+        if self._server is not None:
+            return self
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                backend._handle(self, 'GET')
+
+            def do_POST(self):
+                backend._handle(self, 'POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _Server((self.host, self.port), Handler)
+        threading.Thread(target=self._server.serve_forever, name='mock-backend', daemon=True).start()
+        logger.info(f"Mock backend listening on {self.url}")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ----- request handling -----
+
+    def _handle(self, request, method):
+        path = request.path.split('?')[0].rstrip('/')
+        length = int(request.headers.get('Content-Length') or 0)
+        raw = request.rfile.read(length) if length else b''
+        route = self._route_name(method, path)
+        if self._bucket is not None and not self._bucket.take():
+            return self._respond(request, route, 429, {'error': 'rate_limited'})
+        if self._workers is not None:
+            self._workers.acquire()
+        try:
+            delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+            if delay > 0:
+                time.sleep(delay / 1000.0)
+            if route != 'health' and self.error_rate and self._rng.random() < self.error_rate:
+                return self._respond(request, route, 500, {'error': 'injected_error'})
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                return self._respond(request, route, 400, {'error': 'invalid_json'})
+            status, payload = self._dispatch(route, path, body)
+            if route in ('trade', 'trade_batch') and self.stall_rate and self._rng.random() < self.stall_rate:
+                time.sleep(self.stall_ms / 1000.0)
+            return self._respond(request, route, status, payload)
+        finally:
+            if self._workers is not None:
+                self._workers.release()
+
+    @staticmethod
+    def _route_name(method, path):
+        if method == 'GET' and path == '/api/health':
+            return 'health'
+        if method == 'POST' and path == '/api/credentials':
+            return 'credentials'
+        if method == 'GET' and path.startswith('/api/balance/'):
+            return 'balance'
+        if method == 'GET' and path.startswith('/api/trade/'):
+            return 'trade_lookup'
+        if method == 'POST' and path == '/api/trade':
+            return 'trade'
+        if method == 'POST' and path == '/api/trade/batch':
+            return 'trade_batch'
+        return 'unknown'
+
+    def _dispatch(self, route, path, body):
+        if route == 'health':
+            return 200, {'ok': True, 'status': 'ok'}
+        if route == 'credentials':
+            return self._credentials(body)
+        if route == 'balance':
+            return self._balance(path.rsplit('/', 1)[-1])
+        if route == 'trade':
+            return self._trade(body)
+        if route == 'trade_lookup':
+            with self._lock:
+                order = self.orders_by_client_id.get(path.rsplit('/', 1)[-1])
+            return (200, order) if order else (404, {'error': 'order_not_found'})
+        if route == 'trade_batch' and self.batch_endpoint:
+            return self._trade_batch(body)
+        return 404, {'error': 'not_found'}
+
+    def _respond(self, request, route, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        with self._lock:
+            self.stats[(route, status)] += 1
+        request.send_response(status)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def _account(self, user_id):
+        if user_id not in self.balances:
+            self.balances[user_id] = {'USDT': self.starting_usdt}
+        return self.balances[user_id]
+
+    def _credentials(self, body):
+        user_id, api_key, api_secret = body.get('userId'), body.get('apiKey'), body.get('apiSecret')
+        if not user_id or not api_key or not api_secret:
+            return 400, {'ok': False, 'error': 'missing_fields'}
+        with self._lock:
+            self.credentials[user_id] = {'exchange': body.get('exchange'), 'apiKey': api_key}
+            self._account(user_id)
+        return 200, {'ok': True, 'validated': True, 'canTrade': True, 'exchange': body.get('exchange')}
+
+    def _balance(self, user_id):
+        with self._lock:
+            account = dict(self._account(user_id))
+        return 200, {
+            'total': account,
+            'free': dict(account),
+            'used': {cur: 0.0 for cur in account},
+        }
+
+    def _trade(self, body):
+        user_id, side = body.get('userId'), str(body.get('side', '')).lower()
+        symbol = body.get('symbolCcxt') or body.get('symbol')
+        try:
+            amount_usd = float(body.get('amountUsd'))
+        except (TypeError, ValueError):
+            return 400, {'error': 'invalid_amount'}
+        if not user_id or side not in ('buy', 'sell') or amount_usd <= 0:
+            return 400, {'error': 'invalid_order'}
+        price = self.prices.get(symbol)
+        if price is None:
+            return 400, {'error': f'unknown_symbol_{symbol}'}
+        base, quote = symbol.split('/')
+        qty = amount_usd / price
+        fee = amount_usd * self.fee
+        client_order_id = body.get('clientOrderId')
+        with self._lock:
+            if client_order_id and client_order_id in self.orders_by_client_id:
+                self.stats['duplicates'] += 1
+                return 200, self.orders_by_client_id[client_order_id]
+            account = self._account(user_id)
+            if side == 'buy':
+                if account.get(quote, 0.0) < amount_usd + fee:
+                    return 400, {'error': 'insufficient_funds'}
+                account[quote] = account.get(quote, 0.0) - amount_usd - fee
+                account[base] = account.get(base, 0.0) + qty
+            else:
+                if account.get(base, 0.0) < qty - 1e-12:
+                    return 400, {'error': 'insufficient_position'}
+                account[base] = account.get(base, 0.0) - qty
+                account[quote] = account.get(quote, 0.0) + amount_usd - fee
+            order = {
+                'orderId': f"mock-{next(self._order_ids)}",
+                'clientOrderId': client_order_id,
+                'status': 'filled',
+                'side': side,
+                'symbol': symbol,
+                'price': price,
+                'qty': qty,
+                'amountUsd': amount_usd,
+                'fee': fee,
+                'timestamp': int(time.time() * 1000),
+            }
+            self.orders[order['orderId']] = order
+            if client_order_id:
+                self.orders_by_client_id[client_order_id] = order
+        return 200, order
+
+
+    def _trade_batch(self, body):
+        """Fill each order independently; one response carries a result per order."""
+        orders = body.get('orders')
+        if not isinstance(orders, list):
+            return 400, {'error': 'invalid_batch'}
+        results = []
+        for order in orders:
+            status, payload = self._trade(dict(order, userId=body.get('userId')))
+            results.append(payload if status == 200 else {'error': payload.get('error', f'http_{status}')})
+        return 200, {'results': results}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s')
+    parser = argparse.ArgumentParser(description='Local mock of the CryptoPiggy backend proxy')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--jitter-ms', type=float, default=5.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of non-health requests answered with 500')
+    parser.add_argument('--max-rps', type=float, help='Requests per second before answering 429')
+    parser.add_argument('--workers', type=int, help='Concurrent requests served; the rest queue')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--no-batch', action='store_true', help='Answer /api/trade/batch with 404')
+    parser.add_argument('--stall-rate', type=float, default=0.0, help='Fraction of orders answered late after executing')
+    parser.add_argument('--stall-ms', type=float, default=0.0, help='Extra delay for stalled order responses')
+    args = parser.parse_args()
+
+    backend = MockBackend(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+                          args.max_rps, args.workers, seed=args.seed, batch_endpoint=not args.no_batch,
+                          stall_rate=args.stall_rate, stall_ms=args.stall_ms).start()
+    print(f"✅ Mock backend on {backend.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        backend.stop()
@@ -0,0 +1,177 @@
+"""
+Non-blocking Telegram notifications.
+
+TelegramNotifier.notify() only appends to a bounded in-memory queue, so
+placing an order never waits on the Telegram API. A background thread
+drains the queue, coalesces bursts into a single digest message and spaces
+sends to stay under Telegram's per-chat rate limit. Works with both the
+synchronous python-telegram-bot (<20) and the v20+ API where send_message
+is a coroutine.
+"""
+
+import time
+import asyncio
+import inspect
+import logging
+import threading
+from collections import deque
+from datetime import timedelta
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_CHARS = 4096
+
+
+class TelegramNotifier:
+    def __init__(self, bot, chat_id, max_queue=200, coalesce_seconds=2.0,
+                 min_interval=1.0, max_batch=20, metrics=None):
+        """
+        `coalesce_seconds` is how long the sender waits after the first
+        queued message for more to arrive before sending one digest.
+        `min_interval` is the minimum spacing between sends (Telegram allows
+        roughly one message per second per chat). When the queue is full
+        the oldest message is dropped.
+        """
+        self.bot = bot
+        self.chat_id = chat_id
+        self.coalesce_seconds = float(coalesce_seconds)
+        self.min_interval = float(min_interval)
+        self.max_batch = int(max_batch)
+        self.metrics = metrics
+        self._queue = deque(maxlen=int(max_queue))
+        self._cond = threading.Condition()
+        self._thread = None
+        self._loop = None
+        self._stopping = False
+        self._flushing = False
+        self._in_flight = 0
+        self._last_send = 0.0
+
+    @property
+    def enabled(self):
+        return self.bot is not None and bool(self.chat_id)
+
+    def notify(self, message):
+        """Queue a message for background delivery. Never blocks; returns False when disabled."""
+        if not self.enabled:
+            return False
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self._count('dropped')
+            self._queue.append(str(message))
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='telegram-notifier', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return True
+
+    def pending(self):
+        with self._cond:
+            return len(self._queue) + self._in_flight
+
+    def flush(self, timeout=10.0):
+        """Wait until everything queued so far has been sent (or failed). Returns True if drained."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self._flushing = False
+        return True
+
+    def stop(self, timeout=5.0):
+        """Send what is queued, then stop the sender thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ----- sender thread -----
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if not self._queue:
+                    break
+                # Give a burst a moment to accumulate so it goes out as one digest
+                deadline = time.monotonic() + self.coalesce_seconds
+                while len(self._queue) < self.max_batch and not (self._stopping or self._flushing):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+                self._in_flight = len(batch)
+                if not self._queue:
+                    self._flushing = False
+            try:
+                for text in self._format(batch):
+                    self._send(text)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+        if self._loop is not None:
+            self._loop.close()
+            self._loop = None
+
+    @staticmethod
+    def _format(batch):
+        """One message as-is; several become a digest, split to fit Telegram's length limit."""
+        if len(batch) == 1:
+            return [batch[0][:MAX_MESSAGE_CHARS]]
+        chunks, current = [], f"📬 {len(batch)} updates"
+        for message in batch:
+            line = '\n• ' + message
+            if len(current) + len(line) > MAX_MESSAGE_CHARS:
+                chunks.append(current)
+                current = line.lstrip('\n')[:MAX_MESSAGE_CHARS]
+            else:
+                current += line
+        chunks.append(current)
+        return chunks
+
+    def _send(self, text, attempts=3):
+        for _ in range(attempts):
+            wait = self._last_send + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                start = time.perf_counter()
+                result = self.bot.send_message(chat_id=self.chat_id, text=text)
+                if inspect.isawaitable(result):
+                    if self._loop is None:
+                        self._loop = asyncio.new_event_loop()
+                    self._loop.run_until_complete(result)
+                self._last_send = time.monotonic()
+                if self.metrics is not None:
+                    self.metrics.observe('stage_seconds', time.perf_counter() - start, stage='telegram_send')
+                self._count('sent')
+                return True
+            except Exception as e:
+                self._last_send = time.monotonic()
+                retry_after = getattr(e, 'retry_after', None)
+                if retry_after is None:
+                    logger.exception("Failed to send telegram message")
+                    break
+                # Flood control: Telegram tells us how long to back off
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                logger.warning(f"Telegram rate limited; retrying in {retry_after}s")
+                time.sleep(float(retry_after))
+        self._count('failed')
+        return False
+
+    def _count(self, status):
+        if self.metrics is not None:
+            self.metrics.inc('notifications_total', status=status)
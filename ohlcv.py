@@ -0,0 +1,111 @@
+"""
+Compact OHLCV container.
+
+Candles keeps bars as int64 epoch-millisecond timestamps plus one float32
+(5 x N) block for open/high/low/close/volume: 28 bytes a bar, against 56
+for the float64 DataFrame with a datetime column that fetch_ohlcv_df()
+builds. Slices are views of the same arrays, the datetime column is only
+computed when asked for, and to_frame() wraps the arrays in a DataFrame
+without copying them, so strategies, the signal engine and the panel
+accept Candles wherever they take an OHLCV frame.
+
+Indicators computed on the float32 columns come back as float64 (pandas
+rolling/ewm upcast), so only the raw candles are stored at reduced
+precision (~7 significant digits).
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+COLUMNS = ('timestamp',) + PRICE_COLUMNS
+
+
+class Candles:
+    __slots__ = ('timestamp', 'prices')
+
+    def __init__(self, timestamp, prices):
+        """`timestamp`: int64 epoch ms, shape (N,); `prices`: float32 rows open/high/low/close/volume, shape (5, N)."""
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float32).reshape(len(PRICE_COLUMNS), -1)
+        if self.prices.shape[1] != len(self.timestamp):
+            raise ValueError(f'{len(self.timestamp)} timestamps for {self.prices.shape[1]} bars')
+
+    @classmethod
+    def from_array(cls, arr):
+        """Nx6 [ts, o, h, l, c, v] rows (a ccxt fetch_ohlcv result or DataProvider array)."""
+        arr = np.asarray(arr, dtype=np.float64).reshape(-1, 6)
+        return cls(arr[:, 0].astype(np.int64), np.ascontiguousarray(arr[:, 1:].T, dtype=np.float32))
+
+    @classmethod
+    def from_frame(cls, df):
+        """An OHLCV DataFrame with a `timestamp` (epoch ms) or `datetime` column."""
+        if 'timestamp' in df.columns:
+            ts = df['timestamp'].to_numpy(dtype=np.int64)
+        else:
+            ts = pd.to_datetime(df['datetime']).to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        return cls(ts, np.vstack([df[c].to_numpy(dtype=np.float32) for c in PRICE_COLUMNS]))
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    @property
+    def empty(self):
+        return len(self.timestamp) == 0
+
+    @property
+    def columns(self):
+        return list(COLUMNS)
+
+    @property
+    def nbytes(self):
+        return self.timestamp.nbytes + self.prices.nbytes
+
+    def column(self, name):
+        """One column as an array; views for stored columns, `datetime` is computed on each call."""
+        if name == 'timestamp':
+            return self.timestamp
+        if name == 'datetime':
+            return pd.to_datetime(self.timestamp, unit='ms').to_numpy()
+        try:
+            return self.prices[PRICE_COLUMNS.index(name)]
+        except ValueError:
+            raise KeyError(name) from None
+
+    def __getitem__(self, key):
+        """`candles['close']` -> Series view (like a DataFrame column); `candles[a:b]` -> Candles view."""
+        if isinstance(key, str):
+            return pd.Series(self.column(key), name=key, copy=False)
+        if isinstance(key, slice):
+            return Candles(self.timestamp[key], self.prices[:, key])
+        raise TypeError(f'Candles indices must be column names or slices, not {type(key).__name__}')
+
+    def tail(self, n):
+        return self[-n:] if n else self[:0]
+
+    def to_frame(self, columns=None, datetime=False):
+        """DataFrame over the same memory; `columns` prunes it, `datetime` adds that (computed) column.
+
+        The frame shares the arrays, so treat it as read-only or copy() it first.
+        """
+        data = {}
+        for name in columns or COLUMNS:
+            data[name] = self.column(name)
+            if name == 'timestamp' and datetime:
+                data['datetime'] = self.column('datetime')
+        return pd.DataFrame(data, copy=False)
+
+    def to_array(self):
+        """Nx6 float64 [ts, o, h, l, c, v] rows (a copy)."""
+        out = np.empty((len(self), 6))
+        out[:, 0] = self.timestamp
+        out[:, 1:] = self.prices.T
+        return out
+
+    def concat(self, other):
+        """Bars of `self` followed by `other` (a new container)."""
+        return Candles(np.concatenate([self.timestamp, other.timestamp]),
+                       np.concatenate([self.prices, other.prices], axis=1))
+
+    def __repr__(self):
+        return f'Candles({len(self)} bars, {self.nbytes / 1e6:.1f} MB)'
@@ -0,0 +1,164 @@
+"""
+Cross-sectional candle panels: many symbols evaluated in one pass.
+
+Panel aligns the candles of a universe of symbols on one timestamp index
+and keeps every column as a wide DataFrame (rows = bars, columns =
+symbols). The panel indicators below compute SMA/EMA/RSI for all symbols
+in one vectorized call with the same formulas as pandas_ta, and
+SignalEngine.evaluate_panel() hands strategies those wide frames in place
+of a per-symbol frame, so the column arithmetic in populate_entry_trend()
+and populate_exit_trend() produces signals for the whole universe at once.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+PANEL_INDICATORS = {}
+
+
+def register_panel_indicator(name):
+    """Register `fn(panel, **kwargs) -> wide DataFrame`, the panel twin of strategies.INDICATORS[name]."""
+    def wrap(fn):
+        PANEL_INDICATORS[name] = fn
+        return fn
+    return wrap
+
+
+def _rolling_mean(values, length):
+    """Column-wise rolling mean of a 2D array; NaN until `length` valid rows (leading NaNs only)."""
+    valid = ~np.isnan(values)
+    # Centre each column before summing so long cumsums keep their precision
+    ref = np.nanmean(values, axis=0) if valid.any() else np.zeros(values.shape[1])
+    sums = np.cumsum(np.where(valid, values - ref, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    out = sums.copy()
+    out[length:] -= sums[:-length]
+    window = counts.copy()
+    window[length:] -= counts[:-length]
+    out = out / length + ref
+    out[window < length] = np.nan
+    return out
+
+
+def _decay(values, factor):
+    """y[t] = factor * y[t-1] + values[t] down each column, in one C pass."""
+    return lfilter([1.0], [1.0, -factor], values, axis=0)
+
+
+def _wide(panel, values):
+    return pd.DataFrame(values, index=panel.index, columns=panel.symbols)
+
+
+@register_panel_indicator('sma')
+def _sma(panel, length, source='close'):
+    return _wide(panel, _rolling_mean(panel.values(source), length))
+
+
+@register_panel_indicator('ema')
+def _ema(panel, length, source='close'):
+    # pandas_ta: seeded with the SMA of each symbol's first `length` bars, then ewm(span, adjust=False)
+    alpha = 2.0 / (length + 1)
+    values = panel.values(source)
+    seed = panel.first_row + length - 1
+    cols = np.flatnonzero(seed < len(values))
+    before = np.arange(len(values))[:, None] < seed
+    x = np.where(before, 0.0, alpha * values)
+    # The recurrence starts from zero, so feeding the SMA itself at the seed row starts it there
+    x[seed[cols], cols] = _rolling_mean(values, length)[seed[cols], cols]
+    out = _decay(x, 1.0 - alpha)
+    out[before] = np.nan
+    return _wide(panel, out)
+
+
+@register_panel_indicator('rsi')
+def _rsi(panel, length=14, source='close'):
+    # pandas_ta: Wilder's RMA = ewm(alpha=1/length, adjust=True, min_periods=length) of gains and losses.
+    # Both averages share the same normalizer, so it cancels in gains / (gains + losses)
+    values = panel.values(source)
+    change = np.full_like(values, np.nan)
+    change[1:] = values[1:] - values[:-1]
+    valid = ~np.isnan(change)
+    gains = _decay(np.where(valid, np.clip(change, 0, None), 0.0), 1.0 - 1.0 / length)
+    losses = _decay(np.where(valid, -np.clip(change, None, 0), 0.0), 1.0 - 1.0 / length)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = 100 * gains / (gains + losses)
+    out[np.cumsum(valid, axis=0) < length] = np.nan
+    return _wide(panel, out)
+
+
+class Panel:
+    """Candles of many symbols on one time index, one wide DataFrame per column.
+
+    Columns are materialized on first use, so a panel only pays for the
+    columns its strategies read.
+    """
+
+    def __init__(self, frames):
+        """`frames` is {symbol: OHLCV DataFrame} as returned by fetch_ohlcv_df(); empty frames are skipped."""
+        self.frames = {s: df for s, df in frames.items() if df is not None and len(df)}
+        self.symbols = list(self.frames)
+        stamps = [df['timestamp'].to_numpy(dtype=np.int64) for df in self.frames.values()]
+        # Usual case: every symbol has the same bars, so rows line up without a join
+        self._aligned = bool(stamps) and all(len(ts) == len(stamps[0]) and np.array_equal(ts, stamps[0]) for ts in stamps)
+        if self._aligned:
+            self.index = stamps[0]
+            rows = np.arange(len(self.index))
+            self._rows = {s: rows for s in self.symbols}
+        else:
+            self.index = np.unique(np.concatenate(stamps)) if stamps else np.empty(0, dtype=np.int64)
+            self._rows = {s: np.searchsorted(self.index, ts) for s, ts in zip(self.symbols, stamps)}
+        self.first_row = np.array([self._rows[s][0] for s in self.symbols], dtype=np.int64)
+        self.last_row = np.array([self._rows[s][-1] for s in self.symbols], dtype=np.int64)
+        self._values = {}
+        self._columns = {}
+
+    def values(self, column):
+        """(bars x symbols) float array of one candle column."""
+        arr = self._values.get(column)
+        if arr is None:
+            columns = [df[column].to_numpy(dtype=float) for df in self.frames.values()]
+            if self._aligned:
+                arr = np.column_stack(columns) if columns else np.empty((0, 0))
+            else:
+                arr = self._scatter(dict(zip(self.symbols, columns)), float)
+                # A bar missing mid-history repeats the previous candle so rolling windows stay full
+                arr = np.nan_to_num(arr) if column == 'volume' else pd.DataFrame(arr).ffill().to_numpy()
+            self._values[column] = arr
+        return arr
+
+    def __getitem__(self, column):
+        frame = self._columns.get(column)
+        if frame is None:
+            frame = self._columns[column] = pd.DataFrame(self.values(column), index=self.index, columns=self.symbols)
+        return frame
+
+    def __len__(self):
+        return len(self.index)
+
+    def _scatter(self, values, dtype):
+        out = np.full((len(self.index), len(self.symbols)), np.nan, dtype=dtype)
+        for j, symbol in enumerate(self.symbols):
+            if symbol in values:
+                out[self._rows[symbol], j] = np.asarray(values[symbol])
+        return out
+
+    def widen(self, values):
+        """{symbol: values aligned with that symbol's frame} -> wide DataFrame on the panel index."""
+        first = next(iter(values.values()), None)
+        dtype = object if first is not None and np.asarray(first).dtype == object else float
+        return pd.DataFrame(self._scatter(values, dtype), index=self.index, columns=self.symbols)
+
+    def narrow(self, frame, symbol):
+        """Inverse of widen(): the values of one symbol's column aligned with its own frame."""
+        return frame[symbol].to_numpy()[self._rows[symbol]]
+
+    def latest(self, view):
+        """{symbol: {column: value}} at each symbol's own last bar, for a {column: wide frame} view."""
+        cols = np.arange(len(self.symbols))
+        rows = {c: frame.to_numpy()[self.last_row, cols] for c, frame in view.items() if isinstance(frame, pd.DataFrame)}
+        return {s: {c: values[j] for c, values in rows.items()} for j, s in enumerate(self.symbols)}
@@ -0,0 +1,108 @@
+"""
+Persistent table of in-flight live orders, keyed by client order ID.
+
+Every live order is written here (with its generated client order ID)
+before it is sent and removed once the outcome is known. If a request
+times out after the backend or exchange has already executed it, the
+entry survives a crash or restart and reconcile_pending_orders() can
+look the order up by ID instead of guessing, so retries never double-fill.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+# Binance caps client order IDs at 36 characters of [A-Za-z0-9._:/-]
+ID_PREFIX = 'cp'
+
+
+def new_client_order_id():
+    return f"{ID_PREFIX}-{uuid.uuid4().hex[:24]}"
+
+
+class PendingOrders:
+    def __init__(self, path='pending_orders.json'):
+        self.path = path
+        self._orders = {}
+        self._lock = threading.Lock()
+        # Serializes save(): the pipeline worker and reconcile_pending_orders() both persist
+        self._write_lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, client_order_id):
+        return client_order_id in self._orders
+
+    def get(self, client_order_id):
+        entry = self._orders.get(client_order_id)
+        return dict(entry) if entry else None
+
+    def open(self):
+        """Entries still awaiting an outcome, oldest first."""
+        with self._lock:
+            return sorted((dict(e) for e in self._orders.values()), key=lambda e: e['created'])
+
+    def add(self, client_order_id, route, side, symbol, amount_usd, qty, price, persist=True, **extra):
+        with self._lock:
+            self._orders[client_order_id] = {
+                'client_order_id': client_order_id,
+                'route': route,
+                'side': side,
+                'symbol': symbol,
+                'amount_usd': amount_usd,
+                'qty': qty,
+                'price': price,
+                'created': time.time(),
+                'status': 'pending',
+                **extra,
+            }
+        if persist:
+            self.save()
+
+    def update(self, client_order_id, persist=True, **fields):
+        with self._lock:
+            if client_order_id in self._orders:
+                self._orders[client_order_id].update(fields)
+        if persist:
+            self.save()
+
+    def remove(self, client_order_id, persist=True):
+        with self._lock:
+            removed = self._orders.pop(client_order_id, None)
+        if persist and removed is not None:
+            self.save()
+        return removed
+
+    def save(self):
+        """Atomic write so a crash mid-save never loses the table.
+
+        The snapshot is taken under the write lock, so concurrent saves land
+        in order and never share the temp file.
+        """
+        with self._write_lock:
+            with self._lock:
+                data = list(self._orders.values())
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+            with self._lock:
+                self._orders = {e['client_order_id']: e for e in entries}
+            if self._orders:
+                logger.warning(f"{len(self._orders)} live order(s) pending from a previous run; reconcile before trading")
+        except Exception:
+            logger.exception(f"Failed to load {self.path}")
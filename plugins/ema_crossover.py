@@ -0,0 +1,31 @@
+"""
+Example strategy plugin: EMA fast/slow crossover with an RSI filter.
+
+Any BaseStrategy subclass in this directory is registered on startup
+(see strategies.load_plugins). Declaring indicators() instead of
+overriding populate_indicators() lets the signal engine share the
+computations with every other strategy on the same symbol.
+"""
+
+from strategies import BaseStrategy
+
+
+class EMA_Crossover(BaseStrategy):
+    default_params = {'fast': 12, 'slow': 26, 'rsi_period': 14, 'rsi_max': 70}
+    columns = ()
+
+    def indicators(self):
+        return {
+            'ema_fast': ('ema', {'length': int(self.params['fast'])}),
+            'ema_slow': ('ema', {'length': int(self.params['slow'])}),
+            'rsi': ('rsi', {'length': int(self.params['rsi_period'])}),
+        }
+
+    def populate_entry_trend(self, df):
+        crossed_up = (df['ema_fast'] > df['ema_slow']) & (df['ema_fast'].shift(1) <= df['ema_slow'].shift(1))
+        df['entry'] = crossed_up & (df['rsi'] < self.params['rsi_max'])
+        return df
+
+    def populate_exit_trend(self, df):
+        df['exit'] = (df['ema_fast'] < df['ema_slow']) & (df['ema_fast'].shift(1) >= df['ema_slow'].shift(1))
+        return df
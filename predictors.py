@@ -0,0 +1,251 @@
+"""
+Interchangeable next-close predictors for the ML gate.
+
+The gate in start_bot() and backtest() only asks "will the next close be
+above this one?", which rarely needs a PyTorch LSTM. Every backend here
+implements the same small interface on min-max scaled windows:
+
+    fit(X, y)    X: (rows x window) scaled closes, y: the close after each row
+    predict(X)   -> next scaled close per row
+
+Backends: 'lstm' and 'gru' (ml.py models, trained full-batch for
+`epochs`), 'ridge' (ridge autoregression in NumPy) and 'gbm' (sklearn
+histogram gradient boosting). The linear and tree models regress the move
+from the window's last close on the window's lags relative to it, so they
+extrapolate past the training price range. Register more with
+@register_predictor like strategies.
+
+evaluate_predictors() trains each backend on the older part of a close
+series and reports training time, single-window inference latency, mean
+absolute error and directional accuracy on the rest; cheapest() picks the
+lowest-latency backend that meets an accuracy bar. From the command line:
+
+    python predictors.py --data candles/ --symbol BTC/USDT --min-accuracy 0.52
+"""
+
+import os
+import time
+import logging
+import argparse
+import statistics
+
+import numpy as np
+
+from ml import GRUPredictor, LSTMPredictor, fit_full_batch, make_windows, minmax_scale
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+# Optional: the 'gbm' backend needs scikit-learn
+try:
+    from sklearn.ensemble import HistGradientBoostingRegressor
+except Exception:
+    HistGradientBoostingRegressor = None
+
+PREDICTORS = {}
+
+
+def register_predictor(cls):
+    """Register a BasePredictor subclass under its `name`."""
+    PREDICTORS[cls.name] = cls
+    return cls
+
+
+def make_predictor(backend, params=None):
+    if backend not in PREDICTORS:
+        raise KeyError(f'Unknown predictor backend {backend!r} (available: {", ".join(PREDICTORS)})')
+    return PREDICTORS[backend](params)
+
+
+class BasePredictor:
+    name = None
+    default_params = {}
+
+    def __init__(self, params=None):
+        # Unknown keys are ignored, so one params dict can serve every backend
+        self.params = dict(self.default_params, **(params or {}))
+
+    def fit(self, X, y):
+        raise NotImplementedError
+
+    def predict(self, X):
+        raise NotImplementedError
+
+
+def _relative(X, lags=None):
+    """Lags relative to each window's last value: (rows x lags - 1) deltas, dropping the always-zero last one."""
+    X = np.asarray(X, dtype=float)
+    if lags:
+        X = X[:, -lags:]
+    return X[:, :-1] - X[:, -1:]
+
+
+class _TorchPredictor(BasePredictor):
+    default_params = {'epochs': 5, 'lr': 0.001}
+
+    def _module(self):
+        raise NotImplementedError
+
+    def fit(self, X, y):
+        self.model = fit_full_batch(self._module(), X, y, int(self.params['epochs']), float(self.params['lr']))
+        return self
+
+    def predict(self, X):
+        import torch
+        with torch.no_grad():
+            return self.model(torch.tensor(np.asarray(X)[:, :, None], dtype=torch.float32)).numpy().ravel()
+
+
+@register_predictor
+class LSTMBackend(_TorchPredictor):
+    name = 'lstm'
+
+    def _module(self):
+        return LSTMPredictor()
+
+
+@register_predictor
+class GRUBackend(_TorchPredictor):
+    name = 'gru'
+
+    def _module(self):
+        return GRUPredictor()
+
+
+@register_predictor
+class RidgeAR(BasePredictor):
+    """Linear autoregression with an L2 penalty, solved in closed form."""
+    name = 'ridge'
+    # `alpha` is relative to the mean lag variance; larger pulls the forecast towards "no move"
+    default_params = {'alpha': 0.1, 'lags': None}
+
+    def fit(self, X, y):
+        A = _relative(X, self.params['lags'])
+        t = np.asarray(y, dtype=float) - np.asarray(X)[:, -1]
+        self.mean_a, self.mean_t = A.mean(axis=0), t.mean()
+        A, t = A - self.mean_a, t - self.mean_t
+        gram = A.T @ A
+        penalty = self.params['alpha'] * max(np.trace(gram) / len(gram), 1e-12)
+        self.coef = np.linalg.solve(gram + penalty * np.eye(len(gram)), A.T @ t)
+        return self
+
+    def predict(self, X):
+        return np.asarray(X)[:, -1] + (_relative(X, self.params['lags']) - self.mean_a) @ self.coef + self.mean_t
+
+
+@register_predictor
+class GBMBackend(BasePredictor):
+    """sklearn HistGradientBoostingRegressor on the last `lags` relative lags."""
+    name = 'gbm'
+    default_params = {'lags': 20, 'max_iter': 100, 'learning_rate': 0.1, 'max_leaf_nodes': 15}
+
+    def fit(self, X, y):
+        if HistGradientBoostingRegressor is None:
+            raise ImportError('scikit-learn is required for the gbm predictor')
+        self.model = HistGradientBoostingRegressor(
+            max_iter=int(self.params['max_iter']),
+            learning_rate=float(self.params['learning_rate']),
+            max_leaf_nodes=int(self.params['max_leaf_nodes']),
+            random_state=0,
+        )
+        self.model.fit(_relative(X, self.params['lags']), np.asarray(y, dtype=float) - np.asarray(X)[:, -1])
+        return self
+
+    def predict(self, X):
+        return np.asarray(X)[:, -1] + self.model.predict(_relative(X, self.params['lags']))
+
+
+def predict_series(closes, window=50, backend='lstm', params=None):
+    """Fit `backend` on `closes` and predict the next close after every `window`-long run.
+
+    Aligned with `closes`: the first `window` entries are the closes themselves.
+    """
+    closes = np.asarray(closes, dtype=float)
+    scaled, minv, denom = minmax_scale(closes)
+    X, y = make_windows(scaled, window)
+    preds = make_predictor(backend, params).fit(X, y).predict(X) * denom + minv
+    return np.concatenate([closes[:window], preds])[:len(closes)]
+
+
+def evaluate_predictors(closes, window=50, backends=None, test_frac=0.2, params=None, repeat=50):
+    """Train each backend on the first 1 - `test_frac` of `closes` and score it on the rest.
+
+    Scaling uses the training part only, so nothing about the test period
+    leaks in. `params` is {backend: params}. Returns {backend: {'train_s',
+    'latency_ms' (one window, median of `repeat`), 'mae' (price units),
+    'directional_accuracy' (share of test bars, ignoring unchanged closes,
+    where the predicted move has the sign of the real one), 'test_windows'}}.
+    """
+    closes = np.asarray(closes, dtype=float)
+    cut = int(len(closes) * (1 - test_frac))
+    if cut <= window + 1 or cut >= len(closes):
+        raise ValueError(f'Need more than {window + 1} training closes and at least one test close')
+    _, minv, denom = minmax_scale(closes[:cut])
+    X, y = make_windows((closes - minv) / denom, window)
+    # Window i predicts close i + window; train on targets before `cut`
+    split = cut - window
+    last = X[split:, -1] * denom + minv
+    actual = y[split:] * denom + minv
+    moved = actual != last
+    report = {}
+    for backend in backends or PREDICTORS:
+        predictor = make_predictor(backend, (params or {}).get(backend))
+        start = time.perf_counter()
+        predictor.fit(X[:split], y[:split])
+        train_s = time.perf_counter() - start
+        pred = predictor.predict(X[split:]) * denom + minv
+        one = X[-1:]
+        predictor.predict(one)  # warm-up
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            predictor.predict(one)
+            samples.append(time.perf_counter() - start)
+        hits = np.sign(pred - last)[moved] == np.sign(actual - last)[moved]
+        report[backend] = {
+            'train_s': train_s,
+            'latency_ms': statistics.median(samples) * 1000,
+            'mae': float(np.abs(pred - actual).mean()),
+            'directional_accuracy': float(hits.mean()) if len(hits) else float('nan'),
+            'test_windows': int(len(actual)),
+        }
+    return report
+
+
+def cheapest(report, min_accuracy):
+    """Backend with the lowest inference latency (then training time) whose directional accuracy meets `min_accuracy`."""
+    passing = [(row['latency_ms'], row['train_s'], name) for name, row in report.items()
+               if row['directional_accuracy'] >= min_accuracy]
+    return min(passing)[2] if passing else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare predictor backends on stored or synthetic candles')
+    parser.add_argument('--data', help='Directory of <BASE>_<QUOTE>.csv candles (timestamp,open,high,low,close,volume)')
+    parser.add_argument('--symbol', help='Symbol to score (default: the first file in --data)')
+    parser.add_argument('--candles', type=int, default=3000, help='Synthetic 5m closes to use without --data')
+    parser.add_argument('--backends', help=f'Comma-separated subset of {",".join(PREDICTORS)}')
+    parser.add_argument('--window', type=int, default=50)
+    parser.add_argument('--epochs', type=int, default=5, help='Epochs for the lstm and gru backends')
+    parser.add_argument('--test-frac', type=float, default=0.2)
+    parser.add_argument('--min-accuracy', type=float, default=0.5, help='Directional accuracy bar for the recommendation')
+    args = parser.parse_args()
+
+    if args.data:
+        import pandas as pd
+        files = sorted(f for f in os.listdir(args.data) if f.endswith('.csv'))
+        name = args.symbol.replace('/', '_') + '.csv' if args.symbol else files[0]
+        closes = pd.read_csv(os.path.join(args.data, name))['close'].to_numpy(dtype=float)
+    else:
+        from synthetic_market import SyntheticMarket
+        closes = SyntheticMarket(seed=42, timeframe='5m').generate_one(args.candles)['close'].to_numpy()
+    backends = args.backends.split(',') if args.backends else None
+    torch_params = {'epochs': args.epochs}
+    report = evaluate_predictors(closes, args.window, backends, args.test_frac,
+                                 params={'lstm': torch_params, 'gru': torch_params})
+    print(f"  {'backend':<8} {'train':>9} {'latency':>10} {'MAE':>10} {'direction':>10}   ({len(closes)} closes, "
+          f"{next(iter(report.values()))['test_windows']} test bars)")
+    for name, row in report.items():
+        print(f"  {name:<8} {row['train_s']:8.2f}s {row['latency_ms']:8.3f}ms {row['mae']:10.4f} "
+              f"{row['directional_accuracy']:10.1%}")
+    choice = cheapest(report, args.min_accuracy)
+    print(f"\n  cheapest at >= {args.min_accuracy:.0%} directional accuracy: {choice or 'none'}")
@@ -0,0 +1,137 @@
+"""
+Opt-in profiling for CLI and dashboard actions.
+
+Two modes:
+  - 'cprofile': deterministic cProfile run; writes <label>-<ts>.prof (open with
+    snakeviz, or convert to a flamegraph with flameprof) and a top-N summary.
+  - 'sample': low-overhead wall-clock sampler over the calling thread; writes
+    <label>-<ts>.folded collapsed stacks (flamegraph.pl / speedscope) and a
+    top-N summary of the hottest functions.
+"""
+
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+MODES = ('cprofile', 'sample')
+
+
+class StackSampler:
+    """Sample one thread's Python stack every `interval` seconds from a daemon thread."""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        # Shorter GIL switch interval so the sampler thread actually gets to run at `interval`
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 2))
+        self._thread = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            sys.setswitchinterval(self._switch_interval)
+
+    def folded(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, n):
+        """Hottest functions by self samples, with inclusive samples alongside."""
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for fn in set(frames):
+                inclusive[fn] += count
+        total = sum(self.stacks.values()) or 1
+        lines = [f"{'self%':>7} {'total%':>7}  function", '-' * 60]
+        for fn, count in own.most_common(n):
+            lines.append(f"{100 * count / total:6.1f}% {100 * inclusive[fn] / total:6.1f}%  {fn}")
+        lines.append(f"\n{total} samples @ {self.interval * 1000:.1f} ms")
+        return '\n'.join(lines)
+
+
+class Profiler:
+    def __init__(self, mode='cprofile', out_dir='profiles', top_n=25, interval=0.005):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.out_dir = out_dir
+        self.top_n = int(top_n)
+        self.interval = float(interval)
+        self.last_report = None
+
+    @contextmanager
+    def profile(self, label):
+        """Profile the enclosed block; the report dict is left in self.last_report."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}")
+        start = time.perf_counter()
+        if self.mode == 'cprofile':
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+                path = base + '.prof'
+                prof.dump_stats(path)
+                buf = io.StringIO()
+                pstats.Stats(prof, stream=buf).sort_stats('cumulative').print_stats(self.top_n)
+                self._finish(label, base, path, buf.getvalue(), time.perf_counter() - start)
+        else:
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                path = base + '.folded'
+                with open(path, 'w') as f:
+                    f.write(sampler.folded())
+                self._finish(label, base, path, sampler.top(self.top_n), time.perf_counter() - start)
+
+    def _finish(self, label, base, path, summary, elapsed):
+        summary_path = base + '.txt'
+        with open(summary_path, 'w') as f:
+            f.write(summary)
+        self.last_report = {
+            'label': label,
+            'mode': self.mode,
+            'elapsed_s': elapsed,
+            'profile_path': path,
+            'summary_path': summary_path,
+            'summary': summary,
+        }
+        logger.info(f"Profile of {label} ({self.mode}, {elapsed:.2f}s) written to {path}")
+
+    def run(self, label, fn, *args, **kwargs):
+        with self.profile(label):
+            return fn(*args, **kwargs)
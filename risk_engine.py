@@ -0,0 +1,220 @@
+"""
+Event-driven risk engine.
+
+Every price the bot sees goes through CryptoPiggyTop2026.mark_price() into
+RiskEngine.on_price(), which updates the position's high-water mark and
+checks the trailing stop and portfolio drawdown in O(1). A crossed stop
+submits the exit right away instead of waiting for the next start_bot()
+wakeup: on the execution pipeline when it is running, otherwise through
+place_order() on a short-lived thread (so sync-mode bots never get the
+pipeline started behind their back). Between cycles a poller thread fetches
+tickers for held symbols every RISK_POLL_SECONDS (or takes prices from any
+local feed that calls mark_price()), so reaction time is sub-second.
+
+Exits go around the daily trade/loss limits and the minimum order size.
+Each exit is alerted and counted once; if the order is still rejected it
+is retried on later prices with exponential backoff (`retry_backoff`
+seconds, doubling up to `max_backoff`) rather than on every tick.
+
+Sells report their realized PnL through on_fill(), which maintains
+`consec_losses`; reaching `max_consec_loss` or `max_dd_pct` halts new
+entries until reset().
+"""
+
+import time
+import logging
+import threading
+
+from execution import IntentFuture
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+
+class RiskEngine:
+    def __init__(self, bot, poll_interval=0.5, price_source=None, retry_backoff=1.0, max_backoff=60.0):
+        """`price_source(symbol)` returns a price or None; defaults to the exchange ticker."""
+        self.bot = bot
+        self.poll_interval = float(poll_interval)
+        self.price_source = price_source or self._ticker_price
+        self.retry_backoff = float(retry_backoff)
+        self.max_backoff = float(max_backoff)
+        self.high_water = {}
+        self.halted = None
+        self._exiting = set()
+        # symbol -> (rejected attempts, monotonic time the next attempt is allowed)
+        self._retries = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ----- events -----
+
+    def on_price(self, symbol, price):
+        """Update the high-water mark and fire exits for crossed stops."""
+        pos = self.bot.positions.get(symbol)
+        if pos:
+            hwm = self.high_water.get(symbol)
+            if hwm is None:
+                hwm = max(float(pos.get('price', price)), price)
+            if price > hwm:
+                hwm = price
+            self.high_water[symbol] = hwm
+            stop_pct = self.bot.risk_settings.get('trailing_stop_pct')
+            if stop_pct and price <= hwm * (1 - stop_pct):
+                self._exit(symbol, 'trailing_stop', f"{symbol} ${price:,.2f} is {1 - price / hwm:.2%} below high ${hwm:,.2f}")
+        self._check_drawdown()
+
+    def on_fill(self, side, symbol, price, pnl=0.0):
+        """Track entries for trailing stops and consecutive losses on exits."""
+        if side == 'buy':
+            self.high_water[symbol] = float(price)
+            with self._lock:
+                self._retries.pop(symbol, None)
+            return
+        self.high_water.pop(symbol, None)
+        with self._lock:
+            self._exiting.discard(symbol)
+            self._retries.pop(symbol, None)
+        if pnl < 0:
+            self.bot.consec_losses += 1
+        else:
+            self.bot.consec_losses = 0
+        max_losses = self.bot.risk_settings.get('max_consec_loss')
+        if max_losses and self.bot.consec_losses >= max_losses:
+            self._halt('max_consec_loss', f"{self.bot.consec_losses} consecutive losing trades")
+        self._check_drawdown()
+
+    def _check_drawdown(self):
+        account = self.bot.account
+        if account.last_reconciled is None:
+            return
+        equity = account.equity
+        if equity > self.bot.peak_equity:
+            self.bot.peak_equity = equity
+            return
+        max_dd = self.bot.risk_settings.get('max_dd_pct')
+        peak = self.bot.peak_equity
+        if max_dd and peak > 0 and (peak - equity) / peak >= max_dd:
+            if self._halt('max_drawdown', f"equity ${equity:,.2f} is {(peak - equity) / peak:.2%} below peak ${peak:,.2f}"):
+                for symbol in list(self.bot.positions):
+                    self._exit(symbol, 'max_drawdown')
+
+    # ----- actions -----
+
+    def _exit(self, symbol, reason, detail=None):
+        with self._lock:
+            if symbol in self._exiting:
+                return
+            attempts, retry_at = self._retries.get(symbol, (0, 0.0))
+            if time.monotonic() < retry_at:
+                return
+            self._exiting.add(symbol)
+        pos = self.bot.positions.get(symbol)
+        if not pos:
+            with self._lock:
+                self._exiting.discard(symbol)
+                self._retries.pop(symbol, None)
+            return
+        if attempts:
+            logger.warning(f"Retrying risk exit ({reason}) {symbol}, attempt {attempts + 1}")
+        else:
+            logger.warning(f"🛑 Risk exit ({reason}) {symbol}" + (f": {detail}" if detail else ''))
+            self.bot.metrics.inc('risk_exits_total', reason=reason)
+            self.bot.send_telegram(f"🛑 RISK EXIT ({reason}): {symbol}" + (f" - {detail}" if detail else ''))
+        tags = {'strategy': 'risk', 'reason': reason}
+        pipeline = self.bot.execution
+        if pipeline is not None and pipeline.running:
+            price = self.bot.account.marks.get(symbol, pos.get('price', 0.0))
+            # The pipeline worker waits for any order in progress, so exits never nest inside one
+            future = pipeline.submit('sell', symbol, pos.get('qty', 0.0) * price,
+                                     guard=lambda: symbol in self.bot.positions, tags=tags)
+        else:
+            future = self._exit_sync(symbol, tags)
+        future.add_done_callback(lambda f, s=symbol, a=attempts + 1: self._exit_done(s, f, a))
+
+    def _exit_sync(self, symbol, tags):
+        """Sell through place_order() on its own thread, which waits for (never nests inside) an order in progress."""
+        future = IntentFuture()
+
+        def run():
+            result = None
+            try:
+                with self.bot.state_lock:
+                    pos = self.bot.positions.get(symbol)
+                    if not pos:
+                        future.reason = 'stale_intent'
+                    else:
+                        price = self.bot.account.marks.get(symbol, pos.get('price', 0.0))
+                        result = self.bot.place_order('sell', symbol, pos.get('qty', 0.0) * price,
+                                                      tags=tags, risk_exit=True)
+                        if result is None:
+                            future.reason = self.bot.last_rejection
+            except Exception as e:
+                logger.exception(f"Risk exit for {symbol} failed: {e}")
+                future.reason = 'failed'
+            future.set_result(result)
+
+        threading.Thread(target=run, name='risk-exit', daemon=True).start()
+        return future
+
+    def _exit_done(self, symbol, future, attempts):
+        with self._lock:
+            self._exiting.discard(symbol)
+            if future.result() is not None or symbol not in self.bot.positions:
+                self._retries.pop(symbol, None)
+                return
+            delay = min(self.max_backoff, self.retry_backoff * 2 ** (attempts - 1))
+            self._retries[symbol] = (attempts, time.monotonic() + delay)
+        logger.error(f"Risk exit for {symbol} rejected ({getattr(future, 'reason', None) or 'unknown'}); "
+                     f"retrying in {delay:.1f}s")
+
+    def _halt(self, reason, detail):
+        """Block new entries. Returns True the first time."""
+        if self.halted:
+            return False
+        self.halted = reason
+        logger.error(f"🛑 Risk halt ({reason}): {detail}. New entries blocked until reset.")
+        self.bot.metrics.inc('risk_halts_total', reason=reason)
+        self.bot.send_telegram(f"🛑 RISK HALT ({reason}): {detail}. New entries blocked.")
+        return True
+
+    def reset(self):
+        """Clear a halt and restart drawdown tracking from current equity."""
+        self.halted = None
+        self.bot.consec_losses = 0
+        self.bot.peak_equity = self.bot.account.equity
+
+    # ----- polling -----
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='risk-poller', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _ticker_price(self, symbol):
+        ticker = self.bot.safe_ccxt_call('fetch_ticker', symbol, max_retries=1)
+        if ticker and ticker.get('last'):
+            return float(ticker['last'])
+        return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            for symbol in list(self.bot.positions):
+                try:
+                    price = self.price_source(symbol)
+                except Exception:
+                    logger.exception(f"Risk price poll failed for {symbol}")
+                    price = None
+                if price:
+                    self.bot.mark_price(symbol, price)
+            self._stop.wait(max(0.0, self.poll_interval - (time.monotonic() - started)))
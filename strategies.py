@@ -0,0 +1,360 @@
+"""
+Trading strategies, indicator registry and the shared signal engine.
+
+A strategy declares the indicators it needs in indicators() as
+{column: (indicator, kwargs)}. SignalEngine compiles the declarations of
+every strategy it runs into one plan, computes each distinct indicator
+once per candle frame and hands each strategy a view with only its own
+columns, so twenty strategies on one symbol cost about one indicator pass.
+Strategies that compute their own columns in populate_indicators() still
+work; they get a full copy of the frame as before.
+
+evaluate_panel() does the same for a whole universe of symbols at once:
+strategies get wide (bar x symbol) frames from a panel.Panel instead.
+
+Extra strategies are discovered from a plugins directory (STRATEGY_PLUGIN_DIR,
+default the `plugins/` next to this module): every BaseStrategy subclass defined in a `*.py` file
+there is registered under its `name` (or its class name in snake_case).
+
+Ensemble runs several registered strategies through the engine in one
+batch and votes their entry/exit signals into a single decision, recording
+which strategies voted for each signal.
+"""
+
+import os
+import re
+import sys
+import glob
+import logging
+import importlib.util
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+from ohlcv import Candles
+from panel import PANEL_INDICATORS
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+# Bundled plugins, found regardless of the working directory
+PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plugins')
+
+INDICATORS = {}
+
+
+def register_indicator(name):
+    """Register `fn(df, **kwargs) -> Series` as a declarable indicator."""
+    def wrap(fn):
+        INDICATORS[name] = fn
+        return fn
+    return wrap
+
+
+@register_indicator('sma')
+def _sma(df, length, source='close'):
+    return ta.sma(df[source], length=length)
+
+
+@register_indicator('ema')
+def _ema(df, length, source='close'):
+    return ta.ema(df[source], length=length)
+
+
+@register_indicator('rsi')
+def _rsi(df, length=14, source='close'):
+    return ta.rsi(df[source], length=length)
+
+
+def indicator_key(indicator, kwargs):
+    """Canonical name of one indicator computation, e.g. 'sma(length=10)'."""
+    return f"{indicator}({','.join(f'{k}={kwargs[k]}' for k in sorted(kwargs))})"
+
+
+class BaseStrategy:
+    # Registry name; defaults to the class name in snake_case
+    name = None
+    default_params = {}
+    # Candle columns populate_entry/exit_trend read besides the declared indicators
+    columns = ('close',)
+    # Bound by the bot before populate_* runs: dp(symbol, timeframe, limit) -> OHLCV DataFrame
+    dp = None
+    symbol = None
+
+    def __init__(self, params=None):
+        self.params = dict(self.default_params, **(params or {}))
+
+    def indicators(self):
+        """Declared indicator dependencies as {column: (indicator, kwargs)}.
+
+        None means populate_indicators() computes its own columns.
+        """
+        return None
+
+    def informative(self, timeframe, limit=300):
+        """Bars of another timeframe for the symbol being evaluated.
+
+        Served from the bot's DataProvider, so extra timeframes are resampled
+        from cached base candles instead of costing exchange calls. Align them
+        with market_data.merge_timeframe().
+        """
+        if self.dp is None or self.symbol is None:
+            raise RuntimeError('informative() is only available while the bot runs the strategy')
+        return self.dp(self.symbol, timeframe, limit)
+
+    def populate_indicators(self, df):
+        specs = self.indicators()
+        if specs is None:
+            raise NotImplementedError
+        for column, (indicator, kwargs) in specs.items():
+            df[column] = INDICATORS[indicator](df, **kwargs)
+        return df
+
+    def populate_entry_trend(self, df):
+        raise NotImplementedError
+
+    def populate_exit_trend(self, df):
+        raise NotImplementedError
+
+
+class SMA_Crossover(BaseStrategy):
+    name = 'sma_crossover'
+    columns = ()
+
+    def indicators(self):
+        return {
+            'sma_short': ('sma', {'length': int(self.params.get('short_window', 10))}),
+            'sma_long': ('sma', {'length': int(self.params.get('long_window', 30))}),
+        }
+
+    def populate_entry_trend(self, df):
+        df['entry'] = (df['sma_short'] > df['sma_long']) & (df['sma_short'].shift(1) <= df['sma_long'].shift(1))
+        return df
+
+    def populate_exit_trend(self, df):
+        df['exit'] = (df['sma_short'] < df['sma_long']) & (df['sma_short'].shift(1) >= df['sma_long'].shift(1))
+        return df
+
+
+class RSI_Strategy(BaseStrategy):
+    name = 'rsi'
+    columns = ()
+
+    def indicators(self):
+        return {'rsi': ('rsi', {'length': int(self.params.get('rsi_period', 14))})}
+
+    def populate_entry_trend(self, df):
+        df['entry'] = df['rsi'] < 30
+        return df
+
+    def populate_exit_trend(self, df):
+        df['exit'] = df['rsi'] > 70
+        return df
+
+
+BUILTIN_STRATEGIES = (SMA_Crossover, RSI_Strategy)
+
+
+def strategy_name(cls):
+    return cls.name or re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', cls.__name__).lower()
+
+
+def load_plugins(directory=PLUGIN_DIR):
+    """Import each `*.py` in `directory`; returns {name: class} for the BaseStrategy subclasses they define."""
+    found = {}
+    if not directory or not os.path.isdir(directory):
+        return found
+    for path in sorted(glob.glob(os.path.join(directory, '*.py'))):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if stem.startswith('_'):
+            continue
+        module_name = f'cryptopiggy_plugins.{stem}'
+        try:
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+        except Exception:
+            logger.exception(f"Failed to load strategy plugin {path}")
+            sys.modules.pop(module_name, None)
+            continue
+        for obj in vars(module).values():
+            if isinstance(obj, type) and issubclass(obj, BaseStrategy) and obj.__module__ == module_name:
+                name = strategy_name(obj)
+                if name in found:
+                    logger.warning(f"Strategy plugin {name} in {path} shadows an earlier plugin")
+                found[name] = obj
+    if found:
+        logger.info(f"Loaded strategy plugins: {', '.join(sorted(found))}")
+    return found
+
+
+def declares_indicators(strategy):
+    """True if the engine can compute this strategy's indicators (it doesn't override populate_indicators)."""
+    return (type(strategy).populate_indicators is BaseStrategy.populate_indicators
+            and strategy.indicators() is not None)
+
+
+class SignalEngine:
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self._plans = {}
+
+    def compile(self, strategies):
+        """Plan for {name: strategy}: distinct indicator computations plus each strategy's column map."""
+        specs = {name: s.indicators() if declares_indicators(s) else None for name, s in strategies.items()}
+        cache_key = tuple((name, id(s), repr(specs[name]), tuple(s.columns)) for name, s in strategies.items())
+        plan = self._plans.get(cache_key)
+        if plan is None:
+            computations = {}
+            views = {}
+            for name, declared in specs.items():
+                if declared is None:
+                    views[name] = None
+                    continue
+                mapping = {}
+                for column, (indicator, kwargs) in declared.items():
+                    key = indicator_key(indicator, kwargs)
+                    computations.setdefault(key, (indicator, kwargs))
+                    mapping[column] = key
+                views[name] = mapping
+            plan = {'computations': computations, 'views': views}
+            # Params change under hyperopt; keep only recent plans
+            if len(self._plans) > 64:
+                self._plans.clear()
+            self._plans[cache_key] = plan
+        return plan
+
+    def evaluate(self, df, strategies, symbol=None, dp=None):
+        """Run every strategy on one candle frame (or ohlcv.Candles). Returns {name: frame with its columns + entry/exit}."""
+        if isinstance(df, Candles):
+            df = df.to_frame()
+        plan = self.compile(strategies)
+        computed = {key: INDICATORS[indicator](df, **kwargs) for key, (indicator, kwargs) in plan['computations'].items()}
+        if self.metrics is not None and computed:
+            self.metrics.inc('indicator_computations_total', len(computed))
+        results = {}
+        for name, strategy in strategies.items():
+            strategy.dp, strategy.symbol = dp, symbol
+            mapping = plan['views'][name]
+            if mapping is None:
+                frame = strategy.populate_indicators(df.copy())
+            else:
+                data = {c: df[c] for c in strategy.columns}
+                data.update({column: computed[key] for column, key in mapping.items()})
+                frame = pd.DataFrame(data, index=df.index)
+            frame = strategy.populate_entry_trend(frame)
+            results[name] = strategy.populate_exit_trend(frame)
+        return results
+
+    def evaluate_panel(self, panel, strategies, dp=None):
+        """Run every strategy on a panel.Panel at once. Returns {name: {column: wide frame}}.
+
+        Strategies whose declared indicators all have a panel implementation
+        see wide (bar x symbol) frames and are evaluated in one vectorized
+        pass; any other strategy is evaluated per symbol and its columns are
+        widened onto the panel index, so the result has the same shape.
+        """
+        plan = self.compile(strategies)
+        vectorized = {name for name, mapping in plan['views'].items()
+                      if mapping is not None and all(plan['computations'][key][0] in PANEL_INDICATORS
+                                                     for key in mapping.values())}
+        needed = {key for name in vectorized for key in plan['views'][name].values()}
+        computed = {key: PANEL_INDICATORS[indicator](panel, **kwargs)
+                    for key, (indicator, kwargs) in plan['computations'].items() if key in needed}
+        if self.metrics is not None and computed:
+            self.metrics.inc('indicator_computations_total', len(computed))
+        results = {}
+        for name, strategy in strategies.items():
+            if name in vectorized:
+                strategy.dp, strategy.symbol = dp, None
+                view = {c: panel[c] for c in strategy.columns}
+                view.update({column: computed[key] for column, key in plan['views'][name].items()})
+                view = strategy.populate_entry_trend(view)
+                results[name] = strategy.populate_exit_trend(view)
+                continue
+            frames = {symbol: self.evaluate(df, {name: strategy}, symbol, dp)[name]
+                      for symbol, df in panel.frames.items()}
+            columns = [c for c in next(iter(frames.values())).columns if all(c in f for f in frames.values())] if frames else []
+            results[name] = {c: panel.widen({symbol: f[c].to_numpy() for symbol, f in frames.items()}) for c in columns}
+        return results
+
+
+class Ensemble(BaseStrategy):
+    """Votes the signals of several strategies into one entry/exit decision.
+
+    params:
+      members   - strategy names to combine (default: every non-ensemble strategy in `registry`)
+      mode      - 'majority' (weighted score > 0.5), 'weighted' (score >= threshold),
+                  'unanimous' (every member) or 'any' (at least one member)
+      weights   - {name: weight}; members not listed weigh 1.0
+      threshold - score needed in 'weighted' mode (default 0.5)
+
+    Members are evaluated on the ensemble's candles (its `timeframe` param),
+    sharing one indicator plan. The output carries `entry_score`/`exit_score`
+    and the comma-joined names of the strategies that voted, in
+    `entry_votes`/`exit_votes`, on rows where a member signalled.
+    """
+    name = 'ensemble'
+    default_params = {'mode': 'majority'}
+    MODES = ('majority', 'weighted', 'unanimous', 'any')
+
+    def __init__(self, registry, engine, params=None):
+        super().__init__(params)
+        self.registry = registry
+        self.engine = engine
+
+    def members(self):
+        names = self.params.get('members')
+        if names is None:
+            names = [n for n, s in self.registry.items() if not isinstance(s, Ensemble)]
+        missing = [n for n in names if n not in self.registry]
+        if missing:
+            raise KeyError(f"Ensemble members not registered: {', '.join(missing)}")
+        return {n: self.registry[n] for n in names if not isinstance(self.registry[n], Ensemble)}
+
+    def _passes(self, score):
+        mode = self.params.get('mode', 'majority')
+        if mode == 'majority':
+            return score > 0.5
+        if mode == 'weighted':
+            return score >= float(self.params.get('threshold', 0.5))
+        if mode == 'unanimous':
+            return score >= 1.0 - 1e-9
+        if mode == 'any':
+            return score > 0
+        raise ValueError(f"Unknown ensemble mode {mode!r}; expected one of {', '.join(self.MODES)}")
+
+    def populate_indicators(self, df):
+        members = self.members()
+        if not members:
+            raise ValueError('Ensemble has no member strategies')
+        signals = self.engine.evaluate(df, members, self.symbol, self.dp)
+        for name, frame in signals.items():
+            df[f'entry_{name}'] = frame['entry'].fillna(False).astype(bool).to_numpy()
+            df[f'exit_{name}'] = frame['exit'].fillna(False).astype(bool).to_numpy()
+        return df
+
+    def _vote(self, df, kind):
+        # Voters come from this frame's columns rather than instance state, so
+        # interleaved evaluations of the shared ensemble never mix member lists
+        prefix, derived = f'{kind}_', (f'{kind}_score', f'{kind}_votes')
+        names = [c[len(prefix):] for c in df.columns
+                 if isinstance(c, str) and c.startswith(prefix) and c not in derived]
+        weights = self.params.get('weights') or {}
+        w = np.array([float(weights.get(n, 1.0)) for n in names])
+        votes = df[[f'{kind}_{n}' for n in names]].to_numpy(dtype=bool)
+        score = votes @ w / w.sum() if w.sum() > 0 else np.zeros(len(df))
+        df[f'{kind}_score'] = score
+        df[kind] = self._passes(score)
+        voters = np.empty(len(df), dtype=object)
+        for i in np.flatnonzero(votes.any(axis=1)):
+            voters[i] = ','.join(n for n, v in zip(names, votes[i]) if v)
+        df[f'{kind}_votes'] = voters
+        return df
+
+    def populate_entry_trend(self, df):
+        return self._vote(df, 'entry')
+
+    def populate_exit_trend(self, df):
+        return self._vote(df, 'exit')
@@ -9,13 +9,22 @@ import os
 import sys
 import json
 import time
+import atexit
+import shutil
 import logging
+import tempfile
 from pathlib import Path
 from datetime import datetime, timedelta
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s')
 logger = logging.getLogger('CryptoPiggyIntegrationTest')
 
+# Every bot the suite builds keeps its pending-order table out of the working tree
+if 'PENDING_ORDERS_PATH' not in os.environ:
+    _pending_dir = tempfile.mkdtemp(prefix='cryptopiggy-tests-')
+    atexit.register(shutil.rmtree, _pending_dir, ignore_errors=True)
+    os.environ['PENDING_ORDERS_PATH'] = os.path.join(_pending_dir, 'pending_orders.json')
+
 def test_1_imports():
     """Test all critical imports."""
     print("\n" + "="*70)
@@ -52,6 +61,7 @@ def test_2_bot_initialization():
     
     try:
         from crypto_piggy_top import CryptoPiggyTop2026
+        from trade_store import TradeStore
         
         bot = CryptoPiggyTop2026()
         print("✅ Bot created successfully")
@@ -62,7 +72,7 @@ def test_2_bot_initialization():
             ('live_confirmed', bot.live_confirmed == False),
             ('backend_enabled', isinstance(bot.backend_enabled, bool)),
             ('positions', isinstance(bot.positions, dict)),
-            ('trade_log', isinstance(bot.trade_log, list)),
+            ('trade_log', isinstance(bot.trade_log, TradeStore)),
             ('daily_trades_count', bot.daily_trades_count == 0),
             ('daily_start_equity', bot.daily_start_equity > 0),
             ('_check_daily_limits method exists', hasattr(bot, '_check_daily_limits')),
@@ -384,6 +394,2012 @@ def test_10_live_mode_guards():
         return False
 
 
+def test_11_trade_store():
+    """Test columnar trade store queries and disk spill."""
+    print("\n" + "="*70)
+    print("TEST 11: COLUMNAR TRADE STORE")
+    print("="*70)
+    
+    archive = Path('test_trade_archive.jsonl')
+    try:
+        from trade_store import TradeStore
+        
+        store = TradeStore(archive_path=str(archive), max_hot=100)
+        for i in range(250):
+            symbol = 'BTC/USDT' if i % 2 == 0 else 'ETH/USDT'
+            tags = {'strategy': 'ensemble', 'votes': 'sma,rsi'} if i % 5 == 0 else {}
+            store.record(1000.0 + i, 'buy' if i % 3 else 'sell', symbol, 10.0, 0.001, 50000.0 + i, live=False, order_id=f'o{i}', **tags)
+        full = store.to_frame(start=1000.0, end=1249.0)
+        
+        checks = [
+            (len(store) == 250, "length covers hot + spilled trades"),
+            (len(store.hot_records()) <= 100, "hot window is bounded"),
+            (archive.exists(), "older trades spilled to disk"),
+            ([t['time'] for t in store.tail(3)] == [1247.0, 1248.0, 1249.0], "tail returns most recent"),
+            (store[0]['order_id'] == 'o0', "index reads from archive"),
+            (len(store.query(start=1010.0, end=1019.0, symbol='ETH/USDT')) == 5, "time + symbol range query"),
+            (len(store.to_frame(limit=20)) == 20, "frame built for last N only"),
+            (len(full) == 250, "frame spans archive + hot"),
+            (full['order_id'].tolist() == [f'o{i}' for i in range(250)]
+             and full['strategy'].tolist() == ['ensemble' if i % 5 == 0 else None for i in range(250)],
+             "frame keeps sparse extra fields (order_id, strategy) from archive + hot"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        restored = TradeStore(archive_path=str(archive), max_hot=100)
+        restored.restore(store.hot_records(), store.archive_state())
+        ok = len(restored) == len(store) and restored[5]['time'] == store[5]['time']
+        print(f"   {'✅' if ok else '❌'} restore from hot window + archive index")
+        
+        # Spill after the save, then restore the older state and spill again: no row archived twice
+        saved = json.loads(json.dumps({'hot': restored.hot_records(), 'archive': restored.archive_state()}))
+        for i in range(250, 400):
+            restored.record(1000.0 + i, 'buy', 'BTC/USDT', 10.0, 0.001, 50000.0, order_id=f'o{i}')
+        again = TradeStore(archive_path=str(archive), max_hot=100)
+        again.restore(saved['hot'], saved['archive'])
+        for i in range(250, 400):
+            again.record(1000.0 + i, 'buy', 'BTC/USDT', 10.0, 0.001, 50000.0, order_id=f'o{i}')
+        archived = [json.loads(line)['order_id'] for line in archive.read_text().splitlines() if line]
+        no_dupes = (len(archived) == len(set(archived)) and len(again) == 400
+                    and [again[i]['order_id'] for i in (0, 199, 399)] == ['o0', 'o199', 'o399'])
+        print(f"   {'✅' if no_dupes else '❌'} restore truncates rows spilled after the save ({len(archived)} archived)")
+        return all(c[0] for c in checks) and ok and no_dupes
+    except Exception as e:
+        print(f"❌ Trade store test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        if archive.exists():
+            archive.unlink()
+
+
+def test_12_simulated_exchange_replay():
+    """Test deterministic replay through the simulated exchange."""
+    print("\n" + "="*70)
+    print("TEST 12: SIMULATED EXCHANGE REPLAY")
+    print("="*70)
+    
+    try:
+        import numpy as np
+        import pandas as pd
+        from crypto_piggy_top import CryptoPiggyTop2026
+        from sim_exchange import SimulatedExchange
+        
+        rng = np.random.default_rng(7)
+        n = 3000
+        closes = 50000 + np.cumsum(rng.normal(0, 25, n))
+        candles = pd.DataFrame({
+            'timestamp': 1_700_000_000_000 + np.arange(n) * 60_000,
+            'open': closes, 'high': closes + 5, 'low': closes - 5, 'close': closes,
+            'volume': np.ones(n)
+        })
+        
+        sim = SimulatedExchange({'BTC/USDT': candles}, timeframe='1m')
+        bars = sim.fetch_ohlcv('BTC/USDT', '5m', limit=10)
+        ticker = sim.fetch_ticker('BTC/USDT')
+        sim.sleep(60_000)
+        clock_ok = sim.fetch_ticker('BTC/USDT')['last'] == sim.fetch_ohlcv('BTC/USDT', '1m', limit=1)[-1][4] != ticker['last']
+        print(f"   {'✅' if len(bars) == 10 else '❌'} 1m candles resampled to 5m")
+        print(f"   {'✅' if clock_ok else '❌'} ticker follows the virtual clock")
+        
+        runs = []
+        for _ in range(2):
+            bot = CryptoPiggyTop2026()
+            bot.trade_log.clear()
+            bot.positions = {}
+            trades = bot.replay(SimulatedExchange({'BTC/USDT': candles}, timeframe='1m'), interval_seconds=300)
+            runs.append([(t['time'], t['side'], round(t['price'], 6)) for t in trades])
+        
+        deterministic = runs[0] == runs[1] and len(runs[0]) > 0
+        print(f"   {'✅' if deterministic else '❌'} replay is deterministic ({len(runs[0])} trades)")
+        
+        # The simulated exchange needs no ccxt: bars must still come from the stored candles
+        import crypto_piggy_top
+        saved_ccxt, crypto_piggy_top.ccxt = crypto_piggy_top.ccxt, None
+        try:
+            bot = CryptoPiggyTop2026()
+            bot.exchange = SimulatedExchange({'BTC/USDT': candles}, timeframe='1m')
+            stored = bot.fetch_ohlcv_df('BTC/USDT', '1m', 10)['close'].to_numpy()
+        finally:
+            crypto_piggy_top.ccxt = saved_ccxt
+        without_ccxt = np.allclose(stored, np.asarray(bot.exchange.fetch_ohlcv('BTC/USDT', '1m', limit=10))[:, 4])
+        print(f"   {'✅' if without_ccxt else '❌'} stored candles used without ccxt installed")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return len(bars) == 10 and clock_ok and deterministic and without_ccxt
+    except Exception as e:
+        print(f"❌ Simulated exchange test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_13_synthetic_market():
+    """Test seeded synthetic OHLCV generation."""
+    print("\n" + "="*70)
+    print("TEST 13: SYNTHETIC MARKET GENERATOR")
+    print("="*70)
+    
+    try:
+        import numpy as np
+        from synthetic_market import SyntheticMarket
+        
+        def make():
+            market = SyntheticMarket(seed=11, timeframe='1m', regimes=True, vol_clustering=0.98, correlation=0.7)
+            return market.generate(50_000, ['BTC/USDT', 'ETH/USDT'], start_prices=[50000.0, 3000.0], start='2024-01-01')
+        
+        first, second = make(), make()
+        btc, eth = first['BTC/USDT'], first['ETH/USDT']
+        # Without start/end the index ends at a fixed default, not the wall clock
+        undated = [SyntheticMarket(seed=11, timeframe='5m').generate_one(100)['timestamp'] for _ in range(2)]
+        corr = np.corrcoef(np.diff(np.log(btc['close'])), np.diff(np.log(eth['close'])))[0, 1]
+        checks = [
+            (first['BTC/USDT'].equals(second['BTC/USDT']), "same seed reproduces candles"),
+            (first['BTC/USDT']['timestamp'].equals(second['BTC/USDT']['timestamp']), "same seed reproduces timestamps"),
+            (undated[0].equals(undated[1]), "same seed reproduces timestamps without start/end"),
+            (list(btc.columns) == ['timestamp', 'datetime', 'open', 'high', 'low', 'close', 'volume'], "OHLCV schema"),
+            ((btc['low'] <= btc[['open', 'close']].min(axis=1)).all(), "low <= open/close"),
+            ((btc['high'] >= btc[['open', 'close']].max(axis=1)).all(), "high >= open/close"),
+            ((np.diff(btc['timestamp']) == 60_000).all(), "evenly spaced time index"),
+            (0.5 < corr < 0.9, f"symbols correlated ({corr:.2f})"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Synthetic market test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_14_metrics_export():
+    """Test per-stage latency metrics and Prometheus export."""
+    print("\n" + "="*70)
+    print("TEST 14: LATENCY METRICS & PROMETHEUS EXPORT")
+    print("="*70)
+    
+    try:
+        import urllib.request
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        bot = CryptoPiggyTop2026()
+        bot.metrics.reset()
+        bot.place_order('buy', 'XYZ/USDT', 10)
+        bot.start_bot(cycles=1, interval_seconds=0, verbose=False)
+        
+        server = bot.metrics.start_http_server(0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            text = urllib.request.urlopen(url, timeout=5).read().decode()
+        finally:
+            bot.metrics.stop_http_server()
+        
+        summary = bot.metrics.summary()
+        checks = [
+            ('cryptopiggy_order_rejections_total{reason="symbol_not_allowed"} 1' in text, "rejection counter exported"),
+            ('cryptopiggy_stage_seconds_bucket{stage="ohlcv_fetch",le="+Inf"} 1' in text, "fetch span histogram exported"),
+            ('indicators' in summary['stages'] and 'cycle' in summary['stages'], "stage summary for status()"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Metrics test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_15_telegram_notifier():
+    """Test that Telegram alerts are queued, coalesced and sent off the order path."""
+    print("\n" + "="*70)
+    print("TEST 15: NON-BLOCKING TELEGRAM NOTIFICATIONS")
+    print("="*70)
+    
+    try:
+        import asyncio
+        import time
+        from notifier import TelegramNotifier
+        from metrics import Metrics
+        
+        class SlowAsyncBot:
+            """Stands in for python-telegram-bot v20+, where send_message is a coroutine."""
+            def __init__(self):
+                self.sent = []
+            
+            async def send_message(self, chat_id, text):
+                await asyncio.sleep(0.2)
+                self.sent.append(text)
+        
+        fake = SlowAsyncBot()
+        metrics = Metrics()
+        notifier = TelegramNotifier(fake, '123', coalesce_seconds=0.2, min_interval=0.05, metrics=metrics)
+        start = time.perf_counter()
+        for i in range(5):
+            notifier.notify(f"fill {i}")
+        enqueue_s = time.perf_counter() - start
+        drained = notifier.flush(timeout=5)
+        notifier.stop()
+        
+        checks = [
+            (enqueue_s < 0.05, f"notify() does not block ({enqueue_s * 1000:.2f} ms for 5 alerts)"),
+            (drained and len(fake.sent) == 1, "burst coalesced into one digest"),
+            (bool(fake.sent) and all(f"fill {i}" in fake.sent[0] for i in range(5)), "digest contains every alert"),
+            (metrics.counter('notifications_total', status='sent') == 1, "sent counter recorded"),
+            (not TelegramNotifier(None, '123').notify("x"), "disabled without a Telegram bot"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Telegram notifier test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_16_backend_health_monitor():
+    """Test the shared background health monitor, hysteresis and is_live() gating."""
+    print("\n" + "="*70)
+    print("TEST 16: BACKGROUND BACKEND HEALTH MONITOR")
+    print("="*70)
+    
+    try:
+        import time
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import health_monitor
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200 if self.path == '/api/health' else 404)
+                self.end_headers()
+                self.wfile.write(b'{"ok": true}')
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            ok, msg, latency_ms = health_monitor.probe(url)
+            monitor = health_monitor.get_monitor(url, interval=60, fail_threshold=2, recover_threshold=2)
+            shared = health_monitor.get_monitor(url) is monitor
+            # Let the background thread finish its first probe before feeding results by hand
+            for _ in range(50):
+                if monitor.last_checked is not None:
+                    break
+                time.sleep(0.1)
+            
+            bot = CryptoPiggyTop2026()
+            bot.paper_mode = False
+            bot.live_confirmed = True
+            bot.set_backend('test_user', url=url, enabled=True)
+            
+            monitor.record(True, 'ok', 1.0)
+            healthy_live = bot.is_live()
+            monitor.record(False, 'timeout', None)
+            one_failure = bot.backend_last_health
+            monitor.record(False, 'timeout', None)
+            two_failures = bot.backend_last_health
+            blocked = not bot.is_live()
+            monitor.record(True, 'ok', 1.0)
+            monitor.record(True, 'ok', 1.0)
+            recovered = bot.backend_last_health
+        finally:
+            monitor.stop()
+            server.shutdown()
+            server.server_close()
+        
+        checks = [
+            (ok and msg == 'ok' and latency_ms is not None, "probe reports status and latency"),
+            (shared, "one monitor per URL shared across sessions"),
+            (healthy_live, "is_live() allowed while backend healthy"),
+            (one_failure is True, "single failed probe does not flap"),
+            (two_failures is False and blocked, "consecutive failures gate is_live()"),
+            (recovered is True, "recovers after consecutive successes"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Health monitor test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_17_mock_backend_load():
+    """Test the local mock backend endpoints and the concurrent load driver."""
+    print("\n" + "="*70)
+    print("TEST 17: MOCK BACKEND & ORDER LOAD DRIVER")
+    print("="*70)
+    
+    try:
+        from mock_backend import MockBackend
+        from backend_load import run_load
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        bot = CryptoPiggyTop2026()
+        with MockBackend(latency_ms=5, jitter_ms=0, seed=1) as backend:
+            bot.backend_url = backend.url
+            bot.backend_user_id = 'test_user'
+            synced = bot.sync_credentials('key', 'secret')
+            order = bot.place_order_backend('buy', 'BTC/USDT', 10.0)
+            balance = bot.fetch_backend_balance()
+            stats = run_load(bot, orders=40, concurrency=8)
+        
+        with MockBackend(latency_ms=0, jitter_ms=0, error_rate=1.0, seed=1) as failing:
+            bot.backend_url = failing.url
+            failed = bot.place_order_backend('buy', 'BTC/USDT', 10.0)
+        
+        checks = [
+            (synced.get('ok') and synced.get('status_code') == 200, "credentials sync endpoint"),
+            (order.get('status') == 'filled' and order.get('orderId'), "trade endpoint fills order"),
+            (balance and balance['total'].get('BTC', 0) > 0, "balance reflects the fill"),
+            (stats['ok'] == 40 and stats['p99_ms'] is not None, f"load driver p50 {stats['p50_ms']:.1f} ms / p99 {stats['p99_ms']:.1f} ms"),
+            (failed.get('error') == 'backend_trade_failed_500', "injected errors surface as backend failures"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Mock backend test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_18_batch_orders():
+    """Test batch order pre-validation and single round-trip submission via the backend."""
+    print("\n" + "="*70)
+    print("TEST 18: BATCH ORDER SUBMISSION")
+    print("="*70)
+    
+    try:
+        import time
+        from mock_backend import MockBackend
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        def live_bot(url):
+            bot = CryptoPiggyTop2026()
+            bot.get_equity = lambda: 10000.0
+            bot.trade_log.clear()
+            bot.positions = {}
+            bot.paper_mode = False
+            bot.live_confirmed = True
+            bot.backend_enabled = True
+            bot.backend_last_health = True
+            bot.backend_url = url
+            bot.backend_user_id = 'test_user'
+            return bot
+        
+        orders = [
+            ('buy', 'BTC/USDT', 10.0),
+            ('buy', 'ETH/USDT', 20.0),
+            {'side': 'buy', 'symbol': 'BTC/USDT', 'amount_usd': 60.0},
+            ('buy', 'DOGE/USDT', 10.0),
+            ('buy', 'ETH/USDT', 1.0),
+        ]
+        with MockBackend(latency_ms=50, jitter_ms=0, seed=1) as backend:
+            bot = live_bot(backend.url)
+            start = time.perf_counter()
+            results = bot.place_orders(orders)
+            batch_s = time.perf_counter() - start
+            batch_requests = backend.stats[('trade_batch', 200)]
+        
+        with MockBackend(latency_ms=50, jitter_ms=0, seed=1, batch_endpoint=False) as backend:
+            fallback_bot = live_bot(backend.url)
+            start = time.perf_counter()
+            fallback = fallback_bot.place_orders(orders[:3], max_parallel=3)
+            fallback_s = time.perf_counter() - start
+            single_requests = backend.stats[('trade', 200)]
+        
+        statuses = [r['status'] for r in results]
+        checks = [
+            (statuses == ['filled', 'filled', 'filled', 'rejected', 'rejected'], f"per-order results {statuses}"),
+            ([r['reason'] for r in results[3:]] == ['symbol_not_allowed', 'below_minimum'], "rejection reasons reported"),
+            (results[2]['amount_usd'] == 50.0, "size cap applied in pre-validation"),
+            (batch_requests == 1, "one backend round trip for the batch"),
+            (len(bot.trade_log) == 3 and bot.daily_trades_count == 3, "fills logged and counted"),
+            (batch_s < 0.18, f"batch latency ~ one round trip ({batch_s * 1000:.0f} ms)"),
+            ([r['status'] for r in fallback] == ['filled'] * 3 and single_requests == 3, "concurrent fallback without batch endpoint"),
+            (fallback_s < 0.18, f"fallback runs in parallel ({fallback_s * 1000:.0f} ms)"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Batch order test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_19_idempotent_orders():
+    """Test client order IDs, timeout reconciliation, backend dedup and restart recovery."""
+    print("\n" + "="*70)
+    print("TEST 19: IDEMPOTENT ORDER SUBMISSION")
+    print("="*70)
+    
+    pending_path = Path('pending_orders_test.json')
+    old_path = os.environ.get('PENDING_ORDERS_PATH')
+    os.environ['PENDING_ORDERS_PATH'] = str(pending_path)
+    try:
+        import requests
+        from mock_backend import MockBackend
+        from sim_exchange import SimulatedExchange
+        from synthetic_market import SyntheticMarket
+        from pending_orders import new_client_order_id
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        def live_bot(url):
+            bot = CryptoPiggyTop2026()
+            bot.get_equity = lambda: 10000.0
+            bot.trade_log.clear()
+            bot.positions = {}
+            bot.paper_mode = False
+            bot.live_confirmed = True
+            bot.backend_enabled = True
+            bot.backend_last_health = True
+            bot.backend_url = url
+            bot.backend_user_id = 'test_user'
+            return bot
+        
+        # Response arrives after the order executed and after the client gave up
+        with MockBackend(latency_ms=0, jitter_ms=0, stall_rate=1.0, stall_ms=800, seed=1) as backend:
+            bot = live_bot(backend.url)
+            bot.backend_order_timeout = 0.2
+            order = bot.place_order('buy', 'BTC/USDT', 10.0)
+            timeout_fills = len(backend.orders)
+            reconciled = bot.metrics.counter('order_reconciled_total', route='backend', outcome='found')
+            pending_after = len(bot.pending_orders)
+        
+        with MockBackend(latency_ms=0, jitter_ms=0, seed=1) as backend:
+            bot = live_bot(backend.url)
+            cid = new_client_order_id()
+            first = bot.place_order_backend('buy', 'ETH/USDT', 10.0, client_order_id=cid)
+            second = bot.place_order_backend('buy', 'ETH/USDT', 10.0, client_order_id=cid)
+            deduped = first['orderId'] == second['orderId'] and len(backend.orders) == 1
+            
+            # Simulate a crash: one order reached the backend, one never left
+            executed, lost = new_client_order_id(), new_client_order_id()
+            requests.post(f"{backend.url}/api/trade", json={'userId': 'test_user', 'side': 'buy', 'symbolCcxt': 'BTC/USDT',
+                                                            'amountUsd': 10.0, 'clientOrderId': executed}, timeout=5)
+            bot.pending_orders.add(executed, 'backend', 'buy', 'BTC/USDT', 10.0, 0.0002, 50000.0)
+            bot.pending_orders.add(lost, 'backend', 'buy', 'ETH/USDT', 10.0, 0.003, 3000.0)
+            restarted = live_bot(backend.url)
+            summary = restarted.reconcile_pending_orders()
+            recovered = len(restarted.trade_log) == 1 and len(restarted.pending_orders) == 0
+        
+        class RequestTimeout(Exception):
+            pass
+        
+        class FlakyExchange(SimulatedExchange):
+            """Executes the first order, then raises a timeout as if the response was lost."""
+            failed = False
+            
+            def create_order(self, symbol, type, side, amount, price=None, params={}):
+                order = super().create_order(symbol, type, side, amount, price, params)
+                if not self.failed:
+                    self.failed = True
+                    raise RequestTimeout('read timed out')
+                return order
+        
+        frames = SyntheticMarket(seed=3, timeframe='1m').generate(400, ['BTC/USDT'], start='2024-01-01')
+        bot = live_bot(None)
+        bot.backend_enabled = False
+        bot.exchange = FlakyExchange(frames, timeframe='1m')
+        exchange_order = bot.place_order('buy', 'BTC/USDT', 10.0)
+        exchange_fills = len(bot.exchange.orders)
+        
+        checks = [
+            (order and order.get('status') == 'filled' and timeout_fills == 1, "timed-out backend order found, not resent"),
+            (reconciled == 1 and pending_after == 0, "pending entry cleared after reconciliation"),
+            (deduped, "backend dedups on clientOrderId"),
+            (summary == {'found': 1, 'not_found': 1, 'unknown': 0} and recovered, f"restart reconciliation {summary}"),
+            (exchange_order and exchange_fills == 1, "ccxt retry finds the order instead of re-submitting"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Idempotent order test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        pending_path.unlink(missing_ok=True)
+        if old_path is None:
+            os.environ.pop('PENDING_ORDERS_PATH', None)
+        else:
+            os.environ['PENDING_ORDERS_PATH'] = old_path
+
+
+def test_20_execution_pipeline():
+    """Test that signals only enqueue orders and a worker executes and persists them."""
+    print("\n" + "="*70)
+    print("TEST 20: ASYNC EXECUTION PIPELINE")
+    print("="*70)
+    
+    try:
+        import time
+        import json
+        from crypto_piggy_top import CryptoPiggyTop2026, BaseStrategy
+        
+        class AlwaysEnter(BaseStrategy):
+            def populate_indicators(self, df):
+                return df
+            
+            def populate_entry_trend(self, df):
+                df['entry'] = True
+                return df
+            
+            def populate_exit_trend(self, df):
+                df['exit'] = False
+                return df
+        
+        def slow_bot(delay):
+            bot = CryptoPiggyTop2026()
+            bot.get_equity = lambda: 10000.0
+            bot.trade_log.clear()
+            bot.positions = {}
+            bot.synthetic_seed = 7
+            price = bot._order_price
+            # Stand-in for a slow ticker / order round trip
+            bot._order_price = lambda symbol: (time.sleep(delay), price(symbol))[1]
+            return bot
+        
+        Path('state.json').unlink(missing_ok=True)
+        bot = slow_bot(0.3)
+        pipeline = bot.start_execution(save_interval=0.05)
+        start = time.perf_counter()
+        future = pipeline.submit('buy', 'BTC/USDT', 10.0)
+        submit_s = time.perf_counter() - start
+        queued = pipeline.pending('BTC/USDT') == 1 and pipeline.pending('ETH/USDT') == 0
+        result = future.result(timeout=5)
+        rejected = pipeline.submit('buy', 'DOGE/USDT', 10.0).result(timeout=5)
+        drained = pipeline.drain(timeout=5)
+        latency = bot.metrics.histogram('stage_seconds', stage='signal_to_submit')
+        rejections = bot.metrics.counter('order_rejections_total', reason='symbol_not_allowed')
+        time.sleep(0.3)
+        with open('state.json') as f:
+            persisted = 'BTC/USDT' in json.load(f)['positions']
+        bot.stop_execution()
+        
+        # Two symbols with entry signals, each order taking 0.3s: the signal loop must not wait on either
+        bot = slow_bot(0.3)
+        bot.strategies['always'] = AlwaysEnter({'timeframe': '5m'})
+        bot.active_strategy = 'always'
+        bot.start_bot(cycles=1, interval_seconds=0, verbose=False, symbols=['BTC/USDT', 'ETH/USDT'], async_orders=True)
+        cycle = bot.metrics.histogram('stage_seconds', stage='cycle')
+        bot.stop_execution()
+        
+        # A slow live exchange submit must not hold the state lock: saves go through meanwhile
+        import threading
+        submitting = threading.Event()
+        
+        class SlowExchange:
+            def fetch_ticker(self, symbol):
+                return {'last': 50000.0}
+            
+            def fetch_balance(self):
+                return {'total': {'USDT': 10000.0}}
+            
+            def create_order(self, symbol, type, side, amount, params={}):
+                submitting.set()
+                time.sleep(0.5)
+                return {'id': 'slow-1', 'status': 'closed', 'filled': amount, 'average': 50000.0}
+        
+        live = CryptoPiggyTop2026()
+        live.trade_log.clear()
+        live.positions = {}
+        live.get_equity = lambda: 10000.0
+        live.exchange = SlowExchange()
+        live.paper_mode = False
+        live.live_confirmed = True
+        live_future = live.start_execution(save_interval=0.05).submit('buy', 'BTC/USDT', 10.0)
+        submitting.wait(timeout=5)
+        start = time.perf_counter()
+        live.save_state()
+        save_s = time.perf_counter() - start
+        live_result = live_future.result(timeout=5)
+        live.stop_execution()
+        
+        checks = [
+            (submit_s < 0.05, f"submit returns immediately ({submit_s * 1000:.1f} ms)"),
+            (queued, "intent tracked as in flight for its symbol"),
+            (result is not None and result.get('status') == 'paper', "worker executed the order"),
+            (rejected is None and rejections == 1, "pre-trade checks run on the worker"),
+            (drained and pipeline.pending() == 0, "drain waits for the queue to empty"),
+            (latency is not None and latency.count == 1 and latency.sum >= 0.3, "signal_to_submit latency recorded"),
+            (persisted, "state persisted off the signal path"),
+            (cycle is not None and cycle.sum < 0.3, f"cycle not blocked by slow orders ({cycle.sum * 1000:.0f} ms)"),
+            (set(bot.positions) == {'BTC/USDT', 'ETH/USDT'}, "both symbols filled by the worker"),
+            (submitting.is_set() and save_s < 0.3 and live_result is not None and live.trade_log,
+             f"save_state() not blocked by a slow exchange submit ({save_s * 1000:.0f} ms)"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Execution pipeline test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_21_account_model():
+    """Test incremental equity/PnL accounting and periodic live reconciliation."""
+    print("\n" + "="*70)
+    print("TEST 21: INCREMENTAL ACCOUNT MODEL")
+    print("="*70)
+    
+    try:
+        import time
+        from account import AccountModel
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        account = AccountModel(1000.0)
+        account.apply_fill('buy', 'BTC/USDT', 0.01, 50000.0, fee=0.5)
+        account.mark('BTC/USDT', 52000.0)
+        marked = (round(account.equity, 6), round(account.unrealized_pnl, 6))
+        account.apply_fill('sell', 'BTC/USDT', 0.01, 51000.0, fee=0.5)
+        closed = (round(account.equity, 6), round(account.realized_pnl, 6), account.holdings)
+        
+        class CountingExchange:
+            """Live exchange stub that counts balance fetches."""
+            has = {}
+            balance_calls = 0
+            
+            def fetch_balance(self):
+                self.balance_calls += 1
+                return {'total': {'USDT': 5000.0, 'BTC': 0.1}}
+            
+            def fetch_ticker(self, symbol):
+                return {'last': 50000.0}
+            
+            def create_order(self, symbol, type, side, amount, params={}):
+                return {'id': f'x{time.time_ns()}', 'status': 'closed', 'filled': amount, 'average': 50000.0,
+                        'fee': {'cost': 0.01}}
+        
+        bot = CryptoPiggyTop2026()
+        bot.trade_log.clear()
+        bot.positions = {}
+        bot.exchange = CountingExchange()
+        bot.paper_mode = False
+        bot.live_confirmed = True
+        bot.live_account.reconcile_interval = 3600
+        start_equity = bot.get_equity()
+        for _ in range(5):
+            bot.place_order('buy', 'ETH/USDT', 10.0)
+        balance_calls = bot.exchange.balance_calls
+        after_fills = bot.get_equity()
+        bot.live_account.expire()
+        bot.get_equity()
+        
+        paper = CryptoPiggyTop2026()
+        paper.positions = {}
+        paper.sync_paper_account()
+        paper_start = paper.get_equity()
+        paper.place_order('buy', 'BTC/USDT', 10.0)
+        paper.mark_price('BTC/USDT', 55000.0)
+        paper_unrealized = paper.paper_account.unrealized_pnl
+        
+        checks = [
+            (marked == (1019.5, 19.5), f"mark updates equity and unrealized PnL {marked}"),
+            (closed == (1009.0, 9.0, {}), f"sell realizes PnL net of fees {closed[:2]}"),
+            (start_equity == 10000.0, f"live equity reconciled from balance (${start_equity:,.2f})"),
+            (balance_calls == 1, f"one balance fetch for five orders ({balance_calls})"),
+            (abs(after_fills - (start_equity - 0.05)) < 1e-6, f"fills applied incrementally (${after_fills:,.2f})"),
+            (bot.exchange.balance_calls == 2 and bot.metrics.counter('account_reconciles_total', outcome='ok') == 2, "reconciles again once expired"),
+            (paper_start == 10000.0 and abs(paper_unrealized - 1.0) < 1e-6, "paper fills and marks update PnL"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Account model test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_22_risk_engine():
+    """Test trailing stops, drawdown and losing-streak halts driven by price events."""
+    print("\n" + "="*70)
+    print("TEST 22: EVENT-DRIVEN RISK ENGINE")
+    print("="*70)
+    
+    try:
+        import time
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        def paper_bot():
+            bot = CryptoPiggyTop2026()
+            bot.trade_log.clear()
+            bot.positions = {}
+            bot.sync_paper_account()
+            bot.risk.reset()
+            return bot
+        
+        def wait_flat(bot, symbol, timeout=2.0):
+            deadline = time.perf_counter() + timeout
+            while symbol in bot.positions and time.perf_counter() < deadline:
+                time.sleep(0.005)
+            return symbol not in bot.positions
+        
+        # Trailing stop fired by a single price event
+        bot = paper_bot()
+        bot.place_order('buy', 'BTC/USDT', 10.0)
+        bot.mark_price('BTC/USDT', 51000.0)
+        bot.mark_price('BTC/USDT', 50500.0)
+        held_above_stop = 'BTC/USDT' in bot.positions and bot.risk.high_water['BTC/USDT'] == 51000.0
+        start = time.perf_counter()
+        bot.mark_price('BTC/USDT', 49900.0)
+        stopped = wait_flat(bot, 'BTC/USDT')
+        reaction_s = time.perf_counter() - start
+        exits = bot.metrics.counter('risk_exits_total', reason='trailing_stop')
+        bot.stop_execution()
+        
+        # Local feed polled between cycles
+        feed = {'ETH/USDT': 50000.0}
+        bot = paper_bot()
+        bot.risk.price_source = feed.get
+        bot.risk.poll_interval = 0.05
+        bot.place_order('buy', 'ETH/USDT', 10.0)
+        bot.risk.start()
+        feed['ETH/USDT'] = 60000.0
+        time.sleep(0.2)
+        start = time.perf_counter()
+        feed['ETH/USDT'] = 55000.0
+        polled = wait_flat(bot, 'ETH/USDT')
+        poll_reaction_s = time.perf_counter() - start
+        bot.risk.stop()
+        bot.stop_execution()
+        
+        # Consecutive losses halt new entries
+        bot = paper_bot()
+        bot.risk_settings['max_consec_loss'] = 2
+        bot.risk_settings['trailing_stop_pct'] = 0
+        quotes = {}
+        bot._order_price = quotes.get
+        for _ in range(2):
+            quotes['BTC/USDT'] = 50000.0
+            bot.place_order('buy', 'BTC/USDT', 10.0)
+            quotes['BTC/USDT'] = 49000.0
+            bot.place_order('sell', 'BTC/USDT', 10.0)
+        quotes['BTC/USDT'] = 50000.0
+        halted = bot.risk.halted == 'max_consec_loss' and bot.consec_losses == 2
+        blocked = bot.place_order('buy', 'BTC/USDT', 10.0) is None
+        bot.risk.reset()
+        resumed = bot.place_order('buy', 'BTC/USDT', 10.0) is not None
+        
+        # Portfolio drawdown flattens and halts
+        bot = paper_bot()
+        bot.risk_settings['trailing_stop_pct'] = 0
+        bot.risk_settings['max_dd_pct'] = 0.0005
+        bot.place_order('buy', 'BTC/USDT', 10.0)
+        bot.mark_price('BTC/USDT', 20000.0)
+        flattened = wait_flat(bot, 'BTC/USDT')
+        bot.stop_execution()
+        
+        checks = [
+            (held_above_stop, "high-water mark tracked, no exit above the stop"),
+            (stopped and exits == 1, "trailing stop fired an exit"),
+            (reaction_s < 1.0, f"stop reaction {reaction_s * 1000:.0f} ms"),
+            (polled and poll_reaction_s < 1.0, f"poller caught the move between cycles ({poll_reaction_s * 1000:.0f} ms)"),
+            (halted and blocked, "losing streak halts new entries"),
+            (resumed, "reset() resumes trading"),
+            (flattened and bot.risk.halted == 'max_drawdown', "drawdown limit flattens positions and halts"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Risk engine test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_23_multi_timeframe_data():
+    """Test resampled multi-timeframe bars from cached 1m candles with incremental refresh."""
+    print("\n" + "="*70)
+    print("TEST 23: MULTI-TIMEFRAME DATA ENGINE")
+    print("="*70)
+    
+    try:
+        import numpy as np
+        from collections import Counter
+        from sim_exchange import SimulatedExchange
+        from synthetic_market import SyntheticMarket
+        from market_data import DataProvider, merge_timeframe, timeframe_to_ms
+        from crypto_piggy_top import CryptoPiggyTop2026, SMA_Crossover
+        
+        class CountingExchange(SimulatedExchange):
+            calls = Counter()
+            
+            def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+                self.calls[timeframe] += 1
+                return super().fetch_ohlcv(symbol, timeframe, since, limit, params)
+        
+        frames = SyntheticMarket(seed=5, timeframe='1m').generate(6000, ['BTC/USDT'], start='2024-01-01')
+        exchange = CountingExchange(frames, timeframe='1m', warmup=4000)
+        reference = SimulatedExchange(frames, timeframe='1m', warmup=4000)
+        bot = CryptoPiggyTop2026()
+        bot.exchange = exchange
+        timeframes = {'1m': 300, '5m': 300, '15m': 200, '1h': 60}
+        
+        def matches():
+            for tf, limit in timeframes.items():
+                got = bot.data.ohlcv('BTC/USDT', tf, limit)
+                want = np.asarray(reference.fetch_ohlcv('BTC/USDT', tf, limit=limit))
+                if got.shape != want.shape or not np.allclose(got, want):
+                    print(f"   mismatch on {tf}: {got.shape} vs {want.shape}")
+                    return False
+            return True
+        
+        first_ok = matches()
+        first_calls = sum(exchange.calls.values())
+        exchange.calls.clear()
+        for _ in range(3):
+            exchange.advance(7 * 60)
+            reference.advance(7 * 60)
+            steady_ok = matches()
+        steady_calls = dict(exchange.calls)
+        
+        # Higher timeframe attached to 5m candles without lookahead
+        df5 = bot.fetch_ohlcv_df('BTC/USDT', '5m', 200)
+        df1h = bot.fetch_ohlcv_df('BTC/USDT', '1h', 60)
+        merged = merge_timeframe(df5, df1h, '1h', '5m', columns=['close'])
+        hour_ms = timeframe_to_ms('1h')
+        visible = merged.dropna(subset=['close_1h'])
+        no_lookahead = all(
+            row.close_1h == df1h.loc[df1h['timestamp'] + hour_ms <= row.timestamp + 300_000, 'close'].iloc[-1]
+            for row in visible.itertuples()
+        )
+        
+        class TrendFilter(SMA_Crossover):
+            def populate_indicators(self, df):
+                df = super().populate_indicators(df)
+                hourly = self.informative('1h', 60)
+                hourly['trend_up'] = hourly['close'] > hourly['close'].rolling(5).mean()
+                return merge_timeframe(df, hourly, '1h', self.params['timeframe'], columns=['trend_up'])
+        
+        exchange.calls.clear()
+        bot.strategies['trend'] = TrendFilter({'short_window': 10, 'long_window': 30, 'timeframe': '5m'})
+        result = bot.backtest('trend', limit=200)
+        
+        # Calendar and unknown timeframes go straight to the exchange instead of raising KeyError
+        try:
+            timeframe_to_ms('5x')
+            unknown_rejected = False
+        except ValueError as e:
+            unknown_rejected = "'5x'" in str(e)
+        direct = []
+        
+        def fetch(symbol, timeframe, since, limit):
+            direct.append(timeframe)
+            # 30-day bars, the last one still forming
+            return [[i * 2_592_000_000, 1.0, 1.0, 1.0, 1.0, 1.0] for i in range(limit + 1)]
+        
+        provider = DataProvider(fetch, clock=lambda: 3 * 2_592_000 + 60)
+        monthly = provider.ohlcv('BTC/USDT', '1M', 3)
+        odd = provider.ohlcv('BTC/USDT', '2q', 3)
+        
+        # A deeper `limit` than the first seed fetches only the older bars it is missing
+        shallow = DataProvider(lambda symbol, timeframe, since, limit: reference.fetch_ohlcv(symbol, timeframe, since=since, limit=limit),
+                               clock=lambda: reference.milliseconds() / 1000, max_base=300)
+        deeper = [(len(got), np.allclose(got, reference.fetch_ohlcv('BTC/USDT', '1h', limit=limit)))
+                  for limit in (20, 60) for got in [shallow.ohlcv('BTC/USDT', '1h', limit)]]
+        reseeds = shallow.fetches[('1h', 'seed')]
+        
+        checks = [
+            (first_ok, "every timeframe matches direct exchange bars"),
+            (steady_ok, "bars stay identical after incremental refreshes"),
+            (steady_calls == {'1m': 3}, f"one base fetch per refresh for 4 timeframes {steady_calls} (cold start {first_calls})"),
+            (len(visible) > 100 and no_lookahead, "merge_timeframe only uses closed higher-timeframe bars"),
+            (result is not None and sum(exchange.calls.values()) == 0, "strategy pulled 5m + 1h from cache with no API calls"),
+            (timeframe_to_ms('30s') == 30_000 and timeframe_to_ms('1M') == 30 * 86_400_000, "second and month units"),
+            (unknown_rejected, "unsupported timeframe raises ValueError naming it"),
+            (len(monthly) == 3 and len(odd) == 3 and {'1M', '2q'} <= set(direct), "1M and unknown units fall back to a direct fetch"),
+            (deeper == [(20, True), (60, True)] and reseeds == 2, f"growing limit reseeds older history {deeper}"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Multi-timeframe test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_24_strategy_plugins():
+    """Test plugin discovery and shared indicator computation across strategies."""
+    print("\n" + "="*70)
+    print("TEST 24: STRATEGY PLUGINS & SIGNAL ENGINE")
+    print("="*70)
+    
+    try:
+        import time
+        import tempfile
+        import strategies
+        from strategies import SignalEngine, SMA_Crossover, RSI_Strategy, load_plugins
+        from synthetic_market import SyntheticMarket
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        with tempfile.TemporaryDirectory() as plugin_dir:
+            Path(plugin_dir, 'breakout.py').write_text(
+                "from strategies import BaseStrategy\n"
+                "class ChannelBreakout(BaseStrategy):\n"
+                "    default_params = {'length': 20}\n"
+                "    def indicators(self):\n"
+                "        return {'sma': ('sma', {'length': self.params['length']})}\n"
+                "    def populate_entry_trend(self, df):\n"
+                "        df['entry'] = df['close'] > df['sma'] * 1.01\n"
+                "        return df\n"
+                "    def populate_exit_trend(self, df):\n"
+                "        df['exit'] = df['close'] < df['sma']\n"
+                "        return df\n"
+            )
+            Path(plugin_dir, 'broken.py').write_text("raise ImportError('missing dependency')\n")
+            found = load_plugins(plugin_dir)
+            old_dir = os.environ.get('STRATEGY_PLUGIN_DIR')
+            os.environ['STRATEGY_PLUGIN_DIR'] = plugin_dir
+            try:
+                bot = CryptoPiggyTop2026()
+            finally:
+                if old_dir is None:
+                    os.environ.pop('STRATEGY_PLUGIN_DIR', None)
+                else:
+                    os.environ['STRATEGY_PLUGIN_DIR'] = old_dir
+        
+        df = SyntheticMarket(seed=11, timeframe='5m').generate_one(2000)
+        fleet = {}
+        for i in range(20):
+            if i % 2:
+                fleet[f'sma_{i}'] = SMA_Crossover({'short_window': (5, 10)[i % 4 == 1], 'long_window': (20, 30, 50)[i % 3]})
+            else:
+                fleet[f'rsi_{i}'] = RSI_Strategy({'rsi_period': (7, 14)[i % 4 == 0]})
+        
+        calls = []
+        originals = dict(strategies.INDICATORS)
+        for name, fn in originals.items():
+            strategies.INDICATORS[name] = lambda df, _fn=fn, _name=name, **kw: (calls.append(_name), _fn(df, **kw))[1]
+        try:
+            engine = SignalEngine()
+            results = engine.evaluate(df, fleet)
+            distinct = len(calls)
+        finally:
+            strategies.INDICATORS.update(originals)
+        
+        def naive():
+            out = {}
+            for name, strategy in fleet.items():
+                frame = strategy.populate_indicators(df.copy())
+                frame = strategy.populate_entry_trend(frame)
+                out[name] = strategy.populate_exit_trend(frame)
+            return out
+        
+        reference = naive()
+        same = all(results[n]['entry'].equals(reference[n]['entry']) and results[n]['exit'].equals(reference[n]['exit'])
+                   for n in fleet)
+        minimal = set(results['sma_1'].columns) == {'sma_short', 'sma_long', 'entry', 'exit'}
+        
+        def best_of(fn, n=5):
+            best = float('inf')
+            for _ in range(n):
+                start = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - start)
+            return best
+        
+        engine_s = best_of(lambda: engine.evaluate(df, fleet))
+        naive_s = best_of(naive)
+        plugin_signals = bot.signal_engine.evaluate(df, {'channel_breakout': bot.strategies['channel_breakout']})
+        
+        checks = [
+            (set(found) == {'channel_breakout'}, f"plugin discovered, broken plugin skipped {sorted(found)}"),
+            ('channel_breakout' in bot.strategies and 'sma_crossover' in bot.strategies, "bot registers plugins next to built-ins"),
+            ('ema_crossover' in CryptoPiggyTop2026().strategies, "bundled plugins/ example registered"),
+            (distinct == 7, f"20 strategies -> {distinct} indicator computations"),
+            (same, "signals identical to running each strategy separately"),
+            (minimal, "strategies receive only their own columns"),
+            (engine_s < naive_s, f"engine {engine_s * 1000:.1f} ms vs separate {naive_s * 1000:.1f} ms"),
+            (set(plugin_signals['channel_breakout'].columns) == {'close', 'sma', 'entry', 'exit'}, "plugin gets declared candle columns"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Strategy plugin test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_25_strategy_ensemble():
+    """Test ensemble voting over several strategies with trade attribution."""
+    print("\n" + "="*70)
+    print("TEST 25: STRATEGY ENSEMBLE")
+    print("="*70)
+    
+    try:
+        import numpy as np
+        import strategies
+        from strategies import Ensemble, SignalEngine, SMA_Crossover, RSI_Strategy
+        from synthetic_market import SyntheticMarket
+        from sim_exchange import SimulatedExchange
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        df = SyntheticMarket(seed=5, timeframe='5m').generate_one(3000)
+        registry = {
+            'fast': SMA_Crossover({'short_window': 5, 'long_window': 20}),
+            'slow': SMA_Crossover({'short_window': 5, 'long_window': 50}),
+            'rsi': RSI_Strategy({'rsi_period': 14}),
+        }
+        engine = SignalEngine()
+        separate = engine.evaluate(df, registry)
+        entries = np.column_stack([separate[n]['entry'].to_numpy(dtype=bool) for n in registry])
+        
+        def run(params):
+            ensemble = Ensemble(registry, engine, params)
+            return engine.evaluate(df, {'ensemble': ensemble})['ensemble']
+        
+        calls = []
+        originals = dict(strategies.INDICATORS)
+        for name, fn in originals.items():
+            strategies.INDICATORS[name] = lambda df, _fn=fn, **kw: (calls.append(1), _fn(df, **kw))[1]
+        try:
+            majority = run({'mode': 'majority'})
+        finally:
+            strategies.INDICATORS.update(originals)
+        any_vote = run({'mode': 'any'})
+        unanimous = run({'mode': 'unanimous'})
+        weighted = run({'mode': 'weighted', 'weights': {'fast': 3.0}, 'threshold': 0.6})
+        
+        # Another evaluation of the shared instance between indicators and voting must not change the voters
+        shared = Ensemble(registry, engine, {'mode': 'majority'})
+        first = shared.populate_indicators(df.copy())
+        shared.params['members'] = ['fast']
+        shared.populate_indicators(df.copy())
+        interleaved = shared.populate_entry_trend(first)
+        
+        flagged = np.flatnonzero(entries.any(axis=1))
+        row = flagged[0] if len(flagged) else 0
+        expected_votes = ','.join(n for n, v in zip(registry, entries[row]) if v)
+        
+        bot = CryptoPiggyTop2026()
+        bot.trade_log.clear()
+        bot.positions = {}
+        bot.active_strategy = 'ensemble'
+        bot.strategies['ensemble'].params = {'mode': 'any'}
+        market = SyntheticMarket(seed=9, timeframe='1m').generate_one(4000)
+        trades = bot.replay(SimulatedExchange({'BTC/USDT': market}, timeframe='1m'), interval_seconds=300)
+        # Risk engine exits are attributed to 'risk' instead
+        attributed = [t for t in trades if (t.get('strategy') == 'ensemble' and t.get('votes')) or t.get('strategy') == 'risk']
+        
+        checks = [
+            ('ensemble' in bot.strategies, "ensemble registered next to the other strategies"),
+            (len(calls) == 4, f"3 members share one plan: {len(calls)} indicator computations"),
+            (np.array_equal(majority['entry'].to_numpy(), entries.sum(axis=1) >= 2), "majority needs 2 of 3 votes"),
+            (np.array_equal(any_vote['entry'].to_numpy(), entries.any(axis=1)), "'any' takes a single vote"),
+            (np.array_equal(unanimous['entry'].to_numpy(), entries.all(axis=1)), "'unanimous' needs every vote"),
+            (np.array_equal(weighted['entry'].to_numpy(), entries[:, 0]), "weight 3 of 5 lets 'fast' decide alone at 0.6"),
+            (majority['entry_votes'].iloc[row] == expected_votes, f"votes attributed per row ({expected_votes})"),
+            (np.array_equal(interleaved['entry'].to_numpy(), majority['entry'].to_numpy())
+             and interleaved['entry_votes'].iloc[row] == expected_votes, "interleaved evaluations keep their own voters"),
+            (len(trades) > 0 and len(attributed) == len(trades), f"{len(attributed)}/{len(trades)} replay trades attributed"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Strategy ensemble test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_26_panel_signals():
+    """Test cross-sectional panel evaluation against per-symbol signals."""
+    print("\n" + "="*70)
+    print("TEST 26: CROSS-SECTIONAL PANEL SIGNALS")
+    print("="*70)
+    
+    try:
+        import time
+        import numpy as np
+        from strategies import SignalEngine, SMA_Crossover, RSI_Strategy, Ensemble, load_plugins
+        from panel import Panel
+        from synthetic_market import SyntheticMarket
+        from sim_exchange import SimulatedExchange
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        symbols = [f'C{i}/USDT' for i in range(200)]
+        frames = SyntheticMarket(seed=3, timeframe='5m').generate(300, symbols)
+        # One symbol listed later, one with bars missing mid-history
+        frames['C1/USDT'] = frames['C1/USDT'].iloc[50:].reset_index(drop=True)
+        frames['C2/USDT'] = frames['C2/USDT'].drop(index=[100, 101]).reset_index(drop=True)
+        fleet = {
+            'sma': SMA_Crossover({'short_window': 10, 'long_window': 30}),
+            'rsi': RSI_Strategy({'rsi_period': 14}),
+            'ema': load_plugins()['ema_crossover'](),
+        }
+        engine = SignalEngine()
+        panel = Panel(frames)
+        wide = engine.evaluate_panel(panel, fleet)
+        separate = {s: engine.evaluate(df, fleet, s) for s, df in frames.items()}
+        mismatched = [(name, s) for name in fleet for s in symbols if s != 'C2/USDT' and not all(
+            np.array_equal(panel.narrow(wide[name][col], s).astype(bool), separate[s][name][col].to_numpy(dtype=bool))
+            for col in ('entry', 'exit'))]
+        
+        def best_of(fn, n=3):
+            best = float('inf')
+            for _ in range(n):
+                start = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - start)
+            return best
+        
+        aligned = {s: df for s, df in frames.items() if s not in ('C1/USDT', 'C2/USDT')}
+        panel_s = best_of(lambda: engine.evaluate_panel(Panel(aligned), fleet))
+        separate_s = best_of(lambda: [engine.evaluate(df, fleet, s) for s, df in aligned.items()], n=1)
+        
+        ensemble = Ensemble(fleet, engine, {'mode': 'any'})
+        small = Panel({s: frames[s] for s in symbols[:5]})
+        voted = engine.evaluate_panel(small, {'ensemble': ensemble})['ensemble']
+        latest = small.latest(voted)
+        
+        market = SyntheticMarket(seed=21, timeframe='1m').generate(4000, ['BTC/USDT', 'ETH/USDT', 'SOL/USDT'],
+                                                                   start_prices=[50000.0, 3000.0, 150.0])
+        runs = {}
+        for use_panel in (True, False):
+            bot = CryptoPiggyTop2026()
+            bot.trade_log.clear()
+            bot.positions = {}
+            bot.exchange = SimulatedExchange(market, timeframe='1m')
+            bot.start_bot(cycles=600, interval_seconds=300, verbose=False, symbols=list(market), panel=use_panel)
+            runs[use_panel] = [(t['time'], t['side'], t['symbol'], round(t['price'], 6)) for t in bot.trade_log.query()]
+        universe = bot.backtest_universe('sma_crossover', list(market), timeframe='5m', limit=300)
+        single = bot.backtest('sma_crossover', 'ETH/USDT', timeframe='5m', limit=300)
+        
+        checks = [
+            (not mismatched, f"panel signals match per-symbol signals ({len(mismatched)} mismatches)"),
+            (panel_s * 5 < separate_s, f"200 symbols: panel {panel_s * 1000:.1f} ms vs per-symbol {separate_s * 1000:.1f} ms"),
+            (set(voted) >= {'entry', 'exit', 'entry_votes'} and len(latest) == 5, "non-vectorized strategies fall back per symbol"),
+            (len(runs[True]) > 0 and runs[True] == runs[False], f"start_bot trades identical with and without panel ({len(runs[True])})"),
+            (set(universe) == set(market), "backtest_universe covers every symbol"),
+            (abs(universe['ETH/USDT']['total_return'] - single['total_return']) < 1e-12, "backtest_universe matches backtest()"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Panel signal test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_27_compact_candles():
+    """Test the compact float32 OHLCV container and its strategy interop."""
+    print("\n" + "="*70)
+    print("TEST 27: COMPACT OHLCV CANDLES")
+    print("="*70)
+    
+    try:
+        import numpy as np
+        from ohlcv import Candles
+        from strategies import SignalEngine, SMA_Crossover, RSI_Strategy
+        from panel import Panel
+        from synthetic_market import SyntheticMarket
+        from sim_exchange import SimulatedExchange
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        # One symbol-year of 1m bars in the fetch_ohlcv_df() schema
+        year = SyntheticMarket(seed=4, timeframe='1m').generate_one(525_600)
+        candles = Candles.from_frame(year)
+        frame_bytes = year.memory_usage(deep=True).sum()
+        
+        window = candles[-20000:]
+        view = window.to_frame()
+        shared = np.shares_memory(window.prices, candles.prices) and np.shares_memory(view['close'].to_numpy(), candles.prices)
+        with_dt = window.to_frame(datetime=True)
+        
+        fleet = {
+            'sma': SMA_Crossover({'short_window': 10, 'long_window': 30}),
+            'rsi': RSI_Strategy({'rsi_period': 14}),
+        }
+        engine = SignalEngine()
+        reference = engine.evaluate(year.iloc[-20000:].reset_index(drop=True), fleet)
+        compact = engine.evaluate(window, fleet)
+        flips = sum(int((reference[n][c].to_numpy(dtype=bool) != compact[n][c].to_numpy(dtype=bool)).sum())
+                    for n in fleet for c in ('entry', 'exit'))
+        panel_ok = len(Panel({'A': window[-300:], 'B': candles[-300:]}).symbols) == 2
+        
+        market = SyntheticMarket(seed=8, timeframe='1m').generate(3000, ['BTC/USDT', 'ETH/USDT'], start_prices=[50000.0, 3000.0])
+        sim = SimulatedExchange(market, timeframe='1m', warmup=2900)
+        sim_bytes = sum(c.nbytes for c in sim.candles.values())
+        bot = CryptoPiggyTop2026()
+        bot.exchange = sim
+        bars = bot.fetch_candles('BTC/USDT', '5m', 200)
+        fetched = bot.backtest('sma_crossover', 'BTC/USDT', timeframe='5m', limit=200)
+        given = bot.backtest('sma_crossover', 'BTC/USDT', timeframe='5m', candles=bars)
+        
+        checks = [
+            (candles.nbytes * 2 < frame_bytes, f"symbol-year at 1m: {candles.nbytes / 1e6:.1f} MB vs {frame_bytes / 1e6:.1f} MB DataFrame"),
+            (candles.timestamp.dtype == np.int64 and candles.prices.dtype == np.float32, "int64 timestamps, float32 prices/volume"),
+            (shared, "slices and to_frame() are zero-copy views"),
+            ('datetime' not in view.columns and with_dt['datetime'].equals(year['datetime'].iloc[-20000:].reset_index(drop=True)),
+             "datetime column only materialized on request"),
+            (flips <= 0.001 * 20000, f"signals on float32 candles match float64 ({flips} flips in 20000 bars)"),
+            (panel_ok, "panel accepts Candles"),
+            (sim_bytes == 2 * 3000 * 28, f"simulated exchange holds {sim_bytes / 6000:.0f} bytes/bar"),
+            (isinstance(bars, Candles) and len(bars) == 200, "bot.fetch_candles() returns Candles"),
+            (fetched['positions'] and fetched['total_return'] == given['total_return'],
+             f"backtest on fetched and supplied candles agree ({len(fetched['positions'])} fills)"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Compact candles test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_28_streaming_lstm():
+    """Test stateful LSTM inference that advances one candle per cycle."""
+    print("\n" + "="*70)
+    print("TEST 28: STREAMING LSTM INFERENCE")
+    print("="*70)
+    
+    try:
+        import time
+        import numpy as np
+        import torch
+        from ml import StreamingLSTM, train_lstm, minmax_scale
+        from metrics import Metrics
+        from synthetic_market import SyntheticMarket
+        from sim_exchange import SimulatedExchange
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        torch.manual_seed(0)
+        df = SyntheticMarket(seed=11, timeframe='5m').generate_one(600)
+        closes, stamps = df['close'].to_numpy(), df['timestamp'].to_numpy()
+        model = train_lstm(closes[:300], window=50, epochs=2)
+        
+        def full_window(history):
+            _, minv, denom = minmax_scale(history)
+            x = torch.tensor((history[-50:] - minv) / denom, dtype=torch.float32)[None, :, None]
+            with torch.no_grad():
+                return float(model(x)) * denom + minv
+        
+        metrics = Metrics()
+        stream = StreamingLSTM(model, window=50, resync_every=50, metrics=metrics)
+        streamed, reference = [], []
+        for end in range(300, 400):
+            streamed.append(stream.predict('BTC/USDT', closes[end - 200:end], stamps[end - 200:end]))
+            reference.append(full_window(closes[end - 200:end]))
+        streamed, reference = np.array(streamed), np.array(reference)
+        # Cycles 0, 51: a full window rebuilt the state
+        resynced = np.allclose(streamed[[0, 51]], reference[[0, 51]], rtol=1e-6)
+        drift = np.max(np.abs(streamed - reference) / reference)
+        stream_steps = metrics.counter('lstm_timesteps_total', mode='stream')
+        resync_steps = metrics.counter('lstm_timesteps_total', mode='resync')
+        
+        # A forming candle (same timestamp, new close) moves the prediction without being committed
+        history = closes[300:500].copy()
+        before = stream.predict('ETH/USDT', history, stamps[300:500])
+        history[-1] *= 1.01
+        moved = stream.predict('ETH/USDT', history, stamps[300:500])
+        history[-1] = closes[499]
+        restored = stream.predict('ETH/USDT', history, stamps[300:500])
+        
+        def timed(fn, n=50):
+            start = time.perf_counter()
+            for _ in range(n):
+                fn()
+            return (time.perf_counter() - start) / n
+        stream.predict('SOL/USDT', closes[300:500], stamps[300:500])
+        t_stream = timed(lambda: stream.predict('SOL/USDT', closes[300:500], stamps[300:500]))
+        t_full = timed(lambda: full_window(closes[300:500]))
+        
+        market = SyntheticMarket(seed=12, timeframe='1m').generate(3000, ['BTC/USDT'], start_prices=[50000.0])
+        bot = CryptoPiggyTop2026()
+        bot.exchange = SimulatedExchange(market, timeframe='1m', warmup=2000)
+        bot.trade_log.clear()
+        bot.positions = {}
+        bot.active_strategy = 'sma_crossover'
+        bot.strategies['sma_crossover'].params['use_ml'] = True
+        trained = []
+        train = bot.train_lstm_model
+        bot.train_lstm_model = lambda *a, **k: trained.append(1) or train(*a, **k)
+        bot.start_bot(cycles=4, interval_seconds=300, verbose=False, symbols=['BTC/USDT'], async_orders=False)
+        bot_stream = bot.metrics.counter('lstm_timesteps_total', mode='stream')
+        bot_resync = bot.metrics.counter('lstm_timesteps_total', mode='resync')
+        bot.strategies['sma_crossover'].params['use_ml'] = False
+        
+        checks = [
+            (resynced, "predictions after a resync equal the full-window model"),
+            (drift < 0.01, f"streamed predictions stay within {drift:.4%} of the full-window model"),
+            (resync_steps == 2 * 49 and stream_steps == 100 + 98,
+             f"100 cycles ran {stream_steps + resync_steps} timesteps vs {100 * 50} re-running the window"),
+            (moved != before and abs(restored - before) < 1e-6, "forming last candle is re-evaluated, not committed"),
+            (t_stream < t_full, f"steady-state prediction {t_stream * 1000:.2f} ms vs {t_full * 1000:.2f} ms full window"),
+            (len(trained) == 1 and bot_resync == 49 and bot_stream == 1 + 3 * 2,
+             f"start_bot trains once, then streams ({bot_resync} resync + {bot_stream} streamed steps over 4 cycles)"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Streaming LSTM test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_29_lstm_export():
+    """Test TorchScript/ONNX export, int8 quantization and loading the artifact in the bot."""
+    print("\n" + "="*70)
+    print("TEST 29: LSTM EXPORT & INT8 QUANTIZATION")
+    print("="*70)
+    
+    try:
+        import os
+        import shutil
+        import tempfile
+        import torch
+        from ml import train_lstm, export_model, load_model, quantize, compare_models
+        from synthetic_market import SyntheticMarket
+        from sim_exchange import SimulatedExchange
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        torch.manual_seed(0)
+        closes = SyntheticMarket(seed=13, timeframe='5m').generate_one(500)['close'].to_numpy()
+        model = train_lstm(closes, window=50, epochs=2)
+        tmp = tempfile.mkdtemp()
+        fp32_path = export_model(model, os.path.join(tmp, 'lstm.pt'))
+        int8_path = export_model(model, os.path.join(tmp, 'lstm_int8.pt'), quantize_int8=True)
+        report = compare_models(model, {
+            'eager_int8': quantize(model),
+            'torchscript_fp32': load_model(fp32_path),
+            'torchscript_int8': load_model(int8_path),
+        }, closes, repeat=20)
+        for name, row in report.items():
+            print(f"   {name:<18} {row['latency_ms']:7.3f} ms   mean |err| {row['mean_abs_err']:.4f}")
+        price = closes.mean()
+        
+        try:
+            export_model(model, os.path.join(tmp, 'lstm.onnx'))
+            onnx = load_model(os.path.join(tmp, 'lstm.onnx'))
+            onnx_ok = compare_models(model, {'onnx': onnx}, closes, repeat=5)['onnx']['max_abs_err'] < 1e-3 * price
+            onnx_desc = "ONNX export matches eager fp32"
+        except ImportError as e:
+            onnx_ok = 'onnx' in str(e)
+            onnx_desc = f"ONNX export reports its missing optional dependency ({e})"
+        
+        market = SyntheticMarket(seed=14, timeframe='1m').generate(3000, ['BTC/USDT'], start_prices=[50000.0])
+        os.environ['LSTM_MODEL_PATH'] = int8_path
+        try:
+            bot = CryptoPiggyTop2026()
+        finally:
+            del os.environ['LSTM_MODEL_PATH']
+        bot.exchange = SimulatedExchange(market, timeframe='1m', warmup=2000)
+        trained = []
+        bot.train_lstm_model = lambda *a, **k: trained.append(1)
+        df = bot.fetch_ohlcv_df('BTC/USDT', '5m', limit=200)
+        first = bot.predict_next_close('BTC/USDT', df)
+        bot.exchange.advance(300)
+        df = bot.fetch_ohlcv_df('BTC/USDT', '5m', limit=200)
+        second = bot.predict_next_close('BTC/USDT', df)
+        streamed = bot.metrics.counter('lstm_timesteps_total', mode='stream')
+        
+        checks = [
+            (report['torchscript_fp32']['max_abs_err'] < 1e-4 * price, "TorchScript fp32 reproduces eager predictions"),
+            (report['torchscript_int8']['mean_abs_err'] < 1e-3 * price,
+             f"int8 error {report['torchscript_int8']['mean_abs_err']:.2f} on ~{price:.0f} prices"),
+            (abs(report['torchscript_int8']['mean_abs_err'] - report['eager_int8']['mean_abs_err']) < 1e-6,
+             "TorchScript int8 artifact matches in-process quantization"),
+            (onnx_ok, onnx_desc),
+            (isinstance(bot.lstm_model, torch.jit.ScriptModule), "bot loads LSTM_MODEL_PATH at startup"),
+            (first is not None and second is not None and not trained and streamed == 1 + 2,
+             "loaded artifact streams predictions without retraining"),
+        ]
+        try:
+            bot.export_lstm_model(os.path.join(tmp, 'again.pt'))
+            checks.append((False, "exporting a loaded artifact is refused"))
+        except ValueError:
+            checks.append((True, "exporting a loaded artifact is refused"))
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        shutil.rmtree(tmp, ignore_errors=True)
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ LSTM export test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_30_shared_lstm_training():
+    """Test one LSTM trained on several symbols with mini-batches, early stopping and checkpoints."""
+    print("\n" + "="*70)
+    print("TEST 30: SHARED MULTI-SYMBOL LSTM TRAINING")
+    print("="*70)
+    
+    try:
+        import os
+        import tempfile
+        import numpy as np
+        import torch
+        from ml import train_multi, train_lstm, minmax_scale, make_windows, symbol_index
+        from synthetic_market import SyntheticMarket
+        from sim_exchange import SimulatedExchange
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']
+        frames = SyntheticMarket(seed=15, timeframe='5m').generate(300, symbols, start_prices=[50000.0, 3000.0, 150.0])
+        series = {s: df['close'].to_numpy() for s, df in frames.items()}
+        threads = torch.get_num_threads()
+        model, history = train_multi(series, epochs=40, batch_size=64, patience=3, threads=2)
+        
+        # Validation = last 20% of each symbol's windows, scaled per symbol
+        held_out = []
+        for s in symbols:
+            X, y = make_windows(minmax_scale(series[s])[0], 50)
+            cut = len(X) - int(len(X) * 0.2)
+            held_out.append((torch.tensor(X[cut:, :, None], dtype=torch.float32), torch.tensor(y[cut:, None], dtype=torch.float32)))
+        
+        def val_loss(m):
+            with torch.no_grad():
+                return float(torch.cat([(m(X) - y) ** 2 for X, y in held_out]).mean())
+        best = min(h['val_loss'] for h in history)
+        capped = [train_lstm(series[s], 50, epochs=5) for s in symbols]
+        capped_loss = np.mean([val_loss(m) for m in capped])
+        stopped_early = len(history) < 40 and all(h['val_loss'] >= best - 1e-6 for h in history[-3:])
+        
+        embedded, _ = train_multi(series, epochs=2, batch_size=64, embed=True)
+        x = torch.rand(1, 50, 1)
+        with torch.no_grad():
+            per_symbol = [float(embedded(x, symbol=symbol_index(embedded, s))) for s in symbols]
+            unknown = float(embedded(x, symbol=symbol_index(embedded, 'DOGE/USDT')))
+        
+        checkpoint = os.path.join(tempfile.mkdtemp(), 'lstm.ckpt')
+        _, first = train_multi(series, epochs=2, batch_size=64, checkpoint=checkpoint)
+        _, resumed = train_multi(series, epochs=4, batch_size=64, checkpoint=checkpoint)
+        _, straight = train_multi(series, epochs=4, batch_size=64)
+        
+        market = SyntheticMarket(seed=16, timeframe='1m').generate(2500, symbols[:2], start_prices=[50000.0, 3000.0])
+        bot = CryptoPiggyTop2026()
+        bot.exchange = SimulatedExchange(market, timeframe='1m', warmup=2400)
+        bot.trade_log.clear()
+        bot.positions = {}
+        bot.lstm_training.update(epochs=3, batch_size=64)
+        bot.active_strategy = 'sma_crossover'
+        bot.strategies['sma_crossover'].params['use_ml'] = True
+        trained = []
+        train = bot.train_lstm_model
+        bot.train_lstm_model = lambda series, *a, **k: trained.append(sorted(series)) or train(series, *a, **k)
+        bot.start_bot(cycles=2, interval_seconds=300, verbose=False, symbols=symbols[:2], async_orders=False)
+        bot.strategies['sma_crossover'].params['use_ml'] = False
+        
+        checks = [
+            (abs(val_loss(model) - best) < 1e-6, f"best-epoch weights returned (val loss {best:.6f})"),
+            (stopped_early or len(history) == 40, f"early stopping after {len(history)} epochs"),
+            (best < capped_loss, f"shared model beats the 5-epoch per-symbol cap on held-out bars ({best:.6f} vs {capped_loss:.6f})"),
+            (torch.get_num_threads() == threads, "training thread budget restored afterwards"),
+            (embedded.symbol_names() == symbols and len(set(per_symbol)) == 3 and np.isfinite(unknown),
+             "symbol embedding: per-symbol predictions, unknown symbols still served"),
+            (len(resumed) == 4 and resumed[:2] == first and np.allclose([h['val_loss'] for h in resumed], [h['val_loss'] for h in straight]),
+             "checkpointed run resumes where it stopped"),
+            (trained == [sorted(symbols[:2])] and set(bot.lstm_stream._streams) == set(symbols[:2]),
+             "start_bot trains one shared model for all its symbols"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Shared LSTM training test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_31_ml_worker_pool():
+    """Test LSTM training and batched inference in ML worker processes."""
+    print("\n" + "="*70)
+    print("TEST 31: ML WORKER PROCESSES")
+    print("="*70)
+    
+    bot = None
+    try:
+        import os
+        import time
+        import threading
+        import numpy as np
+        import torch
+        from ml import minmax_scale, symbol_index
+        from synthetic_market import SyntheticMarket
+        from sim_exchange import SimulatedExchange
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        symbols = ['BTC/USDT', 'ETH/USDT']
+        market = SyntheticMarket(seed=17, timeframe='1m').generate(2500, symbols, start_prices=[50000.0, 3000.0])
+        os.environ['ML_WORKERS'] = '2'
+        try:
+            started = time.perf_counter()
+            bot = CryptoPiggyTop2026()
+            init_s = time.perf_counter() - started
+        finally:
+            del os.environ['ML_WORKERS']
+        lazy = bot.ml_pool is not None and not bot.ml_pool.running
+        bot.exchange = SimulatedExchange(market, timeframe='1m', warmup=2400)
+        bot.trade_log.clear()
+        bot.positions = {}
+        bot.lstm_training.update(epochs=15, patience=15, batch_size=64, embed=True)
+        bot.active_strategy = 'sma_crossover'
+        bot.strategies['sma_crossover'].params['use_ml'] = True
+        
+        # Training starts in the background; the loop keeps running meanwhile
+        bot.start_bot(cycles=2, interval_seconds=300, verbose=False, symbols=symbols, async_orders=False)
+        job = bot.lstm_training_job
+        background = job is not None and not job.done()
+        stalls = []
+        while not job.done():
+            tick = time.perf_counter()
+            time.sleep(0.001)
+            stalls.append(time.perf_counter() - tick)
+        job.result()
+        bot.strategies['sma_crossover'].params['use_ml'] = False
+        
+        frames = {s: bot.fetch_ohlcv_df(s, '5m', limit=200) for s in symbols}
+        served = bot.predict_next_closes(frames)
+        local = {}
+        for s, df in frames.items():
+            closes = df['close'].to_numpy()
+            _, minv, denom = minmax_scale(closes)
+            x = torch.tensor((closes[-50:] - minv) / denom, dtype=torch.float32)[None, :, None]
+            with torch.no_grad():
+                local[s] = float(bot.lstm_model(x, symbol=symbol_index(bot.lstm_model, s))) * denom + minv
+        
+        # Four threads asking at once share batches
+        batches = bot.metrics.histogram('ml_batch_size')
+        before = (batches.count, batches.sum)
+        results = []
+        def ask():
+            results.extend(bot.ml_pool.predict_many({i: (frames['BTC/USDT']['close'].to_numpy(), 'BTC/USDT') for i in range(25)}).values())
+        threads = [threading.Thread(target=ask) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        batch_count, batch_rows = batches.count - before[0], batches.sum - before[1]
+        
+        series = bot.predict_next_close_series(frames['BTC/USDT']['close'].to_numpy(), epochs=1)
+        bot.ml_pool.close()
+        
+        checks = [
+            (lazy and init_s < 5, "worker processes start on first use"),
+            (background, "start_bot() returns while the shared model trains in a worker"),
+            (max(stalls) < 0.1, f"main thread never stalled during training (worst {max(stalls) * 1000:.1f} ms)"),
+            (bot.lstm_model.symbol_names() == symbols, "trained weights come back to the bot"),
+            (all(abs(served[s] - local[s]) < 1e-4 * local[s] for s in symbols), "worker predictions match the same model in-process"),
+            (len(results) == 100 and batch_rows == 100 and batch_count < 100,
+             f"100 concurrent requests served in {batch_count} batches"),
+            (series is not None and len(series) == 200 and np.isfinite(series).all(), "predict_next_close_series() runs in the training worker"),
+            (not bot.ml_pool.running, "pool shuts down cleanly"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ ML worker test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        if bot is not None and bot.ml_pool is not None:
+            bot.ml_pool.close()
+
+
+def test_32_feature_store():
+    """Test the incremental feature store and a multivariate LSTM trained on it."""
+    print("\n" + "="*70)
+    print("TEST 32: FEATURE STORE")
+    print("="*70)
+    
+    try:
+        import os
+        import numpy as np
+        from features import FeatureStore
+        from ml import model_features
+        from synthetic_market import SyntheticMarket
+        from sim_exchange import SimulatedExchange
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        symbols = ['BTC/USDT', 'ETH/USDT']
+        market = SyntheticMarket(seed=23, timeframe='5m').generate(1500, symbols, start_prices=[50000.0, 3000.0])
+        btc = market['BTC/USDT']
+        
+        # Built in one go vs one candle at a time, with the last bar re-sent while still forming
+        full, stream = FeatureStore(), FeatureStore()
+        full.update('BTC/USDT', '5m', btc)
+        stream.update('BTC/USDT', '5m', btc.iloc[:1000])
+        rows = []
+        for i in range(1000, len(btc)):
+            forming = btc.iloc[i:i + 1].copy()
+            forming['close'] *= 1.01
+            stream.update('BTC/USDT', '5m', forming)
+            rows.append(stream.update('BTC/USDT', '5m', btc.iloc[i - 5:i + 1]))
+        _, _, a = full.rows('BTC/USDT', '5m')
+        _, _, b = stream.rows('BTC/USDT', '5m')
+        start = full.first_valid('BTC/USDT', '5m')
+        windows = full.windows('BTC/USDT', '5m', 50)
+        resent = stream.update('BTC/USDT', '5m', btc.iloc[-3:-1])
+        
+        os.environ['LSTM_FEATURE_SET'] = 'default'
+        try:
+            bot = CryptoPiggyTop2026()
+        finally:
+            del os.environ['LSTM_FEATURE_SET']
+        bot.exchange = SimulatedExchange(market, timeframe='5m', warmup=1400)
+        bot.lstm_training.update(epochs=3, patience=3)
+        bot.train_lstm_universe(symbols, '5m', limit=1000)
+        computed = bot.metrics.counter('feature_rows_total', timeframe='5m')
+        df = bot.fetch_ohlcv_df('BTC/USDT', '5m', limit=300)
+        pred = bot.predict_next_close('BTC/USDT', df)
+        bot.exchange.advance(300)
+        df = bot.fetch_ohlcv_df('BTC/USDT', '5m', limit=300)
+        before = bot.metrics.counter('feature_rows_total', timeframe='5m')
+        pred2 = bot.predict_next_close('BTC/USDT', df)
+        price = float(df['close'].iloc[-1])
+        
+        checks = [
+            (np.allclose(a[start:], b[start:], equal_nan=True, atol=1e-6), "incremental updates match a full rebuild"),
+            (max(rows) == 1, "each new candle computes one row (forming bar replaced, not appended)"),
+            (resent == 0, "re-sending older candles is a no-op"),
+            (np.isnan(a[:start]).any() and not np.isnan(a[start:]).any(), "rows before the warm-up are marked invalid"),
+            (windows.shape == (len(a) - start - 49, 50, 7) and np.shares_memory(windows, a), "training windows are views into the store"),
+            (len(bot.features) == 2 and computed >= 2000, f"bot computed {computed:.0f} feature rows for the training universe"),
+            (model_features(bot.lstm_model) == bot.features.names('default') and bot.lstm_stream is None,
+             "live model trained on the default feature set"),
+            (pred is not None and pred2 is not None and abs(pred2 / price - 1) < 0.05, f"feature model predicts {pred2:.2f} vs close {price:.2f}"),
+            (bot.metrics.counter('feature_rows_total', timeframe='5m') - before <= 2, "a new cycle only adds the new candles"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Feature store test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_33_predictor_backends():
+    """Test the pluggable predictor backends and their evaluation harness."""
+    print("\n" + "="*70)
+    print("TEST 33: PREDICTOR BACKENDS")
+    print("="*70)
+    
+    try:
+        import numpy as np
+        from predictors import PREDICTORS, evaluate_predictors, cheapest, make_predictor
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        # Returns with momentum (AR(1) 0.4): a linear model should call direction well above chance
+        rng = np.random.default_rng(5)
+        returns = np.zeros(3000)
+        for i in range(1, len(returns)):
+            returns[i] = 0.4 * returns[i - 1] + rng.normal(0, 0.002)
+        closes = 100 * np.exp(np.cumsum(returns))
+        
+        bot = CryptoPiggyTop2026()
+        series = {name: bot.predict_next_close_series(closes[:600], epochs=1, backend=name) for name in PREDICTORS}
+        report = evaluate_predictors(closes, params={'lstm': {'epochs': 2}, 'gru': {'epochs': 2}}, repeat=5)
+        fields = {'train_s', 'latency_ms', 'mae', 'directional_accuracy', 'test_windows'}
+        try:
+            make_predictor('nope')
+            unknown = False
+        except KeyError:
+            unknown = True
+        
+        checks = [
+            (set(PREDICTORS) >= {'lstm', 'gru', 'ridge', 'gbm'}, "lstm, gru, ridge and gbm backends registered"),
+            (all(s is not None and len(s) == 600 and np.isfinite(s).all() and np.array_equal(s[:50], closes[:50])
+                 for s in series.values()), "every backend serves predict_next_close_series()"),
+            (all(set(row) == fields for row in report.values()), "harness reports training time, latency, error and direction"),
+            (report['ridge']['directional_accuracy'] > 0.6, f"ridge direction {report['ridge']['directional_accuracy']:.1%} on momentum data"),
+            (report['ridge']['latency_ms'] < report['lstm']['latency_ms'], "ridge inference is cheaper than the LSTM"),
+            (cheapest(report, 0.6) in ('ridge', 'gbm') and cheapest(report, 1.01) is None, "cheapest() respects the accuracy bar"),
+            (unknown, "unknown backends are rejected"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Predictor backend test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_34_risk_exit_rejections():
+    """Test that risk exits bypass the daily cap and minimum size, and back off after rejections."""
+    print("\n" + "="*70)
+    print("TEST 34: RISK EXITS AFTER DAILY CAP / REJECTIONS")
+    print("="*70)
+    
+    try:
+        import time
+        from crypto_piggy_top import CryptoPiggyTop2026, MAX_DAILY_TRADES
+        
+        bot = CryptoPiggyTop2026()
+        bot.trade_log.clear()
+        bot.positions = {}
+        bot.sync_paper_account()
+        bot.risk.reset()
+        alerts = []
+        bot.send_telegram = alerts.append
+        
+        def wait_flat(symbol, timeout=2.0):
+            deadline = time.perf_counter() + timeout
+            while symbol in bot.positions and time.perf_counter() < deadline:
+                time.sleep(0.005)
+            return symbol not in bot.positions
+        
+        def wait_settled(symbol, timeout=2.0):
+            deadline = time.perf_counter() + timeout
+            while symbol in bot.risk._exiting and time.perf_counter() < deadline:
+                time.sleep(0.005)
+        
+        # Sync mode (no pipeline): daily trade cap reached, then a stop is breached
+        bot.place_order('buy', 'BTC/USDT', 10.0)
+        bot.daily_trades_count = MAX_DAILY_TRADES
+        entries_blocked = bot.place_order('buy', 'ETH/USDT', 10.0) is None
+        bot.mark_price('BTC/USDT', 49000.0)
+        capped_exit = wait_flat('BTC/USDT')
+        bot.daily_trades_count = 0
+        
+        # Position worth less than the minimum order size
+        bot.place_order('buy', 'BTC/USDT', 10.0)
+        bot.mark_price('BTC/USDT', 9000.0)
+        tiny_exit = wait_flat('BTC/USDT')
+        
+        # A rejected exit is alerted once and retried with backoff, not on every tick
+        bot.risk.retry_backoff = 0.3
+        bot.place_order('buy', 'BTC/USDT', 10.0)
+        allowed = bot.allowed_symbols
+        bot.allowed_symbols = [s for s in allowed if s != 'BTC/USDT']
+        alerts.clear()
+        exits_before = bot.metrics.counter('risk_exits_total', reason='trailing_stop')
+        for _ in range(5):
+            bot.mark_price('BTC/USDT', 48000.0)
+            wait_settled('BTC/USDT')
+            time.sleep(0.02)
+        attempts = bot.metrics.counter('order_rejections_total', reason='symbol_not_allowed')
+        held = 'BTC/USDT' in bot.positions
+        bot.allowed_symbols = allowed
+        time.sleep(0.35)
+        bot.mark_price('BTC/USDT', 48000.0)
+        retried = wait_flat('BTC/USDT')
+        exits = bot.metrics.counter('risk_exits_total', reason='trailing_stop') - exits_before
+        exit_alerts = len([a for a in alerts if 'RISK EXIT' in a])
+        sync_only = bot.execution is None
+        
+        # With the pipeline running, exits are queued on it instead
+        bot.start_execution()
+        bot.place_order('buy', 'BTC/USDT', 10.0)
+        bot.mark_price('BTC/USDT', 47000.0)
+        piped_exit = wait_flat('BTC/USDT')
+        bot.execution.drain()
+        piped = bot.metrics.counter('order_intents_total', outcome='filled') == 1
+        bot.stop_execution()
+        
+        checks = [
+            (sync_only, "sync-mode exits go through place_order() without starting the pipeline"),
+            (entries_blocked and capped_exit, "stop exit fills after the daily trade cap blocks entries"),
+            (tiny_exit, "stop exit fills for a position below the minimum order size"),
+            (held and attempts == 1, f"rejected exit not resubmitted on every tick ({attempts:.0f} attempt)"),
+            (exit_alerts == 1 and exits == 1, "one alert and one count per exit"),
+            (retried, "exit retried after the backoff"),
+            (piped_exit and piped, "exit submitted on the pipeline when it is running"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Risk exit test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_35_ml_training_retry():
+    """Test that a failed ML worker training job is retried instead of disabling the ML gate."""
+    print("\n" + "="*70)
+    print("TEST 35: ML WORKER TRAINING RETRY")
+    print("="*70)
+    
+    bot = None
+    try:
+        import os
+        import time
+        from synthetic_market import SyntheticMarket
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        symbols = ['BTC/USDT', 'ETH/USDT']
+        frames = SyntheticMarket(seed=29, timeframe='5m').generate(300, symbols, start_prices=[50000.0, 3000.0])
+        os.environ['ML_WORKERS'] = '1'
+        try:
+            bot = CryptoPiggyTop2026()
+        finally:
+            del os.environ['ML_WORKERS']
+        bot.lstm_training.update(epochs=2, patience=2)
+        
+        def job_cleared(timeout=5.0):
+            # Done callbacks run just after result() returns
+            deadline = time.perf_counter() + timeout
+            while bot.lstm_training_job is not None and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            return bot.lstm_training_job is None
+        
+        # batch_size 0 makes train_multi() raise inside the training worker
+        bot.lstm_training['batch_size'] = 0
+        first = bot.predict_next_closes(frames)
+        failed_job = bot.lstm_training_job
+        try:
+            failed_job.result(timeout=120)
+            failed = False
+        except Exception:
+            failed = True
+        cleared = job_cleared() and not bot.ml_pool.ready
+        
+        bot.lstm_training['batch_size'] = 64
+        bot.predict_next_closes(frames)
+        retry_job = bot.lstm_training_job
+        retried = retry_job is not None and retry_job is not failed_job
+        retry_job.result(timeout=120)
+        retry_cleared = job_cleared()
+        preds = bot.predict_next_closes(frames)
+        short = bot.predict_next_closes({'BTC/USDT': frames['BTC/USDT'].iloc[:51]})
+        
+        checks = [
+            (all(p is None for p in first.values()) and failed, "training job failed in the worker"),
+            (cleared, "failed job is cleared"),
+            (retried, "next call starts a new training job"),
+            (retry_cleared and all(preds[s] is not None for s in symbols), "retried model serves predictions"),
+            (short == {}, "frames too short to train on are skipped"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ ML training retry test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        if bot is not None and bot.ml_pool is not None:
+            bot.ml_pool.close()
+
+
+def test_36_profiling():
+    """Test the cProfile and sampling profilers and menu-action reporting."""
+    print("\n" + "="*70)
+    print("TEST 36: PROFILING")
+    print("="*70)
+    
+    try:
+        import io
+        import tempfile
+        import contextlib
+        from profiling import Profiler
+        from crypto_piggy_top import CryptoPiggyTop2026
+        
+        def busy_profile_target(seconds=0.3):
+            total, end = 0, time.perf_counter() + seconds
+            while time.perf_counter() < end:
+                # Plain loop, so the self time lands in this frame rather than a generator's
+                for i in range(500):
+                    total += i * i
+            return total
+        
+        with tempfile.TemporaryDirectory() as out_dir:
+            reports = {}
+            for mode in ('cprofile', 'sample'):
+                profiler = Profiler(mode=mode, out_dir=out_dir, top_n=10, interval=0.002)
+                result = profiler.run('work', busy_profile_target)
+                report = profiler.last_report
+                reports[mode] = (result, report, os.path.exists(report['profile_path']),
+                                 os.path.exists(report['summary_path']))
+            prof_ext = reports['cprofile'][1]['profile_path'].endswith('.prof')
+            folded = open(reports['sample'][1]['profile_path']).read()
+            
+            bot = CryptoPiggyTop2026()
+            bot.profiler = Profiler(mode='cprofile', out_dir=out_dir, top_n=10)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                action_result = bot._run_action('menu', busy_profile_target, 0.1)
+            printed = out.getvalue()
+            bot.profiler = None
+            plain = bot._run_action('menu', lambda: 42)
+        
+        checks = [
+            (all(r[0] > 0 and r[2] and r[3] for r in reports.values()), "both modes write a profile and a summary file"),
+            (prof_ext and 'busy_profile_target' in reports['cprofile'][1]['summary'], "cProfile summary names the hot function"),
+            ('busy_profile_target' in folded and 'busy_profile_target' in reports['sample'][1]['summary'],
+             "sampler stacks and summary name the hot function"),
+            (action_result > 0 and '🔬 Profile (cprofile' in printed and 'busy_profile_target' in printed,
+             "_run_action() prints the profile path and hotspots"),
+            (plain == 42, "_run_action() runs unprofiled without a profiler"),
+        ]
+        for check, desc in checks:
+            print(f"   {'✅' if check else '❌'} {desc}")
+        
+        Path('state.json').unlink(missing_ok=True)
+        return all(c[0] for c in checks)
+    except Exception as e:
+        print(f"❌ Profiling test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def run_all_tests():
     """Run all integration tests."""
     print("\n" + "█"*70)
@@ -401,6 +2417,32 @@ def run_all_tests():
         test_8_backtest,
         test_9_state_persistence,
         test_10_live_mode_guards,
+        test_11_trade_store,
+        test_12_simulated_exchange_replay,
+        test_13_synthetic_market,
+        test_14_metrics_export,
+        test_15_telegram_notifier,
+        test_16_backend_health_monitor,
+        test_17_mock_backend_load,
+        test_18_batch_orders,
+        test_19_idempotent_orders,
+        test_20_execution_pipeline,
+        test_21_account_model,
+        test_22_risk_engine,
+        test_23_multi_timeframe_data,
+        test_24_strategy_plugins,
+        test_25_strategy_ensemble,
+        test_26_panel_signals,
+        test_27_compact_candles,
+        test_28_streaming_lstm,
+        test_29_lstm_export,
+        test_30_shared_lstm_training,
+        test_31_ml_worker_pool,
+        test_32_feature_store,
+        test_33_predictor_backends,
+        test_34_risk_exit_rejections,
+        test_35_ml_training_retry,
+        test_36_profiling,
     ]
     
     results = []
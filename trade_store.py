@@ -0,0 +1,336 @@
+"""
+Columnar trade store for the CryptoPiggy bot.
+
+Trades are kept in typed arrays (one per field) instead of a list of dicts.
+Appends are O(1) amortized, time/symbol range queries use bisect on the
+hot window, and once the hot window exceeds ``max_hot`` records the oldest
+half is spilled to a JSONL archive on disk. Spilled segments are indexed by
+sequence number, time span and symbol set so queries only read the bytes
+they need.
+"""
+
+import json
+import os
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("CryptoPiggyTop")
+
+SIDES = ('buy', 'sell')
+CORE_FIELDS = ('time', 'side', 'symbol', 'amount_usd', 'qty', 'price', 'live')
+
+
+class TradeStore:
+    def __init__(self, archive_path='trade_archive.jsonl', max_hot=5000):
+        self.archive_path = archive_path
+        self.max_hot = max(2, int(max_hot))
+        self._symbols = []
+        self._symbol_codes = {}
+        self._segments = []
+        self._base = 0
+        self._reset_hot()
+
+    def _reset_hot(self):
+        self._time = array('d')
+        self._amount = array('d')
+        self._qty = array('d')
+        self._price = array('d')
+        self._side = array('b')
+        self._live = array('b')
+        self._sym = array('i')
+        self._extra = []
+        self._by_symbol = {}
+        self._monotonic = True
+
+    # ----- writes -----
+
+    def _symbol_code(self, symbol):
+        code = self._symbol_codes.get(symbol)
+        if code is None:
+            code = len(self._symbols)
+            self._symbols.append(symbol)
+            self._symbol_codes[symbol] = code
+        return code
+
+    def record(self, time, side, symbol, amount_usd, qty, price, live=False, **extra):
+        """Append one trade. Extra keyword fields (order_id, status, ...) are kept sparsely."""
+        time = float(time)
+        if self._time and time < self._time[-1]:
+            self._monotonic = False
+        code = self._symbol_code(symbol)
+        seq = self._base + len(self._time)
+        self._time.append(time)
+        self._amount.append(float(amount_usd))
+        self._qty.append(float(qty))
+        self._price.append(float(price))
+        self._side.append(SIDES.index(side) if side in SIDES else -1)
+        self._live.append(1 if live else 0)
+        self._sym.append(code)
+        extra = {k: v for k, v in extra.items() if v is not None and k != 'datetime'}
+        self._extra.append(extra or None)
+        self._by_symbol.setdefault(code, array('q')).append(seq)
+        if len(self._time) > self.max_hot:
+            self._spill(len(self._time) // 2)
+
+    def append(self, trade):
+        """List-compatible append of a trade dict."""
+        trade = dict(trade)
+        core = {k: trade.pop(k, None) for k in CORE_FIELDS}
+        ts = core['time']
+        if isinstance(ts, str):
+            try:
+                ts = datetime.fromisoformat(ts).timestamp()
+            except ValueError:
+                ts = None
+        self.record(
+            ts or 0.0,
+            core['side'],
+            core['symbol'],
+            core['amount_usd'] or 0.0,
+            core['qty'] or 0.0,
+            core['price'] or 0.0,
+            bool(core['live']),
+            **trade
+        )
+
+    def extend(self, trades):
+        for trade in trades:
+            self.append(trade)
+
+    def clear(self):
+        """Drop all trades, including the on-disk archive."""
+        if self._segments and os.path.exists(self.archive_path):
+            try:
+                os.remove(self.archive_path)
+            except OSError:
+                logger.exception("Failed to remove trade archive %s", self.archive_path)
+        self._segments = []
+        self._base = 0
+        self._reset_hot()
+
+    def _spill(self, count):
+        """Move the oldest `count` hot trades to the on-disk archive."""
+        if count <= 0:
+            return
+        lines = [json.dumps(self._materialize(i)) for i in range(count)]
+        payload = ('\n'.join(lines) + '\n').encode('utf-8')
+        try:
+            with open(self.archive_path, 'ab') as f:
+                offset = f.tell()
+                f.write(payload)
+        except OSError:
+            logger.exception("Failed to spill trades to %s; keeping them in memory", self.archive_path)
+            return
+        self._segments.append({
+            'start': self._base,
+            'count': count,
+            't0': min(self._time[:count]),
+            't1': max(self._time[:count]),
+            'offset': offset,
+            'length': len(payload),
+            'symbols': sorted({self._symbols[c] for c in self._sym[:count]}),
+        })
+        for arr in (self._time, self._amount, self._qty, self._price, self._side, self._live, self._sym):
+            del arr[:count]
+        del self._extra[:count]
+        self._base += count
+        for code, seqs in list(self._by_symbol.items()):
+            cut = bisect_left(seqs, self._base)
+            if cut:
+                del seqs[:cut]
+            if not seqs:
+                del self._by_symbol[code]
+        self._monotonic = all(self._time[i] <= self._time[i + 1] for i in range(len(self._time) - 1))
+
+    # ----- reads -----
+
+    def __len__(self):
+        return self._base + len(self._time)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        for seg in self._segments:
+            yield from self._read_segment(seg)
+        for i in range(len(self._time)):
+            yield self._materialize(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._get_seq(seq) for seq in range(len(self))[key]]
+        n = len(self)
+        if key < 0:
+            key += n
+        if key < 0 or key >= n:
+            raise IndexError('trade index out of range')
+        return self._get_seq(key)
+
+    def _get_seq(self, seq):
+        if seq >= self._base:
+            return self._materialize(seq - self._base)
+        for seg in self._segments:
+            if seg['start'] <= seq < seg['start'] + seg['count']:
+                return self._read_segment(seg)[seq - seg['start']]
+        raise IndexError('trade index out of range')
+
+    def _materialize(self, i):
+        t = self._time[i]
+        side = self._side[i]
+        trade = {
+            'time': t,
+            'datetime': datetime.utcfromtimestamp(t).isoformat(),
+            'side': SIDES[side] if side >= 0 else None,
+            'symbol': self._symbols[self._sym[i]],
+            'amount_usd': self._amount[i],
+            'qty': self._qty[i],
+            'price': self._price[i],
+            'live': bool(self._live[i]),
+        }
+        if self._extra[i]:
+            trade.update(self._extra[i])
+        return trade
+
+    def _read_segment(self, seg):
+        try:
+            with open(self.archive_path, 'rb') as f:
+                f.seek(seg['offset'])
+                data = f.read(seg['length'])
+            return [json.loads(line) for line in data.decode('utf-8').splitlines() if line]
+        except (OSError, ValueError):
+            logger.exception("Failed to read trade archive segment at offset %s", seg.get('offset'))
+            return []
+
+    def _hot_positions(self, start=None, end=None, symbol=None):
+        """Hot-window positions matching the filters, in sequence order."""
+        n = len(self._time)
+        if symbol is not None:
+            code = self._symbol_codes.get(symbol)
+            if code is None or code not in self._by_symbol:
+                return np.empty(0, dtype=np.int64)
+        if self._monotonic:
+            lo = 0 if start is None else bisect_left(self._time, start)
+            hi = n if end is None else bisect_right(self._time, end)
+            if symbol is None:
+                return np.arange(lo, hi, dtype=np.int64)
+            seqs = self._by_symbol[code]
+            a = bisect_left(seqs, self._base + lo)
+            b = bisect_left(seqs, self._base + hi)
+            return np.frombuffer(seqs, dtype=np.int64)[a:b] - self._base
+        times = np.frombuffer(self._time, dtype=np.float64)
+        mask = np.ones(n, dtype=bool)
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times <= end
+        if symbol is not None:
+            mask &= np.frombuffer(self._sym, dtype=np.int32) == code
+        return np.flatnonzero(mask)
+
+    def _cold_query(self, start, end, symbol, limit):
+        """Matching archived trades, newest segments first, stopping once `limit` is met."""
+        chunks = []
+        found = 0
+        for seg in reversed(self._segments):
+            if start is not None and seg['t1'] < start:
+                continue
+            if end is not None and seg['t0'] > end:
+                continue
+            if symbol is not None and symbol not in seg['symbols']:
+                continue
+            rows = [
+                t for t in self._read_segment(seg)
+                if (start is None or t['time'] >= start)
+                and (end is None or t['time'] <= end)
+                and (symbol is None or t['symbol'] == symbol)
+            ]
+            chunks.append(rows)
+            found += len(rows)
+            if limit is not None and found >= limit:
+                break
+        out = [t for rows in reversed(chunks) for t in rows]
+        if limit is not None:
+            out = out[-limit:] if limit > 0 else []
+        return out
+
+    def query(self, start=None, end=None, symbol=None, limit=None):
+        """Trades with start <= time <= end (optionally one symbol); `limit` keeps the most recent."""
+        pos = self._hot_positions(start, end, symbol)
+        if limit is not None:
+            pos = pos[-limit:] if limit > 0 else pos[:0]
+        hot = [self._materialize(int(i)) for i in pos]
+        need = None if limit is None else limit - len(hot)
+        if self._segments and (need is None or need > 0):
+            return self._cold_query(start, end, symbol, need) + hot
+        return hot
+
+    def tail(self, n=10, symbol=None):
+        return self.query(symbol=symbol, limit=n)
+
+    def to_frame(self, limit=None, start=None, end=None, symbol=None):
+        """DataFrame of matching trades built straight from the column arrays.
+
+        Sparse extra fields (order_id, strategy, votes, ...) become object
+        columns after the core ones, None where a trade lacks them.
+        """
+        pos = self._hot_positions(start, end, symbol)
+        if limit is not None:
+            pos = pos[-limit:] if limit > 0 else pos[:0]
+        times = np.frombuffer(self._time, dtype=np.float64)[pos]
+        sides = np.frombuffer(self._side, dtype=np.int8)[pos]
+        syms = np.frombuffer(self._sym, dtype=np.int32)[pos]
+        names = np.array(self._symbols + [None], dtype=object)
+        hot = pd.DataFrame({
+            'time': times,
+            'datetime': pd.to_datetime(times, unit='s'),
+            'side': np.array(SIDES + (None,), dtype=object)[sides],
+            'symbol': names[syms],
+            'amount_usd': np.frombuffer(self._amount, dtype=np.float64)[pos],
+            'qty': np.frombuffer(self._qty, dtype=np.float64)[pos],
+            'price': np.frombuffer(self._price, dtype=np.float64)[pos],
+            'live': np.frombuffer(self._live, dtype=np.int8)[pos].astype(bool),
+        })
+        core = list(hot.columns)
+        extras = [self._extra[i] for i in pos]
+        for key in dict.fromkeys(k for extra in extras if extra for k in extra):
+            hot[key] = pd.Series([extra.get(key) if extra else None for extra in extras], dtype=object)
+        need = None if limit is None else limit - len(hot)
+        if self._segments and (need is None or need > 0):
+            cold = pd.DataFrame(self._cold_query(start, end, symbol, need))
+            if not cold.empty:
+                cold['datetime'] = pd.to_datetime(cold['time'], unit='s')
+                sparse = [c for c in dict.fromkeys([*hot.columns, *cold.columns]) if c not in core]
+                hot = pd.concat([cold, hot], ignore_index=True)[core + sparse]
+                hot[sparse] = hot[sparse].astype(object).where(hot[sparse].notna(), None)
+        return hot
+
+    # ----- persistence -----
+
+    def hot_records(self):
+        return [self._materialize(i) for i in range(len(self._time))]
+
+    def archive_state(self):
+        return {'path': self.archive_path, 'base': self._base, 'segments': self._segments}
+
+    def restore(self, hot_trades, archive=None):
+        """Rebuild from a saved hot window plus archive index (see archive_state)."""
+        self._reset_hot()
+        self._segments = []
+        self._base = 0
+        if archive and os.path.exists(archive.get('path', '')):
+            self.archive_path = archive['path']
+            self._segments = list(archive.get('segments', []))
+            self._base = int(archive.get('base', 0))
+            # Trades spilled after the save are back in the hot window; drop their rows so they are not archived twice
+            end = max((seg['offset'] + seg['length'] for seg in self._segments), default=0)
+            try:
+                if os.path.getsize(self.archive_path) > end:
+                    os.truncate(self.archive_path, end)
+            except OSError:
+                logger.exception("Failed to truncate trade archive %s", self.archive_path)
+        self.extend(hot_trades or [])